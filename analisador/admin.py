@@ -1,3 +1,12 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Analise
+
+
+@admin.register(Analise)
+class AnaliseAdmin(admin.ModelAdmin):
+    list_display = ('nome_arquivo', 'enviada_em', 'total_numeros', 'total_faltantes', 'total_duplicados', 'total_envios')
+    search_fields = ('nome_arquivo', 'hash_conteudo')
+    date_hierarchy = 'enviada_em'
+    exclude = ('corridas', 'duplicados')
+    readonly_fields = ('id_resultado', 'hash_conteudo', 'criada_em', 'enviada_em')
@@ -0,0 +1,289 @@
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from django.conf import settings
+
+
+# Memória reservada mesmo para arquivos minúsculos (request, resultado, template)
+CUSTO_MINIMO = 4 * 1024 * 1024
+
+# Memória estimada por byte do arquivo durante a leitura. O backend NumPy
+# chega a cerca de 8 bytes por byte lido ao converter e compactar os números.
+BYTES_POR_BYTE_LIDO = 8
+
+# Memória estimada por corrida de números consecutivos na consolidação e no
+# resultado (tuplas das corridas e lacunas, lista de gaps, snapshot no cache)
+BYTES_POR_CORRIDA = 512
+
+
+class SemCapacidade(Exception):
+    """
+    A análise não foi admitida: o orçamento de memória está tomado e a fila
+    de espera está cheia ou a espera esgotou.
+    """
+
+    def __init__(self, mensagem: str, retry_after: int):
+        super().__init__(mensagem)
+        self.retry_after = retry_after  # Segundos sugeridos antes de tentar de novo
+
+
+def custo_leitura(tamanho_bytes: int) -> int:
+    """
+    Estima a memória usada para ler e registrar um arquivo.
+
+    Args:
+        tamanho_bytes: Tamanho do arquivo (ou do corpo do request)
+
+    Returns:
+        int: Bytes de memória estimados
+    """
+    return CUSTO_MINIMO + tamanho_bytes * BYTES_POR_BYTE_LIDO
+
+
+def custo_resultado(quantidade: int, menor: int, maior: int) -> int:
+    """
+    Estima a memória usada para consolidar e montar o resultado de uma
+    sequência já lida.
+
+    O custo cresce com o número de corridas, que não passa da quantidade de
+    números nem (com poucos repetidos) da quantidade de números ausentes no
+    intervalo: um arquivo denso ou um intervalo inteiro coberto têm poucas
+    corridas; números espalhados por um intervalo enorme, uma por número.
+
+    Args:
+        quantidade: Números lidos
+        menor: Menor número lido
+        maior: Maior número lido
+
+    Returns:
+        int: Bytes de memória estimados
+    """
+    ausentes = (maior - menor + 1) - quantidade
+    corridas = max(min(quantidade, ausentes + 1), 1)
+    return corridas * BYTES_POR_CORRIDA
+
+
+class Reserva:
+    """
+    Parte do orçamento de memória reservada para uma análise.
+
+    Usada como context manager: a memória é devolvida ao sair do bloco.
+    """
+
+    def __init__(self, controle: 'ControleAdmissao', custo: int):
+        self.controle = controle
+        self.custo = custo
+
+    def ampliar(self, custo: int):
+        """
+        Aumenta a reserva para ``custo``, quando a análise descobre que
+        precisa de mais memória do que a estimada na admissão.
+
+        Raises:
+            SemCapacidade: Se o aumento não couber no orçamento
+        """
+        self.controle._ampliar(self, custo)
+
+    def liberar(self):
+        """Devolve a memória reservada ao orçamento."""
+        self.controle._liberar(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.liberar()
+
+
+class _ReservaNula:
+    """Reserva que não limita nada, usada fora do controle de admissão."""
+
+    def ampliar(self, custo: int):
+        pass
+
+
+RESERVA_NULA = _ReservaNula()
+
+
+class ReservaAcumulada:
+    """
+    Reserva compartilhada por várias análises de um mesmo request cujos
+    resultados ficam todos na memória até o fim (como os dois arquivos de
+    uma comparação).
+
+    Cada ampliação pedida por uma análise soma o seu custo ao das análises
+    já concluídas, em vez de substituí-lo.
+    """
+
+    def __init__(self, reserva: Optional[Reserva] = None):
+        self.reserva = reserva or RESERVA_NULA
+        self.acumulado = 0
+
+    def ampliar(self, custo: int):
+        """
+        Amplia a reserva para o custo das análises concluídas mais ``custo``.
+
+        Raises:
+            SemCapacidade: Se o aumento não couber no orçamento
+        """
+        self.reserva.ampliar(self.acumulado + custo)
+
+    def acumular(self, custo: int):
+        """
+        Registra o custo do resultado de uma análise concluída, que continua
+        em uso enquanto as seguintes são feitas.
+
+        Raises:
+            SemCapacidade: Se o aumento não couber no orçamento
+        """
+        self.acumulado += custo
+        self.reserva.ampliar(self.acumulado)
+
+
+class ControleAdmissao:
+    """
+    Limita a memória somada das análises executadas ao mesmo tempo.
+
+    Cada análise reserva, antes de começar, a memória estimada pelo tamanho
+    do arquivo (custo_leitura). Se a reserva não couber no orçamento, o
+    request aguarda em uma fila limitada, por ordem de chegada; com a fila
+    cheia ou a espera esgotada, levanta SemCapacidade, para ser respondido
+    com 503 na hora em vez de derrubar o processo por falta de memória.
+
+    As análises em segundo plano, que esperam sem limite de tempo, têm uma
+    fila própria, atendida só quando a dos requests está vazia: uma tarefa
+    aguardando uma reserva grande não segura os uploads que cabem no
+    orçamento.
+
+    Depois da leitura, quando a quantidade e o intervalo dos números são
+    conhecidos, a análise amplia a reserva para o custo do resultado
+    (custo_resultado). A ampliação não aguarda, para que duas análises não
+    fiquem esperando uma pela outra: se não couber, a análise é recusada,
+    a menos que seja a única em andamento.
+
+    Uma reserva maior que o orçamento é reduzida a ele: o arquivo é
+    analisado, mas sozinho. O orçamento vale para o processo; com vários
+    processos de servidor, cada um tem o seu.
+    """
+
+    def __init__(self, orcamento: int, maximo_fila: int, espera_maxima: float, retry_after: int):
+        self.orcamento = orcamento
+        self.maximo_fila = maximo_fila
+        self.espera_maxima = espera_maxima
+        self.retry_after = retry_after
+        self.em_uso = 0
+        self.em_andamento = 0
+        self._fila = deque()
+        self._fila_segundo_plano = deque()
+        self._condicao = threading.Condition()
+
+    def admitir(self, custo: int, limitar_espera: bool = True) -> Reserva:
+        """
+        Reserva memória para uma análise, aguardando a vez se preciso.
+
+        Args:
+            custo: Memória estimada, em bytes
+            limitar_espera: Se False, aguarda sem limite de tempo, na fila
+                das análises em segundo plano
+
+        Returns:
+            Reserva: Reserva a ser liberada ao fim da análise
+
+        Raises:
+            SemCapacidade: Se a fila estiver cheia ou a espera esgotar
+        """
+        custo = min(custo, self.orcamento)
+        fila = self._fila if limitar_espera else self._fila_segundo_plano
+        # Requests passam à frente das análises em segundo plano; estas
+        # aguardam também a fila dos requests esvaziar
+        a_frente = (fila,) if limitar_espera else (self._fila, fila)
+        with self._condicao:
+            if not any(a_frente) and self.em_uso + custo <= self.orcamento:
+                return self._reservar(custo)
+
+            if limitar_espera and len(fila) >= self.maximo_fila:
+                raise SemCapacidade(
+                    'O servidor está ocupado com outras análises. Tente novamente em instantes.',
+                    self.retry_after,
+                )
+
+            vez = object()
+            fila.append(vez)
+            prazo = time.monotonic() + self.espera_maxima if limitar_espera else None
+            try:
+                while (fila[0] is not vez or (not limitar_espera and self._fila)
+                       or self.em_uso + custo > self.orcamento):
+                    restante = None if prazo is None else prazo - time.monotonic()
+                    if restante is not None and restante <= 0:
+                        raise SemCapacidade(
+                            'O servidor continua ocupado com outras análises. Tente novamente em instantes.',
+                            self.retry_after,
+                        )
+                    self._condicao.wait(restante)
+                return self._reservar(custo)
+            finally:
+                fila.remove(vez)
+                self._condicao.notify_all()
+
+    def _reservar(self, custo: int) -> Reserva:
+        self.em_uso += custo
+        self.em_andamento += 1
+        return Reserva(self, custo)
+
+    def _ampliar(self, reserva: Reserva, custo: int):
+        custo = min(custo, self.orcamento)
+        with self._condicao:
+            acrescimo = custo - reserva.custo
+            if acrescimo <= 0:
+                return
+            if self.em_uso + acrescimo > self.orcamento and self.em_andamento > 1:
+                raise SemCapacidade(
+                    'O arquivo precisa de mais memória do que está livre agora. Tente novamente em instantes.',
+                    self.retry_after,
+                )
+            self.em_uso += acrescimo
+            reserva.custo = custo
+
+    def _liberar(self, reserva: Reserva):
+        with self._condicao:
+            self.em_uso -= reserva.custo
+            self.em_andamento -= 1
+            reserva.custo = 0
+            self._condicao.notify_all()
+
+    def estado(self) -> dict:
+        """
+        Resume a ocupação do orçamento.
+
+        Returns:
+            dict: Memória reservada, orçamento, análises em andamento e nas
+            filas dos requests e do segundo plano
+        """
+        with self._condicao:
+            return {
+                'memoria_reservada': self.em_uso,
+                'orcamento': self.orcamento,
+                'em_andamento': self.em_andamento,
+                'na_fila': len(self._fila),
+                'na_fila_segundo_plano': len(self._fila_segundo_plano),
+            }
+
+
+_controle: Optional[ControleAdmissao] = None
+_lock = threading.Lock()
+
+
+def obter_controle() -> ControleAdmissao:
+    """Cria o controle de admissão na primeira análise, usando a configuração do projeto."""
+    global _controle
+    with _lock:
+        if _controle is None:
+            _controle = ControleAdmissao(
+                orcamento=getattr(settings, 'ANALISADOR_ADMISSAO_ORCAMENTO', 1024 * 1024 * 1024),
+                maximo_fila=getattr(settings, 'ANALISADOR_ADMISSAO_FILA', 4),
+                espera_maxima=getattr(settings, 'ANALISADOR_ADMISSAO_ESPERA', 15),
+                retry_after=getattr(settings, 'ANALISADOR_ADMISSAO_RETRY_AFTER', 10),
+            )
+        return _controle
@@ -0,0 +1,439 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .historico import carregar_snapshot_salvo, registrar_analise
+from .series import FormatoSeries
+from .servicos import AnalisadorSequencia
+
+
+# Alterar quando o formato do SnapshotAnalise mudar, invalidando o cache antigo
+VERSAO_CACHE = 1
+
+# Memória estimada de cada intervalo ou par (número, quantidade) de um
+# snapshot: a tupla de dois ints e a referência a ela
+BYTES_POR_ITEM_SNAPSHOT = 128
+
+_contadores = {'acertos': 0, 'falhas': 0}
+_lock = threading.Lock()
+
+# Snapshots usados recentemente neste processo, já desserializados, com o
+# tamanho estimado de cada um (LRU limitado em bytes)
+_recentes: 'OrderedDict[str, tuple]' = OrderedDict()
+_bytes_recentes = 0
+
+
+def _cache():
+    return caches[getattr(settings, 'ANALISADOR_CACHE_ALIAS', 'default')]
+
+
+def calcular_hash(chunks: Iterable[bytes]) -> str:
+    """
+    Calcula o SHA-256 do conteúdo do arquivo, bloco a bloco.
+
+    Args:
+        chunks: Blocos de bytes do arquivo
+
+    Returns:
+        str: Hash hexadecimal do conteúdo
+    """
+    sha = hashlib.sha256()
+    for bloco in chunks:
+        sha.update(bloco)
+    return sha.hexdigest()
+
+
+def gerar_id_resultado(hash_conteudo: str, analisador: AnalisadorSequencia) -> str:
+    """
+    Identifica um resultado: conteúdo do arquivo mais os parâmetros da análise.
+
+    O mesmo arquivo analisado com os mesmos parâmetros sempre gera o mesmo id,
+    que pode ser usado em URLs para consultar o resultado depois.
+    """
+    return f'{hash_conteudo}-{analisador.limite_gap}'
+
+
+def chave_analise(id_resultado: str) -> str:
+    """Monta a chave de cache de um resultado."""
+    return f'analise:v{VERSAO_CACHE}:{id_resultado}'
+
+
+def obter_snapshot(id_resultado: str):
+    """
+    Busca o snapshot de um resultado no cache ou, se não estiver lá, no
+    histórico do banco de dados (voltando a guardá-lo no cache).
+
+    Os snapshots usados recentemente ficam também na memória do processo,
+    já desserializados: as páginas de uma lista grande (pagina_resultado)
+    custam o tamanho da página, e não uma nova leitura do resultado inteiro.
+
+    Returns:
+        Optional[SnapshotAnalise]: O snapshot, ou None se o resultado não for conhecido
+    """
+    with _lock:
+        lembrado = _recentes.get(id_resultado)
+        if lembrado is not None:
+            _recentes.move_to_end(id_resultado)
+            return lembrado[0]
+
+    snapshot = _cache().get(chave_analise(id_resultado))
+    if snapshot is None:
+        snapshot = carregar_snapshot_salvo(id_resultado)
+        if snapshot is not None:
+            guardar_snapshot(id_resultado, snapshot)
+    else:
+        _lembrar(id_resultado, snapshot)
+    return snapshot
+
+
+def _lembrar(id_resultado: str, snapshot):
+    """
+    Mantém o snapshot na memória do processo, descartando os usados há mais
+    tempo quando o total passa de ANALISADOR_CACHE_MEMORIA_PROCESSO.
+    """
+    global _bytes_recentes
+    limite = getattr(settings, 'ANALISADOR_CACHE_MEMORIA_PROCESSO', 256 * 1024 * 1024)
+    tamanho = tamanho_snapshot(snapshot)
+    if tamanho > limite:
+        return
+
+    with _lock:
+        if id_resultado in _recentes:
+            _recentes.move_to_end(id_resultado)
+            return
+        _recentes[id_resultado] = (snapshot, tamanho)
+        _bytes_recentes += tamanho
+        while _bytes_recentes > limite:
+            _, (_, descartado) = _recentes.popitem(last=False)
+            _bytes_recentes -= descartado
+
+
+def esquecer_resultado(id_resultado: str):
+    """
+    Remove um resultado do cache e da memória do processo. O histórico do
+    banco de dados não é alterado.
+    """
+    global _bytes_recentes
+    with _lock:
+        lembrado = _recentes.pop(id_resultado, None)
+        if lembrado is not None:
+            _bytes_recentes -= lembrado[1]
+    _cache().delete(chave_analise(id_resultado))
+
+
+def tamanho_snapshot(snapshot) -> int:
+    """
+    Estima a memória ocupada por um snapshot, pelo número de itens das listas.
+
+    Returns:
+        int: Bytes estimados
+    """
+    itens = len(snapshot.corridas) + len(snapshot.faltantes) + len(snapshot.gaps_grandes) + len(snapshot.duplicados)
+    return itens * BYTES_POR_ITEM_SNAPSHOT
+
+
+def guardar_snapshot(id_resultado: str, snapshot):
+    """
+    Guarda o snapshot de um resultado no cache e na memória do processo.
+
+    Snapshots maiores que ANALISADOR_CACHE_TAMANHO_MAXIMO_ENTRADA não são
+    guardados: continuam disponíveis pelo histórico, e o cache, limitado em
+    MAX_ENTRIES, fica limitado também em bytes.
+    """
+    _lembrar(id_resultado, snapshot)
+    if tamanho_snapshot(snapshot) > getattr(settings, 'ANALISADOR_CACHE_TAMANHO_MAXIMO_ENTRADA', 1024 * 1024):
+        return
+    _cache().set(chave_analise(id_resultado), snapshot)
+
+
+def chave_resumos(tipo: str, id_resultado: str) -> str:
+    """Monta a chave de cache dos resumos que acompanham um resultado."""
+    return f'{tipo}:v{VERSAO_CACHE}:{id_resultado}'
+
+
+def guardar_resumos(tipo: str, id_resultado: str, resumos):
+    """
+    Guarda no cache os resumos exibidos junto com um resultado (como os
+    arquivos de um lote ou as séries de um arquivo), para que a página do
+    resultado possa mostrá-los.
+
+    Args:
+        tipo: Tipo dos resumos ('lote' ou 'series')
+        id_resultado: Id do resultado que os resumos acompanham
+        resumos: Lista ou dict com os resumos
+    """
+    _cache().set(chave_resumos(tipo, id_resultado), resumos)
+
+
+def obter_resumos(tipo: str, id_resultado: str):
+    """
+    Busca os resumos guardados por guardar_resumos.
+
+    Returns:
+        Os resumos, ou None se não estiverem (mais) no cache
+    """
+    return _cache().get(chave_resumos(tipo, id_resultado))
+
+
+def _contar(tipo: str):
+    with _lock:
+        _contadores[tipo] += 1
+
+
+def estatisticas_cache() -> dict:
+    """
+    Retorna os contadores de acertos e falhas do cache neste processo.
+
+    Returns:
+        dict: Acertos, falhas e taxa de acerto em percentual
+    """
+    with _lock:
+        acertos, falhas = _contadores['acertos'], _contadores['falhas']
+    total = acertos + falhas
+    return {
+        'acertos': acertos,
+        'falhas': falhas,
+        'taxa_acerto': round(acertos / total * 100, 2) if total else 0,
+    }
+
+
+def analisar_com_cache(analisador: AnalisadorSequencia,
+                       abrir_blocos: Callable[[], Iterable[bytes]],
+                       progresso: Optional[Callable[[int, int], None]] = None,
+                       nome_arquivo: Optional[str] = None, releitura: bool = True) -> dict:
+    """
+    Analisa o arquivo reaproveitando o resultado de um envio idêntico anterior.
+
+    O arquivo é lido uma vez só para calcular o hash: em caso de acerto, o
+    snapshot guardado é carregado no analisador e o arquivo não é analisado;
+    em caso de falha, a análise é feita normalmente e o snapshot é guardado.
+    Quando reler o arquivo custa caro (``releitura`` False, como em um
+    ``.gz``, descomprimido de novo a cada leitura), o hash é calculado
+    durante a própria análise, como em analisar_fluxo_com_cache.
+
+    Args:
+        analisador: Analisador que receberá o resultado
+        abrir_blocos: Função que retorna um novo iterador sobre os blocos do arquivo
+        progresso: Função opcional repassada a processar_chunks
+        nome_arquivo: Se informado, o resultado é gravado no histórico com este nome
+        releitura: Se ``abrir_blocos`` pode ser chamada de novo a baixo custo
+
+    Returns:
+        dict: Resultado da análise, no mesmo formato de processar_chunks,
+        com o id do resultado em ``id_resultado``
+    """
+    if not releitura:
+        return analisar_fluxo_com_cache(analisador, abrir_blocos(), progresso, nome_arquivo)
+
+    with analisador.metricas.etapa('hash'):
+        hash_conteudo = calcular_hash(abrir_blocos())
+    id_resultado = gerar_id_resultado(hash_conteudo, analisador)
+
+    snapshot = obter_snapshot(id_resultado)
+    if snapshot is not None:
+        _contar('acertos')
+        resultado = analisador.carregar_snapshot(snapshot)
+    else:
+        _contar('falhas')
+        resultado = analisador.processar_chunks(abrir_blocos(), progresso=progresso)
+        if resultado['sucesso']:
+            guardar_snapshot(id_resultado, analisador.snapshot)
+
+    if resultado['sucesso']:
+        resultado['id_resultado'] = id_resultado
+        if nome_arquivo is not None:
+            registrar_analise(id_resultado, analisador.snapshot, nome_arquivo, hash_conteudo)
+    return resultado
+
+
+def analisar_fluxo_com_cache(analisador: AnalisadorSequencia, chunks: Iterable[bytes],
+                             progresso: Optional[Callable[[int, int], None]] = None,
+                             nome_arquivo: Optional[str] = None) -> dict:
+    """
+    Analisa um fluxo que só pode ser lido uma vez (como o corpo de um request),
+    calculando o hash durante a própria análise.
+
+    Como o hash só fica pronto no final, a leitura não pode ser evitada; o
+    cache é consultado depois dela. Em caso de falha, o snapshot é guardado
+    para que envios futuros do mesmo conteúdo, por qualquer caminho, sejam
+    acertos; em caso de acerto, o guardado é mantido.
+
+    Args:
+        analisador: Analisador que fará a análise
+        chunks: Blocos de bytes do arquivo
+        progresso: Função opcional repassada a processar_chunks
+        nome_arquivo: Se informado, o resultado é gravado no histórico com este nome
+
+    Returns:
+        dict: Resultado da análise, no mesmo formato de processar_chunks,
+        com o id do resultado em ``id_resultado``
+    """
+    sha = hashlib.sha256()
+
+    def blocos_com_hash():
+        for bloco in chunks:
+            sha.update(bloco)
+            yield bloco
+
+    resultado = analisador.processar_chunks(blocos_com_hash(), progresso=progresso)
+    if resultado['sucesso']:
+        hash_conteudo = sha.hexdigest()
+        id_resultado = gerar_id_resultado(hash_conteudo, analisador)
+        if obter_snapshot(id_resultado) is not None:
+            _contar('acertos')
+        else:
+            _contar('falhas')
+            guardar_snapshot(id_resultado, analisador.snapshot)
+        resultado['id_resultado'] = id_resultado
+        if nome_arquivo is not None:
+            registrar_analise(id_resultado, analisador.snapshot, nome_arquivo, hash_conteudo)
+    return resultado
+
+
+def analisar_recebido_com_cache(analisador: AnalisadorSequencia, arquivo,
+                                nome_arquivo: Optional[str] = None) -> dict:
+    """
+    Conclui a análise de um arquivo analisado durante o upload
+    (ArquivoAnalisado), reaproveitando o resultado de um envio idêntico.
+
+    O hash já foi calculado enquanto o arquivo chegava, com o mesmo valor de
+    calcular_hash, de modo que o cache é compartilhado com analisar_com_cache.
+
+    Args:
+        analisador: Analisador que receberá o resultado
+        arquivo: ArquivoAnalisado recebido no request
+        nome_arquivo: Se informado, o resultado é gravado no histórico com este nome
+
+    Returns:
+        dict: Resultado da análise, no mesmo formato de processar_chunks,
+        com o id do resultado em ``id_resultado``
+    """
+    id_resultado = gerar_id_resultado(arquivo.hash_conteudo, analisador)
+
+    snapshot = obter_snapshot(id_resultado)
+    if snapshot is not None:
+        _contar('acertos')
+        resultado = analisador.carregar_snapshot(snapshot)
+    else:
+        _contar('falhas')
+        resultado = analisador.processar_recebido(arquivo)
+        if resultado['sucesso']:
+            guardar_snapshot(id_resultado, analisador.snapshot)
+
+    if resultado['sucesso']:
+        resultado['id_resultado'] = id_resultado
+        if nome_arquivo is not None:
+            registrar_analise(id_resultado, analisador.snapshot, nome_arquivo, arquivo.hash_conteudo)
+    return resultado
+
+
+def analisar_series_com_cache(analisador: AnalisadorSequencia, chunks: Iterable[bytes],
+                              formato: FormatoSeries, nome_arquivo: Optional[str] = None) -> dict:
+    """
+    Analisa um arquivo com várias séries e guarda o snapshot de cada série.
+
+    Cada série ganha o seu próprio id de resultado (conteúdo do arquivo,
+    formato de linha e chave da série), de modo que pode ser aberta,
+    paginada, comparada ou receber acréscimos como qualquer outra análise.
+    A tabela de séries fica guardada com o id do arquivo (conteúdo e
+    formato de linha), para a página das séries.
+
+    Args:
+        analisador: Analisador que fará a análise
+        chunks: Blocos de bytes do arquivo
+        formato: Formato das linhas
+        nome_arquivo: Se informado, cada série é gravada no histórico como "nome [série X]"
+
+    Returns:
+        dict: Resultado de processar_series, com o id de cada série em
+        ``id_resultado`` e o id da tabela de séries em ``id_series``
+    """
+    sha = hashlib.sha256()
+
+    def blocos_com_hash():
+        for bloco in chunks:
+            sha.update(bloco)
+            yield bloco
+
+    resultado = analisador.processar_series(blocos_com_hash(), formato)
+    if resultado['sucesso']:
+        hash_conteudo = sha.hexdigest()
+        for resumo in resultado['series']:
+            serie = resumo['serie']
+            snapshot = analisador.series[serie]
+            id_resultado = gerar_id_resultado(
+                hashlib.sha256(f'{hash_conteudo}|{formato.assinatura}|{serie}'.encode()).hexdigest(), analisador
+            )
+            guardar_snapshot(id_resultado, snapshot)
+            resumo['id_resultado'] = id_resultado
+            if nome_arquivo is not None:
+                registrar_analise(id_resultado, snapshot, f'{nome_arquivo} [série {serie}]')
+
+        resultado['id_series'] = gerar_id_resultado(
+            hashlib.sha256(f'{hash_conteudo}|{formato.assinatura}'.encode()).hexdigest(), analisador
+        )
+        guardar_resumos('series', resultado['id_series'], {
+            'series': resultado['series'],
+            'estatisticas': resultado['estatisticas'],
+            'nome_arquivo': nome_arquivo,
+        })
+    return resultado
+
+
+def acrescentar_com_cache(analisador: AnalisadorSequencia, id_base: str,
+                          abrir_blocos: Callable[[], Iterable[bytes]],
+                          nome_arquivo: Optional[str] = None) -> dict:
+    """
+    Acrescenta os números de um arquivo a uma análise já guardada.
+
+    Só o arquivo novo é analisado; o resultado é mesclado ao snapshot da
+    análise anterior. O id do resultado combina o id anterior e o hash do
+    arquivo novo, de modo que repetir o mesmo acréscimo é um acerto de cache.
+
+    Args:
+        analisador: Analisador que receberá o resultado
+        id_base: Id do resultado ao qual os números são acrescentados
+        abrir_blocos: Função que retorna um novo iterador sobre os blocos do arquivo novo
+        nome_arquivo: Se informado, o resultado é gravado no histórico com este nome
+
+    Returns:
+        dict: Resultado da sequência completa, no mesmo formato de processar_chunks,
+        com o id do resultado em ``id_resultado``
+    """
+    base = obter_snapshot(id_base)
+    if base is None:
+        return {
+            'sucesso': False,
+            'erro': 'Análise anterior não encontrada ou expirada.',
+            'intervalos_encontrados': [],
+            'intervalos_faltantes': [],
+            'numeros_duplicados': [],
+            'estatisticas': {},
+        }
+
+    analisador.carregar_snapshot(base)
+    with analisador.metricas.etapa('hash'):
+        hash_acrescimo = calcular_hash(abrir_blocos())
+    id_resultado = gerar_id_resultado(
+        hashlib.sha256(f'{id_base}+{hash_acrescimo}'.encode()).hexdigest(), analisador
+    )
+
+    snapshot = obter_snapshot(id_resultado)
+    if snapshot is not None:
+        _contar('acertos')
+        resultado = analisador.carregar_snapshot(snapshot)
+    else:
+        _contar('falhas')
+        resultado = analisador.acrescentar_chunks(abrir_blocos())
+        if resultado['sucesso']:
+            guardar_snapshot(id_resultado, analisador.snapshot)
+
+    if resultado['sucesso']:
+        resultado['id_resultado'] = id_resultado
+        if nome_arquivo is not None:
+            registrar_analise(id_resultado, analisador.snapshot, nome_arquivo)
+    return resultado
@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .intervalos import (
+    Intervalo, contar_numeros, diferenca_intervalos, formatar_intervalo, intersecao_intervalos, lacunas,
+)
+from .motor import SnapshotAnalise
+
+
+@dataclass(frozen=True)
+class ComparacaoAnalises:
+    """
+    Diferenças entre duas análises da mesma sequência (por exemplo, a da
+    semana passada e a de hoje).
+
+    Tudo é calculado com operações de conjuntos sobre as corridas das duas
+    análises, em tempo proporcional à quantidade de corridas, sem expandir
+    os intervalos em números.
+    """
+
+    # Números que faltavam na análise anterior e agora estão presentes
+    lacunas_preenchidas: Tuple[Intervalo, ...]
+    # Números que faltam na análise atual e não faltavam na anterior
+    novas_lacunas: Tuple[Intervalo, ...]
+    # Números presentes na anterior que não aparecem mais na atual
+    numeros_removidos: Tuple[Intervalo, ...]
+    # Pares (número, quantidade) repetidos na atual que não eram repetidos na anterior
+    novos_duplicados: Tuple[Tuple[int, int], ...]
+
+    @classmethod
+    def entre(cls, anterior: SnapshotAnalise, atual: SnapshotAnalise) -> 'ComparacaoAnalises':
+        """
+        Compara duas análises.
+
+        Uma lacuna é um trecho sem números entre o menor e o maior número da
+        análise. Números além das pontas da análise anterior não contam como
+        lacunas dela: se a sequência cresceu, só os buracos da parte nova
+        aparecem como novas lacunas.
+
+        Args:
+            anterior: Análise mais antiga
+            atual: Análise mais recente
+
+        Returns:
+            ComparacaoAnalises: Diferenças entre as duas
+        """
+        lacunas_anteriores = list(lacunas(anterior.corridas))
+        lacunas_atuais = list(lacunas(atual.corridas))
+        return cls(
+            lacunas_preenchidas=tuple(intersecao_intervalos(lacunas_anteriores, atual.corridas)),
+            novas_lacunas=tuple(diferenca_intervalos(lacunas_atuais, lacunas_anteriores)),
+            numeros_removidos=tuple(diferenca_intervalos(anterior.corridas, atual.corridas)),
+            novos_duplicados=tuple(_novos_duplicados(anterior.duplicados, atual.duplicados)),
+        )
+
+    def como_dict(self, limite_itens: Optional[int] = None) -> Dict:
+        """
+        Monta o resultado da comparação para exibição ou JSON.
+
+        Args:
+            limite_itens: Máximo de itens por lista (None para todos); os
+                totais sempre consideram as listas completas
+
+        Returns:
+            Dict: Listas formatadas e totais
+        """
+        def cortar(itens):
+            return itens if limite_itens is None else itens[:limite_itens]
+
+        return {
+            'lacunas_preenchidas': [formatar_intervalo(i) for i in cortar(self.lacunas_preenchidas)],
+            'novas_lacunas': [formatar_intervalo(i) for i in cortar(self.novas_lacunas)],
+            'numeros_removidos': [formatar_intervalo(i) for i in cortar(self.numeros_removidos)],
+            'novos_duplicados': [
+                {'numero': numero, 'quantidade': quantidade}
+                for numero, quantidade in cortar(self.novos_duplicados)
+            ],
+            'totais': {
+                'lacunas_preenchidas': contar_numeros(self.lacunas_preenchidas),
+                'novas_lacunas': contar_numeros(self.novas_lacunas),
+                'numeros_removidos': contar_numeros(self.numeros_removidos),
+                'novos_duplicados': len(self.novos_duplicados),
+            },
+            'listas_truncadas': limite_itens is not None and any(
+                len(lista) > limite_itens
+                for lista in (self.lacunas_preenchidas, self.novas_lacunas,
+                              self.numeros_removidos, self.novos_duplicados)
+            ),
+        }
+
+
+def _novos_duplicados(anteriores: Iterable[Tuple[int, int]],
+                      atuais: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Seleciona os duplicados da análise atual que não eram duplicados na anterior.
+
+    As duas listas estão ordenadas por número e são percorridas juntas.
+    """
+    novos = []
+    anteriores = iter(anteriores)
+    anterior = next(anteriores, None)
+    for numero, quantidade in atuais:
+        while anterior is not None and anterior[0] < numero:
+            anterior = next(anteriores, None)
+        if anterior is None or anterior[0] != numero:
+            novos.append((numero, quantidade))
+    return novos
@@ -0,0 +1,349 @@
+import gc
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+
+# Quantidade base de números por cenário, multiplicada pela escala
+NUMEROS_POR_CENARIO = 200_000
+
+# Tamanho do cenário de arquivo grande (30MB, o limite de upload original)
+TAMANHO_ARQUIVO_GRANDE = 30 * 1024 * 1024
+
+# Tamanho dos blocos entregues a processar_chunks, como os de UploadedFile.chunks()
+TAMANHO_BLOCO = 64 * 1024
+
+# Versão do formato do arquivo de baseline
+VERSAO_BASELINE = 1
+
+
+def gerar_denso(quantidade: int, semente: int) -> bytes:
+    """Sequência quase completa (1% dos números removidos), um número por linha."""
+    aleatorio = random.Random(semente)
+    numeros = (n for n in range(1, quantidade + 1) if aleatorio.random() >= 0.01)
+    return '\n'.join(map(str, numeros)).encode()
+
+
+def gerar_esparso(quantidade: int, semente: int) -> bytes:
+    """Blocos de 100 números separados por gaps grandes (de 1.000 a 100.000)."""
+    aleatorio = random.Random(semente)
+    numeros = []
+    inicio = 1
+    while len(numeros) < quantidade:
+        numeros.extend(range(inicio, inicio + 100))
+        inicio += 100 + aleatorio.randint(1000, 100_000)
+    return '\n'.join(map(str, numeros[:quantidade])).encode()
+
+
+def gerar_duplicados(quantidade: int, semente: int) -> bytes:
+    """Números sorteados de um intervalo 10 vezes menor: cada um aparece ~10 vezes."""
+    aleatorio = random.Random(semente)
+    limite = max(quantidade // 10, 1)
+    return '\n'.join(str(aleatorio.randint(1, limite)) for _ in range(quantidade)).encode()
+
+
+def gerar_virgulas(quantidade: int, semente: int) -> bytes:
+    """Sequência quase completa separada por vírgulas, com quebras de linha ocasionais."""
+    aleatorio = random.Random(semente)
+    partes = []
+    for n in range(1, quantidade + 1):
+        if aleatorio.random() < 0.01:
+            continue
+        partes.append(f'{n},\n' if n % 20 == 0 else f'{n}, ')
+    return ''.join(partes).encode()
+
+
+def gerar_por_tamanho(tamanho_bytes: int, semente: int) -> bytes:
+    """Sequência densa de números de 8 dígitos até atingir ``tamanho_bytes``."""
+    quantidade = tamanho_bytes // 9  # 8 dígitos + quebra de linha
+    aleatorio = random.Random(semente)
+    numeros = (
+        n for n in range(10_000_000, 10_000_000 + quantidade)
+        if aleatorio.random() >= 0.001
+    )
+    return '\n'.join(map(str, numeros)).encode()
+
+
+# Cenários: nome -> função que recebe a escala e a semente e gera o conteúdo
+CENARIOS: Dict[str, Callable[[float, int], bytes]] = {
+    'denso': lambda escala, semente: gerar_denso(int(NUMEROS_POR_CENARIO * escala), semente),
+    'esparso': lambda escala, semente: gerar_esparso(int(NUMEROS_POR_CENARIO * escala), semente),
+    'duplicados': lambda escala, semente: gerar_duplicados(int(NUMEROS_POR_CENARIO * escala), semente),
+    'virgulas': lambda escala, semente: gerar_virgulas(int(NUMEROS_POR_CENARIO * escala), semente),
+    'arquivo_30mb': lambda escala, semente: gerar_por_tamanho(int(TAMANHO_ARQUIVO_GRANDE * escala), semente),
+}
+
+
+@dataclass
+class Medicao:
+    """
+    Tempo e memória de uma operação em um cenário.
+    """
+    cenario: str
+    operacao: str
+    tempo_s: float
+    pico_memoria_bytes: int
+    bytes_entrada: int
+
+    @property
+    def chave(self) -> str:
+        return f'{self.cenario}/{self.operacao}'
+
+
+def medir(funcao: Callable[[], object], repeticoes: int,
+          preparar: Optional[Callable[[], None]] = None) -> tuple:
+    """
+    Mede o menor tempo entre as repetições e o pico de memória alocada.
+
+    O tempo é medido sem o tracemalloc, que deixa as alocações bem mais
+    lentas; o pico de memória vem de uma execução separada, com ele ativo.
+
+    Args:
+        funcao: Operação medida
+        repeticoes: Quantidade de execuções cronometradas
+        preparar: Função opcional chamada antes de cada execução, fora da medição
+
+    Returns:
+        tuple: (menor tempo em segundos, pico de memória em bytes)
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        if preparar is not None:
+            preparar()
+        gc.collect()
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    if preparar is not None:
+        preparar()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return min(tempos), pico
+
+
+def _blocos(dados: bytes) -> Iterator[bytes]:
+    for inicio in range(0, len(dados), TAMANHO_BLOCO):
+        yield dados[inicio:inicio + TAMANHO_BLOCO]
+
+
+def operacoes_do_analisador(dados: bytes, backends: List[str]) -> Dict[str, tuple]:
+    """
+    Monta as operações do AnalisadorSequencia medidas em cada cenário.
+
+    Returns:
+        Dict[str, tuple]: Nome da operação -> (função, preparação ou None)
+    """
+    from .servicos import AnalisadorSequencia
+
+    texto = dados.decode()
+    operacoes = {}
+
+    analisador = AnalisadorSequencia()
+    operacoes['_extrair_numeros'] = (lambda: analisador._extrair_numeros(texto), None)
+
+    for backend in backends:
+        por_backend = AnalisadorSequencia(backend)
+        operacoes[f'processar_arquivo[{backend}]'] = (
+            lambda a=por_backend: a.processar_arquivo(texto), None
+        )
+        operacoes[f'processar_chunks[{backend}]'] = (
+            lambda a=por_backend: a.processar_chunks(_blocos(dados)), None
+        )
+
+    # As consultas leem o snapshot de uma análise já feita
+    consultado = AnalisadorSequencia()
+    consultado.processar_chunks(_blocos(dados))
+    for nome in ('_identificar_duplicados', '_identificar_faltantes_otimizado',
+                 '_detectar_gaps_grandes', 'gerar_lista_copia_faltantes'):
+        operacoes[nome] = (getattr(consultado, nome), None)
+
+    return operacoes
+
+
+@contextmanager
+def ambiente_isolado():
+    """
+    Banco de dados e cache de resultados temporários para a medição da view.
+
+    O banco de testes do Django é criado (e migrado) à parte do banco do
+    projeto, e o cache de resultados passa a ser um LocMemCache próprio:
+    uma execução do benchmark não altera o histórico nem os resultados
+    guardados, e funciona mesmo com o banco do projeto sem migrações.
+    """
+    from django.conf import settings
+    from django.db import connection
+    from django.test.utils import override_settings
+
+    alias = getattr(settings, 'ANALISADOR_CACHE_ALIAS', 'default')
+    caches = dict(settings.CACHES)
+    caches[alias] = {
+        **caches.get(alias, {}),
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'analisador-benchmark',
+    }
+
+    nome_original = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with override_settings(CACHES=caches):
+            yield
+    finally:
+        connection.creation.destroy_test_db(nome_original, verbosity=0)
+
+
+def operacao_da_view(dados: bytes) -> tuple:
+    """
+    Monta a operação que envia o arquivo à view processar_arquivo pelo
+    cliente de testes do Django e segue o redirecionamento até a página do
+    resultado, do upload até a página renderizada. Fora dos testes, deve
+    ser executada dentro de ambiente_isolado(), como em executar().
+
+    Antes de cada envio, o resultado do arquivo é removido do cache, da
+    memória do processo e do histórico, para que todas as repetições façam
+    a análise completa; os demais resultados guardados não são afetados.
+
+    Returns:
+        tuple: (função, preparação)
+    """
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.test import Client
+    from django.urls import resolve, reverse
+
+    from .cache_resultados import calcular_hash, esquecer_resultado, gerar_id_resultado
+    from .models import Analise
+    from .servicos import AnalisadorSequencia
+
+    cliente = Client()
+    url = reverse('analisador:processar')
+    id_resultado = gerar_id_resultado(calcular_hash([dados]), AnalisadorSequencia())
+
+    def preparar():
+        esquecer_resultado(id_resultado)
+        Analise.objects.filter(id_resultado=id_resultado).delete()
+
+    def enviar():
+        resposta = cliente.post(url, {'arquivo': SimpleUploadedFile('benchmark.txt', dados)})
+        if resposta.status_code != 302:
+            raise RuntimeError(f'A view respondeu com status {resposta.status_code}')
+        if resolve(resposta['Location']).url_name != 'resultado':
+            # Erros na análise redirecionam para a página inicial
+            raise RuntimeError(f'A view redirecionou para {resposta["Location"]}, e não para o resultado')
+        resposta = cliente.get(resposta['Location'])
+        if resposta.status_code != 200:
+            raise RuntimeError(f'A página do resultado respondeu com status {resposta.status_code}')
+
+    return enviar, preparar
+
+
+def executar(cenarios: List[str], escala: float = 1.0, repeticoes: int = 3,
+             semente: int = 42, backends: Optional[List[str]] = None,
+             incluir_view: bool = True,
+             ao_medir: Optional[Callable[[Medicao], None]] = None) -> List[Medicao]:
+    """
+    Executa o benchmark nos cenários escolhidos.
+
+    Args:
+        cenarios: Nomes dos cenários (chaves de CENARIOS)
+        escala: Multiplica a quantidade de números (ou o tamanho) de cada cenário
+        repeticoes: Execuções cronometradas de cada operação
+        semente: Semente dos geradores, para que as entradas sejam reprodutíveis
+        backends: Backends medidos em processar_arquivo e processar_chunks
+        incluir_view: Se a view processar_arquivo também é medida (em
+            ambiente_isolado, com banco e cache temporários)
+        ao_medir: Função opcional chamada a cada medição concluída
+
+    Returns:
+        List[Medicao]: Medições, na ordem em que foram feitas
+    """
+    backends = backends or ['python', 'numpy']
+    medicoes = []
+
+    with ambiente_isolado() if incluir_view else nullcontext():
+        for cenario in cenarios:
+            dados = CENARIOS[cenario](escala, semente)
+            operacoes = operacoes_do_analisador(dados, backends)
+            if incluir_view:
+                operacoes['view_processar_arquivo'] = operacao_da_view(dados)
+
+            for operacao, (funcao, preparar) in operacoes.items():
+                tempo, pico = medir(funcao, repeticoes, preparar)
+                medicao = Medicao(cenario, operacao, round(tempo, 6), pico, len(dados))
+                medicoes.append(medicao)
+                if ao_medir is not None:
+                    ao_medir(medicao)
+
+    return medicoes
+
+
+def montar_baseline(medicoes: List[Medicao], parametros: dict) -> dict:
+    """
+    Monta o conteúdo do arquivo JSON de baseline.
+
+    Args:
+        medicoes: Medições de executar()
+        parametros: Escala, repetições e semente usados
+
+    Returns:
+        dict: Ambiente, parâmetros e medições indexadas por "cenario/operacao"
+    """
+    return {
+        'versao': VERSAO_BASELINE,
+        'criado_em': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'ambiente': {
+            'python': sys.version.split()[0],
+            'plataforma': platform.platform(),
+            'processador': platform.processor() or platform.machine(),
+        },
+        'parametros': parametros,
+        'medicoes': {medicao.chave: asdict(medicao) for medicao in medicoes},
+    }
+
+
+def comparar(baseline: dict, medicoes: List[Medicao], tolerancia: float) -> List[dict]:
+    """
+    Compara as medições com um baseline salvo anteriormente.
+
+    Args:
+        baseline: Conteúdo de um arquivo gerado por montar_baseline()
+        medicoes: Medições da execução atual
+        tolerancia: Aumento relativo aceito antes de considerar regressão (0.1 = 10%)
+
+    Returns:
+        List[dict]: Uma comparação por medição presente nos dois lados
+    """
+    anteriores = baseline.get('medicoes', {})
+    comparacoes = []
+
+    for medicao in medicoes:
+        anterior = anteriores.get(medicao.chave)
+        if anterior is None:
+            continue
+
+        razao_tempo = medicao.tempo_s / anterior['tempo_s'] if anterior['tempo_s'] else None
+        razao_memoria = (
+            medicao.pico_memoria_bytes / anterior['pico_memoria_bytes']
+            if anterior['pico_memoria_bytes'] else None
+        )
+        comparacoes.append({
+            'chave': medicao.chave,
+            'razao_tempo': razao_tempo,
+            'razao_memoria': razao_memoria,
+            'regressao': any(
+                razao is not None and razao > 1 + tolerancia
+                for razao in (razao_tempo, razao_memoria)
+            ),
+        })
+
+    return comparacoes
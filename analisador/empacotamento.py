@@ -0,0 +1,170 @@
+import zlib
+from typing import Iterable, Iterator, List, Tuple
+
+from .intervalos import Intervalo
+from .motor import SnapshotAnalise
+
+
+# Versão do formato binário, gravada no primeiro byte de cada blob
+VERSAO_FORMATO = 1
+
+
+def _escrever_varint(saida: bytearray, valor: int):
+    """
+    Acrescenta um inteiro de qualquer tamanho e sinal em formato varint.
+
+    O sinal é codificado em zigzag (0, -1, 1, -2... viram 0, 1, 2, 3...), de
+    modo que números pequenos, positivos ou negativos, ocupam poucos bytes.
+    """
+    valor = valor << 1 if valor >= 0 else (-valor << 1) - 1
+    while valor > 0x7F:
+        saida.append((valor & 0x7F) | 0x80)
+        valor >>= 7
+    saida.append(valor)
+
+
+def _ler_varints(dados: bytes) -> Iterator[int]:
+    """Percorre os inteiros gravados por _escrever_varint()."""
+    valor = 0
+    deslocamento = 0
+    for byte in dados:
+        valor |= (byte & 0x7F) << deslocamento
+        if byte & 0x80:
+            deslocamento += 7
+            continue
+        yield valor >> 1 if not valor & 1 else -((valor + 1) >> 1)
+        valor = 0
+        deslocamento = 0
+
+
+def _comprimir(conteudo: bytearray) -> bytes:
+    return bytes([VERSAO_FORMATO]) + zlib.compress(bytes(conteudo))
+
+
+def _descomprimir(blob: bytes) -> bytes:
+    blob = bytes(blob)
+    if not blob:
+        return b''
+    if blob[0] != VERSAO_FORMATO:
+        raise ValueError(f'Formato de blob desconhecido: {blob[0]}')
+    return zlib.decompress(blob[1:])
+
+
+def empacotar_intervalos(intervalos: Iterable[Intervalo]) -> bytes:
+    """
+    Empacota intervalos ordenados e disjuntos em um blob compacto.
+
+    Cada intervalo vira dois varints: a distância até o fim do intervalo
+    anterior e o comprimento. Em sequências reais os dois costumam ser
+    pequenos, e o resultado ainda passa pelo zlib.
+
+    Args:
+        intervalos: Intervalos em ordem crescente
+
+    Returns:
+        bytes: Blob com o formato versionado
+    """
+    conteudo = bytearray()
+    anterior = 0
+    for inicio, fim in intervalos:
+        _escrever_varint(conteudo, inicio - anterior)
+        _escrever_varint(conteudo, fim - inicio)
+        anterior = fim
+    return _comprimir(conteudo)
+
+
+def desempacotar_intervalos(blob: bytes) -> List[Intervalo]:
+    """
+    Reconstrói os intervalos de um blob gerado por empacotar_intervalos().
+
+    Returns:
+        List[Intervalo]: Intervalos em ordem crescente
+    """
+    valores = _ler_varints(_descomprimir(blob))
+    intervalos = []
+    anterior = 0
+    for distancia, comprimento in zip(valores, valores):
+        inicio = anterior + distancia
+        anterior = inicio + comprimento
+        intervalos.append((inicio, anterior))
+    return intervalos
+
+
+def empacotar_duplicados(duplicados: Iterable[Tuple[int, int]]) -> bytes:
+    """
+    Empacota pares (número, quantidade) ordenados por número.
+
+    Returns:
+        bytes: Blob com o formato versionado
+    """
+    conteudo = bytearray()
+    anterior = 0
+    for numero, quantidade in duplicados:
+        _escrever_varint(conteudo, numero - anterior)
+        _escrever_varint(conteudo, quantidade)
+        anterior = numero
+    return _comprimir(conteudo)
+
+
+def desempacotar_duplicados(blob: bytes) -> List[Tuple[int, int]]:
+    """
+    Reconstrói os pares de um blob gerado por empacotar_duplicados().
+
+    Returns:
+        List[Tuple[int, int]]: Pares (número, quantidade), ordenados por número
+    """
+    valores = _ler_varints(_descomprimir(blob))
+    duplicados = []
+    numero = 0
+    for distancia, quantidade in zip(valores, valores):
+        numero += distancia
+        duplicados.append((numero, quantidade))
+    return duplicados
+
+
+def empacotar_snapshot(snapshot: SnapshotAnalise) -> bytes:
+    """
+    Serializa o estado de uma análise (corridas, duplicados, total e
+    limite de gap) para ser guardado e retomado depois.
+
+    Args:
+        snapshot: SnapshotAnalise a serializar
+
+    Returns:
+        bytes: Estado no formato versionado
+    """
+    corridas = empacotar_intervalos(snapshot.corridas)
+    cabecalho = bytearray([VERSAO_FORMATO])
+    for valor in (snapshot.total, snapshot.limite_gap, len(corridas)):
+        _escrever_varint(cabecalho, valor)
+    return bytes(cabecalho) + corridas + empacotar_duplicados(snapshot.duplicados)
+
+
+def desempacotar_snapshot(dados: bytes) -> SnapshotAnalise:
+    """
+    Reconstrói uma análise serializada por empacotar_snapshot().
+
+    Returns:
+        SnapshotAnalise: Snapshot idêntico ao original
+
+    Raises:
+        ValueError: Se os dados não estiverem no formato esperado
+    """
+    dados = bytes(dados)
+    if not dados or dados[0] != VERSAO_FORMATO:
+        raise ValueError('Estado de análise em formato desconhecido')
+
+    try:
+        # O cabeçalho tem três varints; o último byte de cada um não tem o bit 0x80
+        posicao = 1
+        for _ in range(3):
+            while dados[posicao] & 0x80:
+                posicao += 1
+            posicao += 1
+        total, limite_gap, tamanho_corridas = _ler_varints(dados[1:posicao])
+
+        corridas = desempacotar_intervalos(dados[posicao:posicao + tamanho_corridas])
+        duplicados = desempacotar_duplicados(dados[posicao + tamanho_corridas:])
+    except (IndexError, zlib.error) as e:
+        raise ValueError(f'Estado de análise corrompido: {e}')
+    return SnapshotAnalise.criar(total, corridas, duplicados, limite_gap)
@@ -0,0 +1,248 @@
+import json
+import zlib
+from typing import Callable, Iterable, Iterator
+
+from .intervalos import expandir_intervalos, formatar_intervalo
+from .leitura import ler_mapeado
+
+
+# Tamanho dos blocos lidos do corpo do request
+TAMANHO_BLOCO = 64 * 1024
+
+# Quantidade de itens de uma lista serializados de uma vez na resposta em fluxo
+ITENS_POR_TRECHO = 10000
+
+# Listas do resultado que podem ser grandes e são enviadas aos poucos
+CHAVES_LISTAS = ('intervalos_encontrados', 'intervalos_faltantes', 'numeros_duplicados')
+
+
+# Formatos de exportação das listas do resultado
+FORMATOS_EXPORTACAO = ('csv', 'txt')
+
+
+class ConteudoMuitoGrande(ValueError):
+    """O conteúdo descomprimido ultrapassou o tamanho máximo permitido."""
+
+
+def ler_corpo(request, tamanho_bloco: int = TAMANHO_BLOCO) -> Iterator[bytes]:
+    """
+    Lê o corpo do request em blocos, sem carregá-lo inteiro em request.body.
+
+    Args:
+        request: HttpRequest com o conteúdo do arquivo no corpo
+
+    Returns:
+        Iterator[bytes]: Blocos do corpo, na ordem
+    """
+    while True:
+        bloco = request.read(tamanho_bloco)
+        if not bloco:
+            return
+        yield bloco
+
+
+def abrir_upload(arquivo) -> Callable[[], Iterator[bytes]]:
+    """
+    Escolhe a forma de ler um arquivo enviado.
+
+    Uploads maiores que FILE_UPLOAD_MAX_MEMORY_SIZE ficam em um arquivo
+    temporário (TemporaryUploadedFile) e são percorridos por mmap, sem
+    cópia para a memória do processo; os menores, já em memória, são lidos
+    pelos seus próprios chunks().
+
+    Args:
+        arquivo: UploadedFile recebido no request
+
+    Returns:
+        Callable: Função que retorna um novo iterador sobre os blocos do arquivo
+    """
+    if hasattr(arquivo, 'temporary_file_path'):
+        caminho = arquivo.temporary_file_path()
+        return lambda: ler_mapeado(caminho)
+    return arquivo.chunks
+
+
+def descomprimir_gzip(chunks: Iterable[bytes], limite_bytes: int) -> Iterator[bytes]:
+    """
+    Descomprime um fluxo gzip bloco a bloco.
+
+    Cada bloco comprimido gera no máximo ``TAMANHO_BLOCO`` bytes por vez, de
+    modo que um arquivo com alta taxa de compressão não ocupa memória de uma
+    só vez; o total descomprimido é limitado a ``limite_bytes``.
+
+    Args:
+        chunks: Blocos do conteúdo comprimido
+        limite_bytes: Tamanho máximo do conteúdo descomprimido
+
+    Returns:
+        Iterator[bytes]: Blocos do conteúdo descomprimido
+
+    Raises:
+        ConteudoMuitoGrande: Se o conteúdo descomprimido passar do limite
+        zlib.error: Se o conteúdo não for gzip válido
+    """
+    descompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    total = 0
+
+    for bloco in chunks:
+        dados = bloco
+        while dados:
+            saida = descompressor.decompress(dados, TAMANHO_BLOCO)
+            dados = descompressor.unconsumed_tail
+            total += len(saida)
+            if total > limite_bytes:
+                raise ConteudoMuitoGrande(
+                    f'Conteúdo descomprimido maior que o limite de {limite_bytes:,} bytes.'
+                )
+            if saida:
+                yield saida
+
+    saida = descompressor.flush()
+    if total + len(saida) > limite_bytes:
+        raise ConteudoMuitoGrande(
+            f'Conteúdo descomprimido maior que o limite de {limite_bytes:,} bytes.'
+        )
+    if saida:
+        yield saida
+
+
+def resultado_em_json(resultado: dict) -> Iterator[str]:
+    """
+    Serializa o resultado da análise em JSON, aos poucos.
+
+    Os campos pequenos saem primeiro; as listas potencialmente grandes
+    (intervalos e duplicados) são enviadas em trechos de ``ITENS_POR_TRECHO``
+    itens, sem montar a string JSON completa na memória.
+
+    Args:
+        resultado: Dicionário retornado por AnalisadorSequencia
+
+    Returns:
+        Iterator[str]: Trechos que, concatenados, formam um objeto JSON válido
+    """
+    pequenos = {k: v for k, v in resultado.items() if k not in CHAVES_LISTAS}
+    cabecalho = json.dumps(pequenos, ensure_ascii=False)
+    listas = [k for k in CHAVES_LISTAS if k in resultado]
+
+    if not listas:
+        yield cabecalho
+        return
+
+    # Reabre o objeto para acrescentar as listas
+    yield cabecalho[:-1] + (', ' if pequenos else '')
+
+    for posicao, chave in enumerate(listas):
+        yield ('' if posicao == 0 else ', ') + json.dumps(chave) + ': ['
+        itens = resultado[chave]
+        for inicio in range(0, len(itens), ITENS_POR_TRECHO):
+            trecho = ', '.join(
+                json.dumps(item, ensure_ascii=False)
+                for item in itens[inicio:inicio + ITENS_POR_TRECHO]
+            )
+            yield (', ' if inicio else '') + trecho
+        yield ']'
+
+    yield '}'
+
+
+def _linhas_exportacao(snapshot, lista: str, formato: str, expandir: bool) -> Iterator[str]:
+    """
+    Gera as linhas (sem quebra) de uma lista do resultado no formato pedido.
+
+    Returns:
+        Iterator[str]: Cabeçalho (no CSV) seguido de uma linha por item
+
+    Raises:
+        KeyError: Se a lista não existir
+    """
+    csv = formato == 'csv'
+
+    if lista in ('faltantes', 'encontrados'):
+        intervalos = snapshot.faltantes if lista == 'faltantes' else snapshot.corridas
+        if expandir:
+            if csv:
+                yield 'numero'
+            yield from map(str, expandir_intervalos(intervalos))
+        elif csv:
+            yield 'inicio,fim,quantidade'
+            for inicio, fim in intervalos:
+                yield f'{inicio},{fim},{fim - inicio + 1}'
+        else:
+            yield from map(formatar_intervalo, intervalos)
+
+    elif lista == 'duplicados':
+        if csv:
+            yield 'numero,quantidade'
+        separador = ',' if csv else '\t'
+        for numero, quantidade in snapshot.duplicados:
+            yield f'{numero}{separador}{quantidade}'
+
+    elif lista == 'gaps':
+        if csv:
+            yield 'primeiro_faltante,ultimo_faltante,tamanho_gap'
+            for inicio, fim in snapshot.gaps_grandes:
+                yield f'{inicio},{fim},{fim - inicio + 1}'
+        else:
+            yield from map(formatar_intervalo, snapshot.gaps_grandes)
+
+    else:
+        raise KeyError(lista)
+
+
+def exportar_lista(snapshot, lista: str, formato: str = 'csv', expandir: bool = False) -> Iterator[bytes]:
+    """
+    Exporta uma lista do resultado (faltantes, encontrados, duplicados ou
+    gaps) em CSV ou texto, aos poucos.
+
+    As linhas são geradas diretamente a partir do snapshot e enviadas em
+    trechos de ``ITENS_POR_TRECHO`` linhas, de modo que a exportação de
+    milhões de itens começa imediatamente e usa memória constante.
+
+    Args:
+        snapshot: SnapshotAnalise do resultado
+        lista: 'faltantes', 'encontrados', 'duplicados' ou 'gaps'
+        formato: 'csv' ou 'txt'
+        expandir: Para faltantes e encontrados, um número por linha em vez
+            de um intervalo por linha
+
+    Returns:
+        Iterator[bytes]: Trechos do arquivo, em UTF-8
+
+    Raises:
+        KeyError: Se a lista não existir
+    """
+    linhas = _linhas_exportacao(snapshot, lista, formato, expandir)
+    # Valida a lista antes do primeiro trecho, para que o erro não ocorra no meio da resposta
+    primeira = next(linhas, None)
+    if primeira is None:
+        return iter(())
+
+    def trechos():
+        trecho = [primeira]
+        for linha in linhas:
+            trecho.append(linha)
+            if len(trecho) >= ITENS_POR_TRECHO:
+                yield ('\n'.join(trecho) + '\n').encode()
+                trecho = []
+        if trecho:
+            yield ('\n'.join(trecho) + '\n').encode()
+
+    return trechos()
+
+
+def comprimir_gzip(trechos: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Comprime um fluxo em formato gzip, trecho a trecho.
+
+    Args:
+        trechos: Blocos de bytes do conteúdo
+
+    Returns:
+        Iterator[bytes]: Blocos do arquivo .gz
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for trecho in trechos:
+        saida = compressor.compress(trecho)
+        if saida:
+            yield saida
+    yield compressor.flush()
@@ -0,0 +1,78 @@
+import logging
+from typing import Optional
+
+from django.db import DatabaseError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+logger = logging.getLogger('analisador.historico')
+
+
+def registrar_analise(id_resultado: str, snapshot, nome_arquivo: str,
+                      hash_conteudo: Optional[str] = None):
+    """
+    Grava a análise no histórico, ou atualiza a data do último envio se o
+    mesmo resultado já estiver lá.
+
+    Falhas no banco não interrompem a análise: o resultado continua sendo
+    exibido normalmente e o erro é apenas registrado no log.
+
+    Args:
+        id_resultado: Id do resultado (hash do conteúdo e parâmetros)
+        snapshot: SnapshotAnalise de uma análise bem-sucedida
+        nome_arquivo: Nome exibido no histórico
+        hash_conteudo: SHA-256 do arquivo analisado, quando o resultado é a
+            análise de um arquivo inteiro; None para resultados derivados
+            (lotes, séries de um arquivo, acréscimos)
+    """
+    # Importado aqui: este módulo também é carregado nos processos do pool
+    # de lotes, onde os apps do Django não são inicializados
+    from .models import Analise
+
+    try:
+        with transaction.atomic():
+            atualizadas = Analise.objects.filter(id_resultado=id_resultado).update(
+                nome_arquivo=nome_arquivo[:255],
+                total_envios=F('total_envios') + 1,
+                enviada_em=timezone.now(),
+            )
+            if not atualizadas:
+                Analise.de_snapshot(id_resultado, hash_conteudo, nome_arquivo, snapshot).save()
+    except DatabaseError:
+        logger.warning('Não foi possível gravar a análise %s no histórico', id_resultado, exc_info=True)
+
+
+def carregar_snapshot_salvo(id_resultado: str):
+    """
+    Reconstrói o snapshot de uma análise guardada no histórico.
+
+    Returns:
+        Optional[SnapshotAnalise]: O snapshot, ou None se a análise não estiver no histórico
+    """
+    from .models import Analise
+
+    try:
+        analise = Analise.objects.filter(id_resultado=id_resultado).first()
+    except DatabaseError:
+        logger.warning('Não foi possível consultar o histórico', exc_info=True)
+        return None
+    return analise.snapshot() if analise is not None else None
+
+
+def obter_registro(id_resultado: str):
+    """
+    Busca o registro de uma análise no histórico, sem ler as corridas e os
+    duplicados.
+
+    Returns:
+        Optional[Analise]: O registro, ou None se a análise não estiver no
+        histórico ou o banco não puder ser consultado
+    """
+    from .models import Analise
+
+    try:
+        return Analise.objects.filter(id_resultado=id_resultado).defer('corridas', 'duplicados').first()
+    except DatabaseError:
+        logger.warning('Não foi possível consultar o histórico', exc_info=True)
+        return None
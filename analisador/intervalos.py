@@ -0,0 +1,149 @@
+from itertools import chain
+from typing import Iterable, Iterator, List, Tuple
+
+
+# Intervalo fechado de números consecutivos: (início, fim)
+Intervalo = Tuple[int, int]
+
+
+def formatar_intervalo(intervalo: Intervalo) -> str:
+    """
+    Formata um intervalo para exibição.
+
+    Args:
+        intervalo: Par (início, fim)
+
+    Returns:
+        str: "1001-1050" para intervalos, ou apenas "1001" para um número isolado
+    """
+    inicio, fim = intervalo
+    if inicio == fim:
+        return str(inicio)
+    return f"{inicio}-{fim}"
+
+
+def contar_numeros(intervalos: Iterable[Intervalo]) -> int:
+    """
+    Conta quantos números estão cobertos por uma lista de intervalos.
+
+    Args:
+        intervalos: Intervalos disjuntos
+
+    Returns:
+        int: Quantidade total de números
+    """
+    return sum(fim - inicio + 1 for inicio, fim in intervalos)
+
+
+def expandir_intervalos(intervalos: Iterable[Intervalo]) -> Iterator[int]:
+    """
+    Percorre, um a um, os números cobertos pelos intervalos.
+
+    Args:
+        intervalos: Intervalos em ordem crescente
+
+    Returns:
+        Iterator[int]: Números em ordem crescente
+    """
+    return chain.from_iterable(range(inicio, fim + 1) for inicio, fim in intervalos)
+
+
+def compactar_numeros(numeros: Iterable[int]) -> List[Intervalo]:
+    """
+    Agrupa números ordenados e distintos em intervalos consecutivos.
+
+    Args:
+        numeros: Números em ordem crescente, sem repetições
+
+    Returns:
+        List[Intervalo]: Intervalos correspondentes
+    """
+    intervalos = []
+    inicio = fim = None
+    for numero in numeros:
+        if fim is not None and numero == fim + 1:
+            fim = numero
+            continue
+        if fim is not None:
+            intervalos.append((inicio, fim))
+        inicio = fim = numero
+    if fim is not None:
+        intervalos.append((inicio, fim))
+    return intervalos
+
+
+def lacunas(corridas: Iterable[Intervalo]) -> Iterator[Intervalo]:
+    """
+    Percorre as lacunas entre corridas consecutivas (faltantes e gaps juntos).
+
+    Args:
+        corridas: Intervalos disjuntos em ordem crescente
+
+    Returns:
+        Iterator[Intervalo]: Lacunas em ordem crescente
+    """
+    anterior = None
+    for inicio, fim in corridas:
+        if anterior is not None and inicio > anterior + 1:
+            yield (anterior + 1, inicio - 1)
+        anterior = fim
+
+
+def intersecao_intervalos(a: Iterable[Intervalo], b: Iterable[Intervalo]) -> List[Intervalo]:
+    """
+    Calcula os números presentes nos dois conjuntos de intervalos.
+
+    Os dois lados são percorridos juntos, uma única vez, sem expandir os
+    intervalos em números.
+
+    Args:
+        a: Intervalos disjuntos em ordem crescente
+        b: Intervalos disjuntos em ordem crescente
+
+    Returns:
+        List[Intervalo]: Interseção, em ordem crescente
+    """
+    resultado = []
+    a, b = iter(a), iter(b)
+    atual_a, atual_b = next(a, None), next(b, None)
+    while atual_a is not None and atual_b is not None:
+        inicio = max(atual_a[0], atual_b[0])
+        fim = min(atual_a[1], atual_b[1])
+        if inicio <= fim:
+            resultado.append((inicio, fim))
+        # Avança o intervalo que termina primeiro
+        if atual_a[1] < atual_b[1]:
+            atual_a = next(a, None)
+        else:
+            atual_b = next(b, None)
+    return resultado
+
+
+def diferenca_intervalos(a: Iterable[Intervalo], b: Iterable[Intervalo]) -> List[Intervalo]:
+    """
+    Calcula os números presentes em ``a`` e ausentes em ``b``.
+
+    Args:
+        a: Intervalos disjuntos em ordem crescente
+        b: Intervalos disjuntos em ordem crescente
+
+    Returns:
+        List[Intervalo]: Diferença, em ordem crescente
+    """
+    resultado = []
+    b = iter(b)
+    atual_b = next(b, None)
+    for inicio, fim in a:
+        # Descarta os intervalos de ``b`` que terminam antes deste
+        while atual_b is not None and atual_b[1] < inicio:
+            atual_b = next(b, None)
+        while atual_b is not None and atual_b[0] <= fim:
+            if atual_b[0] > inicio:
+                resultado.append((inicio, atual_b[0] - 1))
+            inicio = atual_b[1] + 1
+            if inicio > fim:
+                break
+            atual_b = next(b, None)
+        if inicio <= fim:
+            resultado.append((inicio, fim))
+    return resultado
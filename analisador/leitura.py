@@ -0,0 +1,165 @@
+import mmap
+import os
+import re
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+# Padrão regex para encontrar números (incluindo negativos). Só dígitos
+# ASCII, como no tokenizador de bytes: o texto e os bytes do mesmo arquivo
+# produzem os mesmos números
+PADRAO_NUMEROS = re.compile(r'-?[0-9]+')
+PADRAO_NUMEROS_BYTES = re.compile(rb'-?[0-9]+')
+
+# Tamanho das fatias entregues ao tokenizador na leitura por mmap
+TAMANHO_FATIA_MMAP = 4 * 1024 * 1024
+
+# Byte que não pode fazer parte de um número: onde um arquivo pode ser cortado em trechos
+_SEPARADOR_BYTES = re.compile(rb'[^-0-9]')
+
+
+class TokenizadorNumeros:
+    """
+    Extrai números de um fluxo de blocos de bytes (por exemplo, os
+    chunks de um UploadedFile) sem carregar o arquivo inteiro na memória.
+    
+    Números divididos entre dois blocos consecutivos são preservados:
+    os dígitos no final de um bloco ficam retidos até a chegada do próximo.
+    Como os dígitos ASCII nunca fazem parte de sequências multibyte em
+    UTF-8, a leitura é feita diretamente sobre os bytes, sem decodificação.
+    """
+    
+    def __init__(self):
+        self._resto = b''
+        self.bytes_lidos = 0
+    
+    def alimentar(self, bloco: bytes) -> Iterator[int]:
+        """
+        Processa um bloco de bytes e retorna os números completos encontrados.
+        
+        Args:
+            bloco (bytes): Próximo bloco do arquivo
+            
+        Returns:
+            Iterator[int]: Números que terminam dentro do bloco
+        """
+        self.bytes_lidos += len(bloco)
+        dados = self._resto + bloco if self._resto else bytes(bloco)
+        
+        # Retém o número que pode continuar no próximo bloco
+        corte = len(dados.rstrip(b'0123456789'))
+        if corte and dados[corte - 1] == 0x2D:  # '-'
+            corte -= 1
+        self._resto = dados[corte:]
+        
+        return map(int, PADRAO_NUMEROS_BYTES.findall(dados, 0, corte))
+    
+    def finalizar(self) -> Iterator[int]:
+        """
+        Libera o número retido no final do fluxo, se houver.
+        
+        Returns:
+            Iterator[int]: Último número do arquivo
+        """
+        resto, self._resto = self._resto, b''
+        return map(int, PADRAO_NUMEROS_BYTES.findall(resto))
+
+
+def extrair_numeros_de_chunks(chunks: Iterable[bytes]) -> Iterator[int]:
+    """
+    Gera os números encontrados em uma sequência de blocos de bytes.
+    
+    Args:
+        chunks: Blocos de bytes, na ordem do arquivo
+        
+    Returns:
+        Iterator[int]: Números encontrados, um a um
+    """
+    tokenizador = TokenizadorNumeros()
+    for bloco in chunks:
+        yield from tokenizador.alimentar(bloco)
+    yield from tokenizador.finalizar()
+
+
+def ler_mapeado(origem: Union[str, os.PathLike, BinaryIO],
+                tamanho_fatia: int = TAMANHO_FATIA_MMAP,
+                inicio: int = 0, fim: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Percorre um arquivo em disco por meio de ``mmap``, em fatias de bytes.
+
+    O arquivo não é lido para a memória do processo nem decodificado: as
+    páginas são trazidas pelo sistema operacional conforme a varredura
+    avança (e podem ser descartadas depois), de modo que a memória usada
+    não cresce com o tamanho do arquivo.
+
+    Args:
+        origem: Caminho do arquivo ou arquivo binário já aberto (lido desde
+            o início). Arquivos sem descritor, como io.BytesIO ou objetos
+            sem ``fileno``, são lidos normalmente, em blocos.
+        tamanho_fatia: Tamanho de cada fatia entregue
+        inicio: Posição do primeiro byte a percorrer
+        fim: Posição logo após o último byte a percorrer (None para o fim do arquivo)
+
+    Returns:
+        Iterator[bytes]: Fatias do conteúdo, na ordem
+    """
+    if isinstance(origem, (str, os.PathLike)):
+        with open(origem, 'rb') as arquivo:
+            yield from ler_mapeado(arquivo, tamanho_fatia, inicio, fim)
+        return
+
+    try:
+        descritor = origem.fileno()
+    except (AttributeError, OSError):
+        descritor = None
+    tamanho = os.fstat(descritor).st_size if descritor is not None else 0
+
+    if not tamanho:
+        # Sem descritor (ou arquivo vazio, que não pode ser mapeado): leitura comum
+        origem.seek(inicio)
+        restante = float('inf') if fim is None else fim - inicio
+        while restante > 0:
+            bloco = origem.read(min(tamanho_fatia, restante))
+            if not bloco:
+                return
+            restante -= len(bloco)
+            yield bloco
+        return
+
+    fim = tamanho if fim is None else min(fim, tamanho)
+    with mmap.mmap(descritor, 0, access=mmap.ACCESS_READ) as mapa:
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mapa.madvise(mmap.MADV_SEQUENTIAL)
+        for posicao in range(inicio, fim, tamanho_fatia):
+            yield mapa[posicao:min(posicao + tamanho_fatia, fim)]
+
+
+def dividir_em_trechos(caminho: Union[str, os.PathLike], partes: int) -> List[Tuple[int, int]]:
+    """
+    Divide um arquivo em trechos de tamanhos parecidos que podem ser
+    analisados de forma independente.
+
+    Cada corte é adiantado até o primeiro byte que não pode fazer parte de
+    um número, de modo que nenhum número fica dividido entre dois trechos.
+    Arquivos com poucos separadores podem gerar menos trechos que ``partes``.
+
+    Args:
+        caminho: Caminho do arquivo
+        partes: Quantidade desejada de trechos
+
+    Returns:
+        List[Tuple[int, int]]: Posições (início, fim) de cada trecho, cobrindo o arquivo inteiro
+    """
+    tamanho = os.path.getsize(caminho)
+    if partes <= 1 or not tamanho:
+        return [(0, tamanho)]
+
+    cortes = [0]
+    with open(caminho, 'rb') as arquivo, mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+        for parte in range(1, partes):
+            separador = _SEPARADOR_BYTES.search(mapa, max(tamanho * parte // partes, cortes[-1]))
+            if separador is None:
+                break
+            if separador.start() > cortes[-1]:
+                cortes.append(separador.start())
+    cortes.append(tamanho)
+    return list(zip(cortes, cortes[1:]))
@@ -0,0 +1,379 @@
+import gzip
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+
+from django.conf import settings
+
+from .admissao import custo_resultado
+from .cache_resultados import (
+    calcular_hash, gerar_id_resultado, guardar_resumos, guardar_snapshot, obter_snapshot,
+)
+from .historico import registrar_analise
+from .leitura import dividir_em_trechos, ler_mapeado
+from .motor import SnapshotAnalise, combinar_snapshots, criar_motor
+from .servicos import AnalisadorSequencia
+
+
+# Extensão dos arquivos analisados, enviados diretamente ou dentro de um .zip
+EXTENSAO_ACEITA = '.txt'
+
+# Tamanho dos blocos lidos de arquivos locais
+TAMANHO_BLOCO = 1024 * 1024
+
+# Tamanho mínimo de cada trecho na análise de um arquivo em paralelo; abaixo
+# disso, o custo de distribuir o trabalho supera o ganho
+TAMANHO_MINIMO_TRECHO = 16 * 1024 * 1024
+
+
+class LoteInvalido(ValueError):
+    """Os arquivos enviados não formam um lote válido."""
+
+
+@dataclass
+class ArquivoLote:
+    """
+    Um arquivo do lote, já em disco, e o resumo da sua análise.
+    """
+    nome: str
+    caminho: str
+    hash_conteudo: Optional[str] = None
+    id_resultado: Optional[str] = None
+    snapshot: Optional[SnapshotAnalise] = None
+    erro: Optional[str] = None
+
+    def resumo(self) -> dict:
+        """
+        Resume a análise do arquivo para a tabela do lote.
+
+        Returns:
+            dict: Nome, id do resultado e estatísticas (ou o erro)
+        """
+        if self.snapshot is None:
+            return {'nome': self.nome, 'sucesso': False, 'erro': self.erro}
+
+        snapshot = self.snapshot
+        return {
+            'nome': self.nome,
+            'sucesso': True,
+            'id_resultado': self.id_resultado,
+            'total_numeros': snapshot.total,
+            'numeros_unicos': snapshot.total_unicos,
+            'total_faltantes': snapshot.total_faltantes,
+            'total_duplicados': len(snapshot.duplicados),
+            'menor': snapshot.menor,
+            'maior': snapshot.maior,
+        }
+
+
+_executor = None
+_lock = threading.Lock()
+
+
+def _obter_executor() -> ProcessPoolExecutor:
+    """
+    Cria o pool de processos no primeiro lote, usando a configuração do projeto.
+
+    Os processos são iniciados com ``spawn``: o servidor pode ter outras
+    threads rodando, e um ``fork`` copiaria locks no meio do uso.
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=getattr(settings, 'ANALISADOR_LOTE_WORKERS', None) or os.cpu_count(),
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+def _descartar_executor():
+    """Descarta um pool quebrado (processo encerrado à força), recriado no próximo lote."""
+    global _executor
+    with _lock:
+        _executor = None
+
+
+@contextmanager
+def ler_arquivos(uploads) -> Iterator[List[ArquivoLote]]:
+    """
+    Reúne os arquivos enviados em disco, abrindo os .zip e validando os tamanhos.
+
+    Nenhum arquivo é lido inteiro para a memória: uploads que o Django já
+    gravou em disco são usados onde estão, e os uploads pequenos e os
+    arquivos de dentro dos .zip são copiados em blocos para uma pasta
+    temporária, apagada ao sair do bloco ``with``. Os processos do pool
+    recebem apenas o caminho de cada arquivo.
+
+    Args:
+        uploads: Lista de UploadedFile (arquivos .txt ou .zip com arquivos .txt)
+
+    Returns:
+        Iterator[List[ArquivoLote]]: Arquivos .txt do lote, na ordem em que foram enviados
+
+    Raises:
+        LoteInvalido: Se um arquivo tiver extensão ou tamanho inválido, ou o lote for grande demais
+    """
+    limite_arquivo = settings.ANALISADOR_TAMANHO_MAXIMO
+    limite_lote = settings.ANALISADOR_LOTE_TAMANHO_MAXIMO
+    maximo_arquivos = settings.ANALISADOR_LOTE_MAXIMO_ARQUIVOS
+    arquivos = []
+    total_bytes = 0
+
+    with tempfile.TemporaryDirectory(prefix='lote-') as pasta:
+
+        def copiar(origem) -> str:
+            caminho = os.path.join(pasta, f'{len(arquivos)}{EXTENSAO_ACEITA}')
+            with open(caminho, 'wb') as destino:
+                shutil.copyfileobj(origem, destino, TAMANHO_BLOCO)
+            return caminho
+
+        def adicionar(nome, tamanho, gravar):
+            nonlocal total_bytes
+            if tamanho > limite_arquivo:
+                raise LoteInvalido(f'Arquivo muito grande: {nome}. Tamanho máximo permitido: {limite_arquivo // (1024 * 1024)}MB')
+            total_bytes += tamanho
+            if total_bytes > limite_lote:
+                raise LoteInvalido(f'Lote muito grande. Tamanho máximo permitido: {limite_lote // (1024 * 1024)}MB')
+            if len(arquivos) >= maximo_arquivos:
+                raise LoteInvalido(f'Lote com arquivos demais. Máximo permitido: {maximo_arquivos} arquivos')
+            arquivos.append(ArquivoLote(nome=nome, caminho=gravar()))
+
+        def gravar_upload(upload):
+            if hasattr(upload, 'temporary_file_path'):
+                return upload.temporary_file_path()
+            upload.seek(0)
+            return copiar(upload)
+
+        def gravar_membro(pacote, info):
+            # O leitor do .zip não entrega mais que o tamanho declarado
+            with pacote.open(info) as membro:
+                return copiar(membro)
+
+        for upload in uploads:
+            if upload.name.lower().endswith('.zip'):
+                try:
+                    with zipfile.ZipFile(upload) as pacote:
+                        for info in pacote.infolist():
+                            # Pastas e metadados do macOS não são arquivos do lote
+                            if info.is_dir() or info.filename.startswith('__MACOSX/'):
+                                continue
+                            if not info.filename.lower().endswith(EXTENSAO_ACEITA):
+                                continue
+                            # O tamanho declarado é verificado antes de descomprimir
+                            adicionar(f'{upload.name}/{info.filename}', info.file_size,
+                                      lambda: gravar_membro(pacote, info))
+                except zipfile.BadZipFile:
+                    raise LoteInvalido(f'Arquivo .zip inválido: {upload.name}')
+            elif upload.name.endswith(EXTENSAO_ACEITA):
+                adicionar(upload.name, upload.size, lambda: gravar_upload(upload))
+            else:
+                raise LoteInvalido(f'Extensão não suportada: {upload.name}. Envie arquivos .txt ou .zip')
+
+        if not arquivos:
+            raise LoteInvalido('Nenhum arquivo .txt foi encontrado no lote.')
+
+        yield arquivos
+
+
+def ler_caminho(caminho: str) -> Iterator[bytes]:
+    """
+    Lê um arquivo local em blocos: por mmap, ou descomprimindo arquivos ``.gz``.
+
+    Args:
+        caminho: Caminho do arquivo
+
+    Returns:
+        Iterator[bytes]: Blocos do conteúdo, na ordem
+    """
+    if not caminho.endswith('.gz'):
+        yield from ler_mapeado(caminho)
+        return
+
+    with gzip.open(caminho, 'rb') as arquivo:
+        while True:
+            bloco = arquivo.read(TAMANHO_BLOCO)
+            if not bloco:
+                return
+            yield bloco
+
+
+def analisar_caminho(caminho: str, limite_gap: int,
+                     backend: str = 'auto') -> Tuple[Optional[SnapshotAnalise], Optional[str]]:
+    """
+    Analisa um arquivo local em blocos, sem carregá-lo inteiro na memória.
+
+    Pode ser chamada em um processo do pool: recebe apenas o caminho e
+    devolve o snapshot, que é compacto.
+
+    Returns:
+        tuple: (snapshot, None) em caso de sucesso, ou (None, mensagem de erro)
+    """
+    analisador = AnalisadorSequencia(backend)
+    analisador.limite_gap = limite_gap
+    resultado = analisador.processar_chunks(ler_caminho(caminho))
+    if not resultado['sucesso']:
+        return None, resultado['erro']
+    return analisador.snapshot, None
+
+
+def _analisar_trecho(caminho: str, inicio: int, fim: int, limite_gap: int, backend: str):
+    """
+    Analisa um trecho de um arquivo local em um processo do pool.
+
+    Com o backend NumPy, a parcial volta em arrays (ParcialNumpy), que são
+    enviados de volta ao processo principal sem serializar tuplas e unidos
+    por unir_vetorizado.
+
+    Returns:
+        SnapshotAnalise ou ParcialNumpy: Análise parcial, só com os números
+        do trecho (pode ser vazia)
+    """
+    motor = criar_motor(backend)
+    for fatia in ler_mapeado(caminho, inicio=inicio, fim=fim):
+        motor.alimentar(fatia)
+    if hasattr(motor, 'concluir_parcial'):
+        return motor.concluir_parcial(limite_gap)
+    return motor.concluir(limite_gap)
+
+
+def analisar_caminho_em_trechos(caminho: str, limite_gap: int, executor, partes: int,
+                                backend: str = 'auto') -> Tuple[Optional[SnapshotAnalise], Optional[str]]:
+    """
+    Analisa um arquivo local grande dividindo-o em trechos analisados em paralelo.
+
+    O arquivo é cortado em até ``partes`` trechos, sempre entre dois
+    números (dividir_em_trechos). Cada processo do pool percorre o seu
+    trecho por mmap e devolve uma análise parcial compacta (corridas e
+    duplicados), e as parciais são combinadas por combinar_snapshots no
+    mesmo resultado da análise do arquivo inteiro: um número presente em
+    dois trechos é duplicado, como seria em uma só passada.
+
+    Arquivos ``.gz``, que não podem ser cortados, e arquivos com menos de
+    ``2 * TAMANHO_MINIMO_TRECHO`` bytes são analisados por analisar_caminho.
+
+    Args:
+        caminho: Caminho do arquivo
+        limite_gap: Tamanho a partir do qual uma lacuna é um gap grande
+        executor: Pool de processos que analisará os trechos
+        partes: Quantidade máxima de trechos
+        backend: Backend de análise usado em cada trecho
+
+    Returns:
+        tuple: (snapshot, None) em caso de sucesso, ou (None, mensagem de erro)
+    """
+    try:
+        if not caminho.endswith('.gz'):
+            partes = min(partes, os.path.getsize(caminho) // TAMANHO_MINIMO_TRECHO)
+        if caminho.endswith('.gz') or partes <= 1:
+            return analisar_caminho(caminho, limite_gap, backend)
+
+        futuros = [
+            executor.submit(_analisar_trecho, caminho, inicio, fim, limite_gap, backend)
+            for inicio, fim in dividir_em_trechos(caminho, partes)
+        ]
+        snapshot = combinar_snapshots((futuro.result() for futuro in futuros), limite_gap)
+    except Exception as e:
+        return None, f'Erro ao processar arquivo: {str(e)}'
+
+    if not snapshot.total:
+        return None, 'Nenhum número foi encontrado no arquivo.'
+    return snapshot, None
+
+
+def analisar_lote(analisador: AnalisadorSequencia, arquivos: List[ArquivoLote]) -> dict:
+    """
+    Analisa os arquivos em paralelo e combina os resultados em uma só sequência.
+
+    Cada arquivo é analisado em um processo do pool, aproveitando todos os
+    núcleos; arquivos já analisados antes são lidos do cache. A visão
+    combinada é a união de todos os arquivos, de modo que lacunas entre a
+    numeração de um arquivo e a do seguinte aparecem como faltantes, e
+    números repetidos em arquivos diferentes aparecem como duplicados.
+
+    Args:
+        analisador: Analisador que receberá o resultado combinado
+        arquivos: Arquivos reunidos por ler_arquivos()
+
+    Returns:
+        dict: Resultado da visão combinada, no mesmo formato de processar_chunks,
+        com o resumo de cada arquivo em ``arquivos`` (guardado também no cache,
+        para a página do resultado combinado)
+    """
+    pendentes = []
+    for arquivo in arquivos:
+        arquivo.hash_conteudo = calcular_hash(ler_mapeado(arquivo.caminho))
+        arquivo.id_resultado = gerar_id_resultado(arquivo.hash_conteudo, analisador)
+        arquivo.snapshot = obter_snapshot(arquivo.id_resultado)
+        if arquivo.snapshot is None:
+            pendentes.append(arquivo)
+
+    if len(pendentes) == 1:
+        # Um único arquivo não compensa o custo de iniciar outro processo
+        arquivo = pendentes[0]
+        arquivo.snapshot, arquivo.erro = analisar_caminho(arquivo.caminho, analisador.limite_gap, analisador.backend)
+    elif pendentes:
+        executor = _obter_executor()
+        futuros = [
+            executor.submit(analisar_caminho, arquivo.caminho, analisador.limite_gap, analisador.backend)
+            for arquivo in pendentes
+        ]
+        for arquivo, futuro in zip(pendentes, futuros):
+            try:
+                arquivo.snapshot, arquivo.erro = futuro.result()
+            except BrokenProcessPool:
+                _descartar_executor()
+                arquivo.erro = 'O processo de análise foi encerrado inesperadamente (memória insuficiente?).'
+            except Exception as e:
+                arquivo.erro = f'Erro inesperado ao processar arquivo: {str(e)}'
+
+    for arquivo in pendentes:
+        if arquivo.snapshot is not None:
+            guardar_snapshot(arquivo.id_resultado, arquivo.snapshot)
+    for arquivo in arquivos:
+        if arquivo.snapshot is not None:
+            registrar_analise(arquivo.id_resultado, arquivo.snapshot, arquivo.nome, arquivo.hash_conteudo)
+
+    validos = [arquivo for arquivo in arquivos if arquivo.snapshot is not None]
+    if not validos:
+        resultado = {
+            'sucesso': False,
+            'erro': 'Nenhum arquivo do lote pôde ser analisado.',
+            'intervalos_encontrados': [],
+            'intervalos_faltantes': [],
+            'numeros_duplicados': [],
+            'estatisticas': {},
+        }
+    else:
+        # Mesmo conjunto de arquivos, em qualquer ordem, gera o mesmo id
+        ids = sorted(arquivo.id_resultado for arquivo in validos)
+        id_combinado = gerar_id_resultado(calcular_hash([b'lote:', '|'.join(ids).encode()]), analisador)
+
+        snapshot = obter_snapshot(id_combinado)
+        if snapshot is None:
+            # A visão combinada é montada neste processo: reservar a memória
+            # dela pelo total e pelo intervalo de todos os arquivos
+            analisador.reserva.ampliar(custo_resultado(
+                sum(arquivo.snapshot.total for arquivo in validos),
+                min(arquivo.snapshot.menor for arquivo in validos),
+                max(arquivo.snapshot.maior for arquivo in validos),
+            ))
+            snapshot = combinar_snapshots((arquivo.snapshot for arquivo in validos), analisador.limite_gap)
+            guardar_snapshot(id_combinado, snapshot)
+
+        resultado = analisador.carregar_snapshot(snapshot)
+        resultado['id_resultado'] = id_combinado
+        registrar_analise(id_combinado, snapshot, 'Lote: ' + ', '.join(arquivo.nome for arquivo in validos))
+
+    resultado['arquivos'] = [arquivo.resumo() for arquivo in arquivos]
+    if validos:
+        guardar_resumos('lote', id_combinado, resultado['arquivos'])
+    return resultado
@@ -0,0 +1,280 @@
+import csv
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analisador.empacotamento import desempacotar_snapshot, empacotar_snapshot
+from analisador.fluxos import resultado_em_json
+from analisador.lote import TAMANHO_BLOCO, analisar_caminho, analisar_caminho_em_trechos, ler_caminho
+from analisador.motor import BACKENDS
+from analisador.series import FormatoInvalido, FormatoSeries
+from analisador.servicos import AnalisadorSequencia
+
+
+# Colunas da saída em CSV: uma linha de resumo por arquivo
+COLUNAS_CSV = (
+    'arquivo', 'sucesso', 'total_numeros_arquivo', 'numeros_unicos', 'menor', 'maior',
+    'total_faltantes', 'total_duplicados', 'total_gaps_grandes', 'percentual_completo', 'erro',
+)
+
+
+def _ler_stdin():
+    """Lê a entrada padrão em blocos de bytes."""
+    entrada = sys.stdin.buffer
+    while True:
+        bloco = entrada.read(TAMANHO_BLOCO)
+        if not bloco:
+            return
+        yield bloco
+
+
+class Command(BaseCommand):
+    help = (
+        'Analisa arquivos locais (ou a entrada padrão) e escreve o resultado em JSON ou CSV. '
+        'Os arquivos são lidos em blocos, com memória limitada, e podem ser analisados em paralelo.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'caminhos', nargs='*', metavar='ARQUIVO',
+            help='Arquivos a analisar (.txt ou .gz). Sem arquivos, ou com "-", lê a entrada padrão.',
+        )
+        parser.add_argument(
+            '--formato', choices=('json', 'csv'), default='json',
+            help='json: um objeto completo por linha (JSON Lines); csv: uma linha de resumo por arquivo.',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help=(
+                'Processos usados para analisar os arquivos em paralelo (padrão: 1). '
+                'Com um único arquivo grande, o arquivo é dividido em trechos analisados em paralelo.'
+            ),
+        )
+        parser.add_argument(
+            '--limite-gap', type=int, default=AnalisadorSequencia().limite_gap,
+            help='Lacunas maiores que isso são reportadas como gaps grandes.',
+        )
+        parser.add_argument(
+            '--backend', choices=BACKENDS, default='auto',
+            help='Backend de análise (padrão: auto).',
+        )
+        parser.add_argument(
+            '--estado', metavar='ARQUIVO',
+            help=(
+                'Modo incremental: acrescenta os números dos arquivos à análise salva neste '
+                'arquivo (criado se não existir), grava o estado atualizado e escreve um único '
+                'resultado para a sequência completa.'
+            ),
+        )
+        parser.add_argument(
+            '--previa', action='store_true',
+            help=(
+                'Prévia aproximada: lê cada arquivo uma vez, com memória constante, e estima as '
+                'estatísticas sem a análise exata (marcadas com "estimativa").'
+            ),
+        )
+        series = parser.add_mutually_exclusive_group()
+        series.add_argument(
+            '--series-regex', metavar='PADRAO',
+            help=(
+                'Arquivos com várias séries: expressão regular com os grupos (?P<serie>...) e '
+                '(?P<numero>...), aplicada a cada linha. Cada série gera um resultado.'
+            ),
+        )
+        series.add_argument(
+            '--series-colunas', metavar='SERIE,NUMERO',
+            help='Arquivos com várias séries em CSV: colunas (a partir de 1) da série e do número.',
+        )
+        parser.add_argument(
+            '--delimitador', default=',',
+            help='Delimitador das colunas em --series-colunas (padrão: vírgula).',
+        )
+
+    def handle(self, *args, **options):
+        caminhos = options['caminhos'] or ['-']
+        if caminhos.count('-') > 1:
+            raise CommandError('A entrada padrão ("-") só pode ser lida uma vez.')
+        if options['workers'] < 1:
+            raise CommandError('--workers deve ser pelo menos 1.')
+
+        limite_gap = options['limite_gap']
+        backend = options['backend']
+        saida_csv = None
+        if options['formato'] == 'csv':
+            saida_csv = csv.writer(self.stdout, lineterminator='\n')
+            saida_csv.writerow(COLUNAS_CSV)
+
+        formato = self._formato_series(options)
+        if options['previa']:
+            if formato is not None or options['estado']:
+                raise CommandError('--previa não pode ser usado com --estado, --series-regex ou --series-colunas.')
+            falhas = 0
+            for caminho in caminhos:
+                nome = 'stdin' if caminho == '-' else caminho
+                analisador = AnalisadorSequencia(backend)
+                analisador.limite_gap = limite_gap
+                resultado = analisador.estimar_chunks(_ler_stdin() if caminho == '-' else ler_caminho(caminho))
+                falhas += not resultado['sucesso']
+                self._escrever(saida_csv, nome, resultado)
+            if falhas:
+                raise CommandError(f'{falhas} de {len(caminhos)} arquivo(s) não puderam ser analisados.')
+            return
+
+        if formato is not None:
+            if options['estado']:
+                raise CommandError('--estado não pode ser usado com --series-regex ou --series-colunas.')
+            analises = self._analisar_series(caminhos, formato, options)
+        elif options['estado']:
+            analises = zip(['estado'], [self._acrescentar_ao_estado(caminhos, options)])
+            caminhos = [options['estado']]
+        else:
+            analises = zip(caminhos, self._analisar(caminhos, options))
+
+        falhas = 0
+        for caminho, (snapshot, erro) in analises:
+            analisador = AnalisadorSequencia(backend)
+            analisador.limite_gap = limite_gap
+            if snapshot is not None:
+                resultado = analisador.carregar_snapshot(snapshot)
+            else:
+                falhas += 1
+                resultado = {'sucesso': False, 'erro': erro, 'estatisticas': {}}
+
+            self._escrever(saida_csv, 'stdin' if caminho == '-' else caminho, resultado)
+
+        if falhas:
+            raise CommandError(f'{falhas} de {len(caminhos)} arquivo(s) não puderam ser analisados.')
+
+    def _formato_series(self, options):
+        """Monta o formato de linha de --series-regex ou --series-colunas, se informado."""
+        try:
+            if options['series_regex'] is not None:
+                return FormatoSeries(padrao=options['series_regex'])
+            if options['series_colunas'] is not None:
+                try:
+                    coluna_serie, coluna_numero = map(int, options['series_colunas'].split(','))
+                except ValueError:
+                    raise FormatoInvalido('--series-colunas deve ter a forma SERIE,NUMERO (por exemplo, 1,3).')
+                return FormatoSeries(
+                    coluna_serie=coluna_serie, coluna_numero=coluna_numero, delimitador=options['delimitador'],
+                )
+        except FormatoInvalido as e:
+            raise CommandError(str(e))
+        return None
+
+    def _analisar_series(self, caminhos, formato, options):
+        """
+        Analisa cada arquivo separando as séries; gera um resultado por série,
+        com o nome "arquivo [série X]".
+
+        Os arquivos são lidos em sequência, neste processo; dentro de cada
+        arquivo, as séries são consolidadas em paralelo.
+        """
+        for caminho in caminhos:
+            nome = 'stdin' if caminho == '-' else caminho
+            analisador = AnalisadorSequencia(options['backend'])
+            analisador.limite_gap = options['limite_gap']
+            resultado = analisador.processar_series(
+                _ler_stdin() if caminho == '-' else ler_caminho(caminho), formato
+            )
+            if not resultado['sucesso']:
+                yield nome, (None, resultado['erro'])
+                continue
+            for serie, snapshot in analisador.series.items():
+                yield f'{nome} [série {serie}]', (snapshot, None)
+
+    def _acrescentar_ao_estado(self, caminhos, options):
+        """
+        Acrescenta as análises dos arquivos ao estado salvo e grava o resultado.
+
+        Returns:
+            tuple: (snapshot da sequência completa, None) ou (None, mensagem de erro)
+        """
+        caminho_estado = options['estado']
+        snapshot = None
+        if os.path.exists(caminho_estado):
+            try:
+                with open(caminho_estado, 'rb') as arquivo:
+                    snapshot = desempacotar_snapshot(arquivo.read())
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Não foi possível ler o estado {caminho_estado}: {e}')
+
+        for caminho, (acrescimo, erro) in zip(caminhos, self._analisar(caminhos, options)):
+            if acrescimo is None:
+                # O estado só é gravado se todos os acréscimos forem aplicados
+                return None, f'{caminho}: {erro}'
+            snapshot = acrescimo if snapshot is None else snapshot.acrescentar(acrescimo)
+
+        # Grava em um arquivo temporário e substitui, para não corromper o estado
+        temporario = f'{caminho_estado}.tmp'
+        with open(temporario, 'wb') as arquivo:
+            arquivo.write(empacotar_snapshot(snapshot))
+        os.replace(temporario, caminho_estado)
+        return snapshot, None
+
+    def _analisar(self, caminhos, options):
+        """
+        Analisa os arquivos na ordem dada, em paralelo quando ``--workers`` > 1.
+
+        A entrada padrão é sempre lida neste processo; os demais arquivos são
+        abertos pelos próprios processos do pool. Um único arquivo é dividido
+        em trechos, um por processo.
+        """
+        limite_gap = options['limite_gap']
+        backend = options['backend']
+        workers = min(options['workers'], len(caminhos))
+
+        if len(caminhos) == 1 and caminhos[0] != '-' and options['workers'] > 1:
+            with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+                yield analisar_caminho_em_trechos(caminhos[0], limite_gap, executor, options['workers'], backend)
+            return
+
+        def analisar_stdin():
+            analisador = AnalisadorSequencia(backend)
+            analisador.limite_gap = limite_gap
+            resultado = analisador.processar_chunks(_ler_stdin())
+            if not resultado['sucesso']:
+                return None, resultado['erro']
+            return analisador.snapshot, None
+
+        if workers == 1:
+            for caminho in caminhos:
+                yield analisar_stdin() if caminho == '-' else analisar_caminho(caminho, limite_gap, backend)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futuros = [
+                None if caminho == '-' else executor.submit(analisar_caminho, caminho, limite_gap, backend)
+                for caminho in caminhos
+            ]
+            for futuro in futuros:
+                yield analisar_stdin() if futuro is None else futuro.result()
+
+    def _escrever(self, saida_csv, nome, resultado):
+        """Escreve o resultado de um arquivo no formato escolhido."""
+        if saida_csv is not None:
+            self._escrever_csv(saida_csv, nome, resultado)
+        else:
+            for trecho in resultado_em_json({'arquivo': nome, **resultado}):
+                self.stdout.write(trecho, ending='')
+            self.stdout.write('')
+
+    def _escrever_csv(self, saida_csv, nome, resultado):
+        """Escreve a linha de resumo de um arquivo."""
+        estatisticas = resultado['estatisticas']
+        intervalo = resultado.get('intervalo', {})
+        saida_csv.writerow([
+            nome,
+            int(resultado['sucesso']),
+            estatisticas.get('total_numeros_arquivo', ''),
+            estatisticas.get('numeros_unicos', ''),
+            intervalo.get('menor', ''),
+            intervalo.get('maior', ''),
+            estatisticas.get('total_faltantes', ''),
+            estatisticas.get('total_duplicados', ''),
+            estatisticas.get('total_gaps_grandes', ''),
+            estatisticas.get('percentual_completo', ''),
+            resultado.get('erro', ''),
+        ])
@@ -0,0 +1,106 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analisador import desempenho
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede tempo e pico de memória da análise em cenários sintéticos reprodutíveis '
+        'e grava (ou compara com) um baseline em JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cenarios', nargs='+', choices=sorted(desempenho.CENARIOS),
+            default=list(desempenho.CENARIOS),
+            help='Cenários a executar (padrão: todos).',
+        )
+        parser.add_argument(
+            '--escala', type=float, default=1.0,
+            help='Multiplica o tamanho de cada cenário (ex.: 0.1 para uma execução rápida).',
+        )
+        parser.add_argument(
+            '--repeticoes', type=int, default=3,
+            help='Execuções cronometradas de cada operação; vale o menor tempo.',
+        )
+        parser.add_argument('--semente', type=int, default=42, help='Semente dos geradores.')
+        parser.add_argument(
+            '--backends', nargs='+', choices=('python', 'numpy'), default=['python', 'numpy'],
+            help='Backends medidos em processar_arquivo e processar_chunks.',
+        )
+        parser.add_argument(
+            '--sem-view', action='store_true',
+            help='Não mede a view processar_arquivo pelo cliente de testes.',
+        )
+        parser.add_argument('--salvar', metavar='ARQUIVO', help='Grava as medições como baseline em JSON.')
+        parser.add_argument('--comparar', metavar='ARQUIVO', help='Compara as medições com um baseline salvo.')
+        parser.add_argument(
+            '--tolerancia', type=float, default=0.10,
+            help='Aumento relativo aceito na comparação antes de acusar regressão (padrão: 0.10).',
+        )
+
+    def handle(self, *args, **options):
+        if options['repeticoes'] < 1:
+            raise CommandError('--repeticoes deve ser pelo menos 1.')
+
+        baseline = None
+        if options['comparar']:
+            try:
+                with open(options['comparar'], encoding='utf-8') as arquivo:
+                    baseline = json.load(arquivo)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Não foi possível ler o baseline: {e}')
+
+        self.stdout.write(f"{'cenário/operação':<50} {'tempo (s)':>10} {'pico (MB)':>10}")
+        medicoes = desempenho.executar(
+            options['cenarios'],
+            escala=options['escala'],
+            repeticoes=options['repeticoes'],
+            semente=options['semente'],
+            backends=options['backends'],
+            incluir_view=not options['sem_view'],
+            ao_medir=lambda m: self.stdout.write(
+                f'{m.chave:<50} {m.tempo_s:>10.4f} {m.pico_memoria_bytes / 1024 / 1024:>10.2f}'
+            ),
+        )
+
+        if options['salvar']:
+            parametros = {
+                'escala': options['escala'],
+                'repeticoes': options['repeticoes'],
+                'semente': options['semente'],
+            }
+            with open(options['salvar'], 'w', encoding='utf-8') as arquivo:
+                json.dump(desempenho.montar_baseline(medicoes, parametros), arquivo, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Baseline gravado em {options['salvar']}"))
+
+        if baseline is not None:
+            self._mostrar_comparacao(baseline, medicoes, options['tolerancia'])
+
+    def _mostrar_comparacao(self, baseline, medicoes, tolerancia):
+        """Mostra a variação de cada medição e falha se houver regressões."""
+        comparacoes = desempenho.comparar(baseline, medicoes, tolerancia)
+        if not comparacoes:
+            self.stdout.write(self.style.WARNING('Nenhuma medição em comum com o baseline.'))
+            return
+
+        def formatar(razao):
+            return f'{razao:>9.2f}x' if razao is not None else f"{'-':>10}"
+
+        self.stdout.write('')
+        self.stdout.write(f"{'cenário/operação':<50} {'tempo':>10} {'memória':>10}")
+        for comparacao in comparacoes:
+            linha = (
+                f"{comparacao['chave']:<50} {formatar(comparacao['razao_tempo'])} "
+                f"{formatar(comparacao['razao_memoria'])}"
+            )
+            self.stdout.write(self.style.ERROR(linha) if comparacao['regressao'] else linha)
+
+        regressoes = sum(1 for c in comparacoes if c['regressao'])
+        if regressoes:
+            raise CommandError(
+                f'{regressoes} medição(ões) pioraram mais de {tolerancia:.0%} em relação ao baseline.'
+            )
+        self.stdout.write(self.style.SUCCESS('Sem regressões em relação ao baseline.'))
@@ -0,0 +1,152 @@
+import json
+import logging
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from typing import List, Optional
+
+from django.conf import settings
+
+
+logger = logging.getLogger('analisador.metricas')
+
+
+class MedidorEtapas:
+    """
+    Registra o tempo, a quantidade de números e, opcionalmente, o pico de
+    memória de cada etapa de uma análise.
+
+    Com ``memoria=True``, o tracemalloc é ligado durante a medição (se ainda
+    não estiver) e o pico de cada etapa é a maior alocação acima do que já
+    estava em uso no início dela. O tracemalloc é global ao processo: com
+    várias análises simultâneas, os picos são aproximados.
+    """
+
+    ativo = True
+
+    def __init__(self, memoria: bool = False):
+        self.memoria = memoria
+        self.etapas: List[dict] = []
+        self._inicio = time.perf_counter()
+        self._iniciou_tracemalloc = False
+        if memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou_tracemalloc = True
+
+    @contextmanager
+    def etapa(self, nome: str, numeros: Optional[int] = None):
+        """
+        Mede o bloco ``with`` como uma etapa.
+
+        Args:
+            nome: Nome da etapa (usado também no cabeçalho Server-Timing)
+            numeros: Quantidade de números tratados, se já conhecida
+
+        Returns:
+            dict: Registro da etapa, que pode ser completado dentro do bloco
+            (por exemplo, com ``registro['numeros']``)
+        """
+        registro = {'nome': nome, 'tempo_ms': 0.0, 'numeros': numeros}
+        medir_memoria = self.memoria and tracemalloc.is_tracing()
+        if medir_memoria:
+            em_uso, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+
+        inicio = time.perf_counter()
+        try:
+            yield registro
+        finally:
+            registro['tempo_ms'] = round((time.perf_counter() - inicio) * 1000, 3)
+            if medir_memoria:
+                _, pico = tracemalloc.get_traced_memory()
+                registro['pico_memoria_bytes'] = max(pico - em_uso, 0)
+            self.etapas.append(registro)
+
+    def adicionar(self, nome: str, tempo_ms: float, numeros: Optional[int] = None):
+        """Registra uma etapa cujo tempo foi medido separadamente."""
+        self.etapas.append({'nome': nome, 'tempo_ms': round(tempo_ms, 3), 'numeros': numeros})
+
+    def como_dict(self) -> dict:
+        """
+        Resume as medições para o dicionário de resultado.
+
+        Returns:
+            dict: Etapas na ordem em que terminaram e o tempo total decorrido
+        """
+        return {
+            'etapas': list(self.etapas),
+            'tempo_total_ms': round((time.perf_counter() - self._inicio) * 1000, 3),
+        }
+
+    def server_timing(self) -> str:
+        """
+        Monta o valor do cabeçalho ``Server-Timing``.
+
+        Returns:
+            str: Ex.: ``leitura;dur=12.5, analise;dur=30.1``
+        """
+        return ', '.join(f"{e['nome']};dur={e['tempo_ms']}" for e in self.etapas)
+
+    def finalizar(self, **contexto) -> dict:
+        """
+        Encerra a medição e registra uma linha de log estruturada (JSON).
+
+        Args:
+            **contexto: Campos extras do log, como o nome do arquivo ou a view
+
+        Returns:
+            dict: Mesmo formato de como_dict()
+        """
+        if self._iniciou_tracemalloc:
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+
+        metricas = self.como_dict()
+        logger.info(json.dumps({'evento': 'analise', **contexto, **metricas}, ensure_ascii=False))
+        return metricas
+
+
+class MedidorNulo:
+    """
+    Medidor usado quando as métricas estão desligadas: não mede nada e
+    tem custo praticamente nulo.
+    """
+
+    ativo = False
+
+    def etapa(self, nome: str, numeros: Optional[int] = None):
+        return nullcontext({})
+
+    def adicionar(self, nome: str, tempo_ms: float, numeros: Optional[int] = None):
+        pass
+
+    def como_dict(self) -> dict:
+        return {}
+
+    def server_timing(self) -> str:
+        return ''
+
+    def finalizar(self, **contexto) -> dict:
+        return {}
+
+
+MEDIDOR_NULO = MedidorNulo()
+
+
+def criar_medidor():
+    """
+    Cria o medidor de uma análise conforme a configuração do projeto.
+
+    Returns:
+        MedidorEtapas se ANALISADOR_METRICAS estiver ligado, ou MEDIDOR_NULO
+    """
+    if not getattr(settings, 'ANALISADOR_METRICAS', False):
+        return MEDIDOR_NULO
+    return MedidorEtapas(memoria=getattr(settings, 'ANALISADOR_METRICAS_MEMORIA', False))
+
+
+def aplicar_server_timing(resposta, medidor):
+    """Adiciona o cabeçalho Server-Timing à resposta, se configurado."""
+    if medidor.ativo and getattr(settings, 'ANALISADOR_METRICAS_SERVER_TIMING', False):
+        resposta['Server-Timing'] = medidor.server_timing()
+    return resposta
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Analise',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('id_resultado', models.CharField(max_length=100, unique=True)),
+                ('hash_conteudo', models.CharField(blank=True, max_length=64, null=True)),
+                ('nome_arquivo', models.CharField(max_length=255)),
+                ('limite_gap', models.IntegerField()),
+                ('total_numeros', models.BigIntegerField()),
+                ('numeros_unicos', models.BigIntegerField()),
+                ('total_faltantes', models.BigIntegerField()),
+                ('total_duplicados', models.BigIntegerField()),
+                ('menor', models.TextField()),
+                ('maior', models.TextField()),
+                ('corridas', models.BinaryField()),
+                ('duplicados', models.BinaryField()),
+                ('criada_em', models.DateTimeField(auto_now_add=True)),
+                ('enviada_em', models.DateTimeField(auto_now=True)),
+                ('total_envios', models.PositiveIntegerField(default=1)),
+            ],
+            options={
+                'verbose_name': 'análise',
+                'verbose_name_plural': 'análises',
+                'ordering': ['-enviada_em'],
+                'indexes': [models.Index(fields=['hash_conteudo'], name='analise_hash_idx'), models.Index(fields=['-enviada_em'], name='analise_enviada_idx')],
+            },
+        ),
+    ]
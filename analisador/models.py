@@ -1,3 +1,99 @@
+from typing import Optional
+
 from django.db import models
 
-# Create your models here.
+from .empacotamento import (
+    desempacotar_duplicados, desempacotar_intervalos, empacotar_duplicados, empacotar_intervalos,
+)
+from .motor import SnapshotAnalise
+
+
+class Analise(models.Model):
+    """
+    Resultado de uma análise guardado no histórico.
+
+    Os números não são gravados um a um: as corridas de números presentes e
+    os duplicados ficam em blobs binários compactos (ver empacotamento.py).
+    Faltantes e gaps são as lacunas entre as corridas e são recalculados ao
+    reabrir, sem reprocessar o arquivo.
+    """
+
+    id_resultado = models.CharField(max_length=100, unique=True)
+    # SHA-256 do arquivo analisado; nulo nos resultados derivados (lotes,
+    # séries de um arquivo, acréscimos), que não correspondem a um arquivo
+    hash_conteudo = models.CharField(max_length=64, null=True, blank=True)
+    nome_arquivo = models.CharField(max_length=255)
+    limite_gap = models.IntegerField()
+    total_numeros = models.BigIntegerField()
+    numeros_unicos = models.BigIntegerField()
+    total_faltantes = models.BigIntegerField()
+    total_duplicados = models.BigIntegerField()
+    # Menor e maior número, como texto: podem não caber em 64 bits
+    menor = models.TextField()
+    maior = models.TextField()
+    corridas = models.BinaryField()
+    duplicados = models.BinaryField()
+    criada_em = models.DateTimeField(auto_now_add=True)
+    enviada_em = models.DateTimeField(auto_now=True)
+    total_envios = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        ordering = ['-enviada_em']
+        indexes = [
+            models.Index(fields=['hash_conteudo'], name='analise_hash_idx'),
+            models.Index(fields=['-enviada_em'], name='analise_enviada_idx'),
+        ]
+        verbose_name = 'análise'
+        verbose_name_plural = 'análises'
+
+    def __str__(self):
+        return f'{self.nome_arquivo} ({self.enviada_em:%d/%m/%Y %H:%M})'
+
+    @property
+    def percentual_completo(self) -> float:
+        tamanho_esperado = int(self.maior) - int(self.menor) + 1
+        return round(self.numeros_unicos / tamanho_esperado * 100, 2)
+
+    @classmethod
+    def de_snapshot(cls, id_resultado: str, hash_conteudo: Optional[str], nome_arquivo: str,
+                    snapshot: SnapshotAnalise) -> 'Analise':
+        """
+        Cria (sem salvar) o registro de uma análise a partir do seu snapshot.
+
+        Args:
+            id_resultado: Id do resultado (hash do conteúdo e parâmetros)
+            hash_conteudo: SHA-256 do conteúdo do arquivo, ou None para um resultado derivado
+            nome_arquivo: Nome exibido no histórico
+            snapshot: Snapshot de uma análise bem-sucedida
+
+        Returns:
+            Analise: Registro pronto para ser salvo
+        """
+        return cls(
+            id_resultado=id_resultado,
+            hash_conteudo=hash_conteudo,
+            nome_arquivo=nome_arquivo[:255],
+            limite_gap=snapshot.limite_gap,
+            total_numeros=snapshot.total,
+            numeros_unicos=snapshot.total_unicos,
+            total_faltantes=snapshot.total_faltantes,
+            total_duplicados=len(snapshot.duplicados),
+            menor=str(snapshot.menor),
+            maior=str(snapshot.maior),
+            corridas=empacotar_intervalos(snapshot.corridas),
+            duplicados=empacotar_duplicados(snapshot.duplicados),
+        )
+
+    def snapshot(self) -> SnapshotAnalise:
+        """
+        Reconstrói o snapshot da análise a partir dos blobs.
+
+        Returns:
+            SnapshotAnalise: Snapshot idêntico ao da análise original
+        """
+        return SnapshotAnalise.criar(
+            self.total_numeros,
+            desempacotar_intervalos(self.corridas),
+            desempacotar_duplicados(self.duplicados),
+            self.limite_gap,
+        )
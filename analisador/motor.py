@@ -0,0 +1,707 @@
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from dataclasses import dataclass
+from itertools import chain, islice, repeat
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .intervalos import Intervalo, contar_numeros
+from .leitura import TokenizadorNumeros
+
+
+# Tamanho máximo do bitmap (em números cobertos, 1 byte por número).
+# Intervalos maiores que isso são tratados no modo esparso.
+LIMITE_BITMAP = 1 << 25
+
+# Tamanho inicial do bitmap, ajustado conforme os números chegam
+TAMANHO_INICIAL_BITMAP = 1 << 12
+
+# Números acumulados no modo esparso antes de serem ordenados em um bloco
+TAMANHO_BLOCO_ESPARSO = 1 << 18
+
+# Blocos ordenados de tamanho parecido (mesmo nível) que, juntos, são
+# intercalados em um bloco do nível seguinte
+BLOCOS_POR_NIVEL_ESPARSO = 16
+
+# Limites (corridas mais duplicados) a partir dos quais _unir usa o NumPy
+MINIMO_UNIAO_VETORIZADA = 1 << 12
+
+# Faixa de valores guardados em array('q'); os demais ficam em uma lista à parte
+_MENOR_INT64 = -(1 << 63)
+_MAIOR_INT64 = (1 << 63) - 1
+
+# Backends aceitos por criar_motor()
+BACKENDS = ('auto', 'python', 'numpy')
+
+# Chaves de busca binária em tuplas de intervalos e de pares (número, quantidade)
+_inicio = itemgetter(0)
+_fim = itemgetter(1)
+
+
+def _nivel_bloco(bloco: array) -> int:
+    """Nível de um bloco ordenado: k para até TAMANHO_BLOCO_ESPARSO * BLOCOS_POR_NIVEL_ESPARSO ** (k + 1) números."""
+    nivel = 0
+    limite = TAMANHO_BLOCO_ESPARSO * BLOCOS_POR_NIVEL_ESPARSO
+    while len(bloco) >= limite:
+        nivel += 1
+        limite *= BLOCOS_POR_NIVEL_ESPARSO
+    return nivel
+
+
+class NumerosEsparsos:
+    """
+    Números do modo esparso, guardados com 8 bytes cada em blocos
+    ordenados de ``array('q')``.
+
+    Os números chegam em um bloco pendente; quando ele enche, é ordenado e
+    guardado. Duplicados e corridas são obtidos no final, em uma única
+    varredura sobre a intercalação dos blocos ordenados, sem contador por
+    número. Valores fora da faixa de 64 bits (raros) ficam em uma lista à parte.
+    """
+
+    def __init__(self):
+        self.blocos: List[array] = []
+        self.pendentes = array('q')
+        self.grandes: List[int] = []
+        self.total = 0
+
+    def adicionar_varios(self, numeros: Iterable[int]):
+        """
+        Registra os números de um fluxo.
+
+        Args:
+            numeros: Números em qualquer ordem
+        """
+        numeros = iter(numeros)
+        while True:
+            lote = list(islice(numeros, TAMANHO_BLOCO_ESPARSO - len(self.pendentes)))
+            if not lote:
+                return
+            self.total += len(lote)
+            try:
+                self.pendentes.extend(array('q', lote))
+            except OverflowError:
+                self.pendentes.extend(n for n in lote if _MENOR_INT64 <= n <= _MAIOR_INT64)
+                self.grandes.extend(n for n in lote if not _MENOR_INT64 <= n <= _MAIOR_INT64)
+            if len(self.pendentes) >= TAMANHO_BLOCO_ESPARSO:
+                self._fechar_bloco()
+
+    def intervalo(self) -> Optional[Intervalo]:
+        """
+        Menor e maior número registrados, sem consolidar os blocos.
+
+        Returns:
+            Optional[Intervalo]: (menor, maior), ou None se não houver números
+        """
+        extremos = [n for bloco in self.blocos for n in (bloco[0], bloco[-1])] + self.grandes
+        if self.pendentes:
+            extremos += [min(self.pendentes), max(self.pendentes)]
+        if not extremos:
+            return None
+        return min(extremos), max(extremos)
+
+    def _fechar_bloco(self):
+        """
+        Ordena o bloco pendente e o guarda junto aos demais.
+
+        Os blocos ficam em níveis de tamanho (_nivel_bloco), dos maiores para
+        os menores. Ao juntar BLOCOS_POR_NIVEL_ESPARSO blocos de um nível,
+        eles são intercalados em um bloco do nível seguinte; os blocos
+        maiores ficam de fora. Cada número é intercalado uma vez por nível
+        (log do total), e a varredura final tem poucos iteradores.
+        """
+        if self.pendentes:
+            self.blocos.append(array('q', sorted(self.pendentes)))
+            self.pendentes = array('q')
+        blocos = self.blocos
+        while (len(blocos) >= BLOCOS_POR_NIVEL_ESPARSO
+               and _nivel_bloco(blocos[-BLOCOS_POR_NIVEL_ESPARSO]) == _nivel_bloco(blocos[-1])):
+            intercalados = array('q', heapq.merge(*blocos[-BLOCOS_POR_NIVEL_ESPARSO:]))
+            del blocos[-BLOCOS_POR_NIVEL_ESPARSO:]
+            blocos.append(intercalados)
+
+    def consolidar(self) -> Tuple[List[Intervalo], List[Tuple[int, int]]]:
+        """
+        Percorre todos os números em ordem, uma única vez.
+
+        Returns:
+            tuple: (corridas em ordem crescente, pares (número, quantidade) ordenados por número)
+        """
+        self._fechar_bloco()
+        fontes = self.blocos + ([sorted(self.grandes)] if self.grandes else [])
+        ordenados = fontes[0] if len(fontes) == 1 else heapq.merge(*fontes)
+
+        corridas: List[Intervalo] = []
+        duplicados: List[Tuple[int, int]] = []
+        inicio = anterior = None
+        quantidade = 0
+        for n in ordenados:
+            if n == anterior:
+                quantidade += 1
+                continue
+            if quantidade > 1:
+                duplicados.append((anterior, quantidade))
+            quantidade = 1
+            if anterior is None or n != anterior + 1:
+                if anterior is not None:
+                    corridas.append((inicio, anterior))
+                inicio = n
+            anterior = n
+
+        if anterior is not None:
+            corridas.append((inicio, anterior))
+            if quantidade > 1:
+                duplicados.append((anterior, quantidade))
+        return corridas, duplicados
+
+
+class MapaPresenca:
+    """
+    Estrutura de análise baseada em um bitmap compacto (bytearray) indexado
+    por ``n - base``.
+
+    Cada número recebido marca sua posição no bitmap; repetições vão para um
+    dicionário à parte, que só guarda os números que realmente se repetem.
+    A partir do bitmap, números presentes, faltantes e gaps são encontrados
+    em uma única varredura (feita em C por ``bytearray.find``), sem ordenar
+    os números.
+
+    Se o intervalo coberto ultrapassar ``limite_bitmap``, a estrutura passa
+    para o modo esparso (NumerosEsparsos, 8 bytes por número), evitando
+    alocar um bitmap gigante para sequências com poucos números muito
+    distantes entre si.
+    """
+
+    def __init__(self, limite_bitmap: int = LIMITE_BITMAP):
+        self.limite_bitmap = limite_bitmap
+        self.base = 0
+        self.bits = bytearray()
+        self.repetidos: Dict[int, int] = {}
+        self.esparso = None
+        self._consolidado = None
+        self.total = 0
+
+    def adicionar_varios(self, numeros: Iterable[int]):
+        """
+        Registra os números de um fluxo.
+
+        Args:
+            numeros: Números na ordem em que aparecem no arquivo
+        """
+        numeros = iter(numeros)
+        total = 0
+
+        if self.esparso is None:
+            bits = self.bits
+            base = self.base
+            tamanho = len(bits)
+            repetidos = self.repetidos
+
+            for n in numeros:
+                total += 1
+                i = n - base
+                if not 0 <= i < tamanho:
+                    if not self._ajustar_bitmap(n):
+                        break
+                    bits = self.bits
+                    base = self.base
+                    tamanho = len(bits)
+                    i = n - base
+                if bits[i]:
+                    repetidos[n] = repetidos.get(n, 1) + 1
+                else:
+                    bits[i] = 1
+            else:
+                self.total += total
+                return
+
+            # O intervalo ficou grande demais: o número atual já foi contado
+            # e entra no modo esparso junto com o restante do fluxo.
+            self.total += total - 1
+            numeros = chain((n,), numeros)
+
+        antes = self.esparso.total
+        self._consolidado = None
+        self.esparso.adicionar_varios(numeros)
+        self.total += self.esparso.total - antes
+
+    def _ajustar_bitmap(self, n: int) -> bool:
+        """
+        Amplia o bitmap para cobrir ``n``, dobrando de tamanho a cada ajuste.
+
+        Args:
+            n: Número fora da área coberta pelo bitmap
+
+        Returns:
+            bool: False se a estrutura passou para o modo esparso
+        """
+        bits = self.bits
+        primeiro = bits.find(1)
+
+        if primeiro == -1:
+            # Bitmap vazio: centraliza no primeiro número
+            tamanho = min(TAMANHO_INICIAL_BITMAP, self.limite_bitmap)
+            self.bits = bytearray(tamanho)
+            self.base = n - tamanho // 2
+            return True
+
+        ultimo = bits.rfind(1)
+        menor = min(self.base + primeiro, n)
+        maior = max(self.base + ultimo, n)
+        amplitude = maior - menor + 1
+
+        if amplitude > self.limite_bitmap:
+            self._converter_para_esparso()
+            return False
+
+        novo_tamanho = min(self.limite_bitmap, max(2 * len(bits), 2 * amplitude))
+        folga = novo_tamanho - amplitude
+        # A folga fica do lado para onde a sequência está crescendo
+        nova_base = menor - folga if n < self.base else menor
+
+        novo = bytearray(novo_tamanho)
+        inicio = self.base + primeiro - nova_base
+        novo[inicio:inicio + ultimo - primeiro + 1] = bits[primeiro:ultimo + 1]
+
+        self.bits = novo
+        self.base = nova_base
+        return True
+
+    def _converter_para_esparso(self):
+        """Transfere o conteúdo do bitmap para o modo esparso."""
+        esparso = NumerosEsparsos()
+        for inicio, fim in self._corridas_bitmap():
+            esparso.adicionar_varios(range(inicio, fim + 1))
+        for numero, quantidade in self.repetidos.items():
+            # A primeira ocorrência já veio do bitmap
+            esparso.adicionar_varios([numero] * (quantidade - 1))
+
+        self.esparso = esparso
+        self.bits = bytearray()
+        self.repetidos = {}
+
+    def intervalo(self) -> Optional[Intervalo]:
+        """
+        Menor e maior número registrados.
+
+        Returns:
+            Optional[Intervalo]: (menor, maior), ou None se não houver números
+        """
+        if self.esparso is not None:
+            return self.esparso.intervalo()
+        primeiro = self.bits.find(1)
+        if primeiro == -1:
+            return None
+        return self.base + primeiro, self.base + self.bits.rfind(1)
+
+    def _corridas_bitmap(self) -> Iterator[Intervalo]:
+        """Percorre o bitmap pulando direto de uma corrida para a próxima."""
+        bits = self.bits
+        base = self.base
+        tamanho = len(bits)
+
+        i = bits.find(1)
+        while i != -1:
+            j = bits.find(0, i)
+            if j == -1:
+                j = tamanho
+            yield base + i, base + j - 1
+            i = bits.find(1, j)
+
+    def corridas(self) -> Iterator[Intervalo]:
+        """
+        Percorre os números presentes agrupados em intervalos consecutivos.
+
+        Returns:
+            Iterator[Intervalo]: Pares (início, fim), em ordem crescente
+        """
+        if self.esparso is None:
+            yield from self._corridas_bitmap()
+            return
+
+        yield from self._consolidar_esparso()[0]
+
+    def duplicados(self) -> List[Tuple[int, int]]:
+        """
+        Lista os números que aparecem mais de uma vez.
+
+        Returns:
+            List[Tuple[int, int]]: Pares (número, quantidade), ordenados por número
+        """
+        if self.esparso is None:
+            return sorted(self.repetidos.items())
+        return self._consolidar_esparso()[1]
+
+    def _consolidar_esparso(self) -> Tuple[List[Intervalo], List[Tuple[int, int]]]:
+        """Varre o modo esparso uma única vez, para corridas() e duplicados()."""
+        if self._consolidado is None:
+            self._consolidado = self.esparso.consolidar()
+        return self._consolidado
+
+
+@dataclass(frozen=True)
+class SnapshotAnalise:
+    """
+    Resultado imutável de uma análise, calculado uma única vez.
+
+    Guarda os números distintos em ordem, compactados em corridas de
+    números consecutivos, junto com as contagens, duplicados e lacunas.
+    Todas as consultas feitas depois da análise (estatísticas, relatórios,
+    listas para cópia) leem daqui, sem refazer ordenações ou varreduras.
+    """
+
+    total: int
+    total_unicos: int
+    menor: Optional[int]
+    maior: Optional[int]
+    corridas: Tuple[Intervalo, ...]
+    duplicados: Tuple[Tuple[int, int], ...]
+    faltantes: Tuple[Intervalo, ...]
+    total_faltantes: int
+    gaps_grandes: Tuple[Intervalo, ...]
+    limite_gap: int
+
+    @classmethod
+    def criar(cls, total: int, corridas: Iterable[Intervalo],
+              duplicados: Iterable[Tuple[int, int]], limite_gap: int) -> 'SnapshotAnalise':
+        """
+        Monta o snapshot a partir das corridas, separando as lacunas
+        pequenas (faltantes) das grandes (gaps) em uma única passada.
+
+        Args:
+            total: Quantidade de números lidos, contando repetições
+            corridas: Intervalos de números presentes, em ordem crescente
+            duplicados: Pares (número, quantidade), ordenados por número
+            limite_gap: Tamanho a partir do qual uma lacuna é um gap grande
+
+        Returns:
+            SnapshotAnalise: Snapshot pronto para consulta
+        """
+        corridas = tuple(corridas)
+        faltantes = []
+        gaps_grandes = []
+        total_unicos = 0
+        anterior = None
+
+        for inicio, fim in corridas:
+            total_unicos += fim - inicio + 1
+            if anterior is not None:
+                lacuna = (anterior + 1, inicio - 1)
+                if inicio - anterior - 1 > limite_gap:
+                    gaps_grandes.append(lacuna)
+                else:
+                    faltantes.append(lacuna)
+            anterior = fim
+
+        return cls(
+            total=total,
+            total_unicos=total_unicos,
+            menor=corridas[0][0] if corridas else None,
+            maior=corridas[-1][1] if corridas else None,
+            corridas=corridas,
+            duplicados=tuple(duplicados),
+            faltantes=tuple(faltantes),
+            total_faltantes=contar_numeros(faltantes),
+            gaps_grandes=tuple(gaps_grandes),
+            limite_gap=limite_gap,
+        )
+
+    @classmethod
+    def de_mapa(cls, mapa: MapaPresenca, limite_gap: int) -> 'SnapshotAnalise':
+        """
+        Congela o estado de um MapaPresenca.
+
+        Args:
+            mapa: Mapa com todos os números do arquivo
+            limite_gap: Tamanho a partir do qual uma lacuna é um gap grande
+
+        Returns:
+            SnapshotAnalise: Snapshot da análise
+        """
+        return cls.criar(mapa.total, mapa.corridas(), mapa.duplicados(), limite_gap)
+
+    @property
+    def tamanho_esperado(self) -> int:
+        """Quantidade de números entre o menor e o maior, inclusive."""
+        if self.menor is None:
+            return 0
+        return self.maior - self.menor + 1
+
+    def acrescentar(self, novo: 'SnapshotAnalise') -> 'SnapshotAnalise':
+        """
+        Soma a este snapshot os números de outra análise (por exemplo, os
+        números novos de uma sequência que cresce), sem refazer a análise.
+
+        Só é recalculada a janela de corridas que os números novos tocam: as
+        corridas, duplicados e lacunas fora dela são reaproveitados, e as
+        posições da janela são encontradas por busca binária. O trabalho em
+        Python é proporcional aos números novos (e à janela), não à
+        sequência inteira; o restante é apenas a cópia das tuplas.
+
+        Args:
+            novo: Análise dos números acrescentados
+
+        Returns:
+            SnapshotAnalise: Snapshot equivalente a analisar tudo de uma vez
+        """
+        if not novo.total:
+            return self
+        if not self.total:
+            return SnapshotAnalise.criar(novo.total, novo.corridas, novo.duplicados, self.limite_gap)
+
+        corridas = self.corridas
+        # Corridas da base que se sobrepõem aos números novos ou encostam neles
+        lo = bisect_left(corridas, novo.menor - 1, key=_fim)
+        hi = bisect_right(corridas, novo.maior + 1, key=_inicio)
+        janela = corridas[lo:hi]
+
+        inicio_janela = min(janela[0][0], novo.menor) if janela else novo.menor
+        fim_janela = max(janela[-1][1], novo.maior) if janela else novo.maior
+        d_lo = bisect_left(self.duplicados, inicio_janela, key=_inicio)
+        d_hi = bisect_right(self.duplicados, fim_janela, key=_inicio)
+
+        corridas_janela, duplicados_janela = _unir(
+            (janela, novo.corridas), (self.duplicados[d_lo:d_hi], novo.duplicados)
+        )
+
+        # Lacunas entre a corrida anterior à janela e a seguinte
+        antes = corridas[lo - 1] if lo > 0 else None
+        depois = corridas[hi] if hi < len(corridas) else None
+        vizinhas = ([antes] if antes else []) + corridas_janela + ([depois] if depois else [])
+        faltantes_janela = []
+        gaps_janela = []
+        for (_, fim_anterior), (inicio, _) in zip(vizinhas, vizinhas[1:]):
+            lacuna = (fim_anterior + 1, inicio - 1)
+            if inicio - fim_anterior - 1 > self.limite_gap:
+                gaps_janela.append(lacuna)
+            else:
+                faltantes_janela.append(lacuna)
+
+        def trocar_lacunas(lacunas, novas):
+            i = bisect_right(lacunas, antes[1], key=_inicio) if antes else 0
+            j = bisect_left(lacunas, depois[0], key=_inicio) if depois else len(lacunas)
+            return lacunas[:i] + tuple(novas) + lacunas[j:], lacunas[i:j]
+
+        faltantes, faltantes_removidos = trocar_lacunas(self.faltantes, faltantes_janela)
+        gaps_grandes, _ = trocar_lacunas(self.gaps_grandes, gaps_janela)
+        corridas = corridas[:lo] + tuple(corridas_janela) + corridas[hi:]
+
+        return SnapshotAnalise(
+            total=self.total + novo.total,
+            total_unicos=self.total_unicos - contar_numeros(janela) + contar_numeros(corridas_janela),
+            menor=corridas[0][0],
+            maior=corridas[-1][1],
+            corridas=corridas,
+            duplicados=self.duplicados[:d_lo] + tuple(duplicados_janela) + self.duplicados[d_hi:],
+            faltantes=faltantes,
+            total_faltantes=(
+                self.total_faltantes - contar_numeros(faltantes_removidos) + contar_numeros(faltantes_janela)
+            ),
+            gaps_grandes=gaps_grandes,
+            limite_gap=self.limite_gap,
+        )
+
+
+def _materializar(grupo) -> Sequence:
+    """Guarda um grupo de pares em uma sequência; arrays do NumPy são mantidos."""
+    return grupo if hasattr(grupo, '__len__') else list(grupo)
+
+
+def _como_lista(grupo) -> Sequence:
+    """Converte um array do NumPy (ParcialNumpy) em lista de ints do Python."""
+    return grupo.tolist() if hasattr(grupo, 'tolist') else grupo
+
+
+def _unir(grupos_corridas: Iterable[Iterable[Intervalo]],
+          grupos_duplicados: Iterable[Iterable[Tuple[int, int]]]) -> Tuple[List[Intervalo], List[Tuple[int, int]]]:
+    """
+    Une grupos de corridas (cada grupo vindo de uma análise) e recalcula os duplicados.
+
+    As corridas são unidas por uma varredura sobre os seus limites, que
+    também informa quantos grupos cobrem cada trecho: um número presente
+    em mais de um grupo é duplicado na união, somando-se ainda as
+    repetições que já tinha dentro de cada grupo. Uniões grandes são
+    feitas por unir_vetorizado, quando o NumPy está instalado.
+
+    Returns:
+        tuple: (corridas unidas, pares (número, quantidade) ordenados por número)
+    """
+    grupos_corridas = [_materializar(corridas) for corridas in grupos_corridas]
+    grupos_duplicados = [_materializar(duplicados) for duplicados in grupos_duplicados]
+
+    limites = sum(map(len, grupos_corridas)) + sum(map(len, grupos_duplicados))
+    if limites >= MINIMO_UNIAO_VETORIZADA:
+        try:
+            from .motor_numpy import unir_vetorizado
+            return unir_vetorizado(grupos_corridas, grupos_duplicados)
+        except (ImportError, OverflowError):
+            pass
+
+    eventos = []
+    for corridas in grupos_corridas:
+        for inicio, fim in _como_lista(corridas):
+            eventos.append((inicio, 1))
+            eventos.append((fim + 1, -1))
+
+    extras = Counter()  # Ocorrências além da primeira, dentro de cada grupo
+    for duplicados in grupos_duplicados:
+        for numero, quantidade in _como_lista(duplicados):
+            extras[numero] += quantidade - 1
+
+    eventos.sort()
+    corridas: List[Intervalo] = []
+    sobrepostos = []  # Trechos [início, fim) cobertos por mais de um grupo
+    cobertura = 0
+    anterior = None
+
+    for posicao, delta in eventos:
+        if cobertura and posicao > anterior:
+            # Trecho [anterior, posicao - 1] coberto por ``cobertura`` grupos
+            if corridas and corridas[-1][1] + 1 == anterior:
+                corridas[-1] = (corridas[-1][0], posicao - 1)
+            else:
+                corridas.append((anterior, posicao - 1))
+            if cobertura > 1:
+                sobrepostos.append((anterior, posicao, cobertura))
+        cobertura += delta
+        anterior = posicao
+
+    # Intercala os trechos sobrepostos com as repetições internas, gerando
+    # os pares de cada trecho por zip() em vez de um número de cada vez
+    extras = sorted(extras.items())
+    duplicados: List[Tuple[int, int]] = []
+    i = 0
+    for inicio, fim, cobertura in sobrepostos:
+        j = bisect_left(extras, inicio, lo=i, key=_inicio)
+        duplicados.extend((numero, extra + 1) for numero, extra in extras[i:j])
+        i = bisect_left(extras, fim, lo=j, key=_inicio)
+        for numero, extra in extras[j:i]:
+            duplicados.extend(zip(range(inicio, numero), repeat(cobertura)))
+            duplicados.append((numero, cobertura + extra))
+            inicio = numero + 1
+        duplicados.extend(zip(range(inicio, fim), repeat(cobertura)))
+    duplicados.extend((numero, extra + 1) for numero, extra in extras[i:])
+
+    return corridas, duplicados
+
+
+def combinar_snapshots(snapshots: Iterable[SnapshotAnalise], limite_gap: int) -> SnapshotAnalise:
+    """
+    Combina várias análises como se todos os números estivessem em um só arquivo.
+
+    Args:
+        snapshots: Análises a combinar (ou ParcialNumpy), em qualquer ordem
+        limite_gap: Tamanho a partir do qual uma lacuna é um gap grande
+
+    Returns:
+        SnapshotAnalise: Snapshot da sequência combinada
+    """
+    snapshots = list(snapshots)
+    corridas, duplicados = _unir(
+        (snapshot.corridas for snapshot in snapshots),
+        (snapshot.duplicados for snapshot in snapshots),
+    )
+    return SnapshotAnalise.criar(sum(s.total for s in snapshots), corridas, duplicados, limite_gap)
+
+
+class MotorPython:
+    """
+    Backend puro Python: tokenizador de bytes alimentando um MapaPresenca.
+
+    É sempre disponível e serve de referência para os demais backends, que
+    devem produzir exatamente o mesmo SnapshotAnalise.
+    """
+
+    nome = 'python'
+
+    def __init__(self):
+        self.tokenizador = TokenizadorNumeros()
+        self.mapa = MapaPresenca()
+
+    @property
+    def total(self) -> int:
+        """Quantidade de números recebidos até agora."""
+        return self.mapa.total
+
+    @property
+    def bytes_lidos(self) -> int:
+        """Quantidade de bytes recebidos até agora."""
+        return self.tokenizador.bytes_lidos
+
+    def alimentar(self, bloco: bytes):
+        """
+        Processa o próximo bloco de bytes do arquivo.
+
+        Args:
+            bloco: Bloco de bytes, na ordem do arquivo
+        """
+        self.mapa.adicionar_varios(self.tokenizador.alimentar(bloco))
+
+    def adicionar_varios(self, numeros: Iterable[int]):
+        """
+        Registra números já convertidos para int.
+
+        Args:
+            numeros: Números na ordem em que aparecem no arquivo
+        """
+        self.mapa.adicionar_varios(numeros)
+
+    def finalizar_leitura(self):
+        """Registra o número que estava retido no fim do último bloco."""
+        self.mapa.adicionar_varios(self.tokenizador.finalizar())
+
+    def intervalo(self) -> Optional[Intervalo]:
+        """
+        Menor e maior número registrados até agora.
+
+        Returns:
+            Optional[Intervalo]: (menor, maior), ou None se não houver números
+        """
+        return self.mapa.intervalo()
+
+    def concluir(self, limite_gap: int) -> SnapshotAnalise:
+        """
+        Encerra a leitura e congela o resultado.
+
+        Args:
+            limite_gap: Tamanho a partir do qual uma lacuna é um gap grande
+
+        Returns:
+            SnapshotAnalise: Snapshot da análise
+        """
+        self.finalizar_leitura()
+        return SnapshotAnalise.de_mapa(self.mapa, limite_gap)
+
+
+def criar_motor(backend: str = 'auto'):
+    """
+    Cria o backend de análise.
+
+    Com ``'auto'``, o backend vetorizado com NumPy é usado quando a
+    biblioteca está instalada; caso contrário, o backend puro Python.
+
+    Args:
+        backend: ``'auto'``, ``'python'`` ou ``'numpy'``
+
+    Returns:
+        MotorPython ou MotorNumpy: Backend pronto para receber dados
+
+    Raises:
+        ValueError: Se o backend não for reconhecido
+        ImportError: Se ``'numpy'`` for pedido sem o NumPy instalado
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {backend!r}. Use um de {', '.join(BACKENDS)}.")
+
+    if backend != 'python':
+        try:
+            from .motor_numpy import MotorNumpy
+        except ImportError:
+            if backend == 'numpy':
+                raise
+        else:
+            return MotorNumpy()
+
+    return MotorPython()
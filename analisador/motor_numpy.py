@@ -0,0 +1,408 @@
+from itertools import islice
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .intervalos import Intervalo
+from .motor import MotorPython, SnapshotAnalise
+
+
+# Dígitos aceitos na conversão vetorizada; números maiores passam por int()
+MAX_DIGITOS_VETORIZADO = 18
+
+# Os blocos recebidos são agrupados até este tamanho antes da conversão,
+# diluindo o custo fixo de cada chamada ao NumPy
+TAMANHO_LOTE_BYTES = 1 << 22
+
+# Quantidade de números pendentes que dispara a compactação com np.unique
+LIMITE_PENDENTES = 1 << 23
+
+_POTENCIAS_10 = 10 ** np.arange(MAX_DIGITOS_VETORIZADO, dtype=np.int64)
+_INT64 = np.iinfo(np.int64)
+
+
+def extrair_numeros_vetorizado(dados: bytes) -> List[np.ndarray]:
+    """
+    Converte todos os números de um bloco de bytes de uma só vez.
+
+    Equivale a ``re.findall(rb'-?[0-9]+', dados)`` seguido de ``int()`` em cada
+    item: os limites de cada número são encontrados com ``np.diff`` sobre a
+    máscara de dígitos e os valores são somados por ``np.add.reduceat``.
+
+    Args:
+        dados: Bloco de bytes que não termina no meio de um número
+
+    Returns:
+        List[np.ndarray]: Arrays int64 com os números encontrados
+
+    Raises:
+        OverflowError: Se algum número não couber em int64
+    """
+    b = np.frombuffer(dados, dtype=np.uint8)
+    digito = (b >= 0x30) & (b <= 0x39)
+    if not digito.any():
+        return []
+
+    bordas = np.diff(digito.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    inicios = np.flatnonzero(bordas == 1)
+    fins = np.flatnonzero(bordas == -1)
+    comprimentos = fins - inicios
+
+    negativo = np.zeros(len(inicios), dtype=bool)
+    com_anterior = inicios > 0
+    negativo[com_anterior] = b[inicios[com_anterior] - 1] == 0x2D
+
+    arrays = []
+    longos = comprimentos > MAX_DIGITOS_VETORIZADO
+    if longos.any():
+        # Caso raro: números longos são convertidos um a um e seus dígitos
+        # retirados da máscara usada na conversão vetorizada
+        grandes = []
+        for i, f, neg in zip(inicios[longos].tolist(), fins[longos].tolist(), negativo[longos].tolist()):
+            grandes.append(-int(dados[i:f]) if neg else int(dados[i:f]))
+            digito[i:f] = False
+        if any(n < _INT64.min or n > _INT64.max for n in grandes):
+            raise OverflowError('Número fora do intervalo de int64')
+        arrays.append(np.array(grandes, dtype=np.int64))
+
+        curtos = ~longos
+        inicios, fins, comprimentos, negativo = (
+            inicios[curtos], fins[curtos], comprimentos[curtos], negativo[curtos]
+        )
+        if not len(inicios):
+            return arrays
+
+    # Posição de cada dígito contada a partir do fim do seu número
+    posicoes = np.flatnonzero(digito)
+    expoentes = np.repeat(fins - 1, comprimentos) - posicoes
+    parcelas = (b[posicoes] - 0x30).astype(np.int64) * _POTENCIAS_10[expoentes]
+
+    deslocamentos = np.zeros(len(comprimentos), dtype=np.int64)
+    np.cumsum(comprimentos[:-1], out=deslocamentos[1:])
+    valores = np.add.reduceat(parcelas, deslocamentos)
+    valores[negativo] *= -1
+
+    arrays.append(valores)
+    return arrays
+
+
+class ParcialNumpy(NamedTuple):
+    """
+    Análise parcial (de um trecho do arquivo) em arrays int64 de duas
+    colunas, aceita por combinar_snapshots no lugar de um SnapshotAnalise.
+    """
+    total: int
+    corridas: np.ndarray  # Pares (início, fim)
+    duplicados: np.ndarray  # Pares (número, quantidade)
+
+
+def _pares(grupos: list) -> np.ndarray:
+    """Junta grupos de pares de inteiros em uma matriz int64 de duas colunas."""
+    pares = [np.asarray(grupo, dtype=np.int64).reshape(-1, 2) for grupo in grupos if len(grupo)]
+    if not pares:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.concatenate(pares)
+
+
+def unir_vetorizado(grupos_corridas: list, grupos_duplicados: list) -> Tuple[List[Intervalo], List[Tuple[int, int]]]:
+    """
+    Versão vetorizada de motor._unir, com o mesmo resultado.
+
+    A cobertura de cada trecho entre dois limites de corrida sai de
+    ``np.cumsum`` sobre os limites ordenados; os números dos trechos
+    cobertos por mais de um grupo são gerados por ``np.repeat`` e as
+    repetições internas de cada grupo somadas por ``np.add.at``.
+
+    Args:
+        grupos_corridas: Corridas de cada análise (listas de pares ou arrays)
+        grupos_duplicados: Pares (número, quantidade) de cada análise
+
+    Returns:
+        tuple: (corridas unidas, pares (número, quantidade) ordenados por número)
+
+    Raises:
+        OverflowError: Se algum número não couber em int64
+    """
+    corridas = _pares(grupos_corridas)
+    duplicados = _pares(grupos_duplicados)
+    if len(corridas) and corridas[:, 1].max() == _INT64.max:
+        raise OverflowError('Número fora do intervalo de int64')
+
+    # Cobertura de cada trecho [posicoes[k], posicoes[k + 1])
+    posicoes, inverso = np.unique(
+        np.concatenate((corridas[:, 0], corridas[:, 1] + 1)), return_inverse=True
+    )
+    deltas = np.zeros(len(posicoes), dtype=np.int64)
+    np.add.at(deltas, inverso, np.repeat(np.array([1, -1], dtype=np.int64), len(corridas)))
+    cobertura = np.cumsum(deltas)[:-1]
+
+    coberto = cobertura > 0
+    bordas = np.diff(coberto.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+    inicios = posicoes[np.flatnonzero(bordas == 1)]
+    fins = posicoes[np.flatnonzero(bordas == -1)] - 1
+
+    sobrepostos = np.flatnonzero(cobertura > 1)
+    tamanhos = posicoes[sobrepostos + 1] - posicoes[sobrepostos]
+    deslocamentos = np.cumsum(tamanhos) - tamanhos
+    numeros = np.arange(int(tamanhos.sum()), dtype=np.int64) + np.repeat(
+        posicoes[sobrepostos] - deslocamentos, tamanhos
+    )
+    contagens = np.repeat(cobertura[sobrepostos], tamanhos)
+
+    if len(duplicados):
+        # Ocorrências além da primeira, dentro de cada grupo
+        repetidos, inverso = np.unique(duplicados[:, 0], return_inverse=True)
+        extras = np.zeros(len(repetidos), dtype=np.int64)
+        np.add.at(extras, inverso, duplicados[:, 1] - 1)
+
+        indices = np.searchsorted(numeros, repetidos)
+        encontrados = indices < len(numeros)
+        encontrados[encontrados] = numeros[indices[encontrados]] == repetidos[encontrados]
+        contagens[indices[encontrados]] += extras[encontrados]
+
+        novos = ~encontrados
+        numeros = np.concatenate((numeros, repetidos[novos]))
+        contagens = np.concatenate((contagens, extras[novos] + 1))
+        ordem = np.argsort(numeros, kind='stable')
+        numeros, contagens = numeros[ordem], contagens[ordem]
+
+    return (
+        list(zip(inicios.tolist(), fins.tolist())),
+        list(zip(numeros.tolist(), contagens.tolist())),
+    )
+
+
+class MotorNumpy:
+    """
+    Backend vetorizado com NumPy.
+
+    Os bytes são convertidos em lote por extrair_numeros_vetorizado() e os
+    números acumulados em arrays int64. Periodicamente, e ao concluir, os
+    arrays são compactados com ``np.unique(return_counts=True)``; corridas
+    e duplicados saem de ``np.diff`` e ``np.flatnonzero`` sobre os números
+    únicos. O resultado é idêntico ao do MotorPython.
+
+    Se aparecer um número que não cabe em int64, o conteúdo acumulado é
+    transferido para um MotorPython, que passa a receber o restante.
+    """
+
+    nome = 'numpy'
+
+    def __init__(self):
+        self._resto = b''
+        self._lote = []
+        self._tamanho_lote = 0
+        self._pendentes: List[np.ndarray] = []
+        self._total_pendentes = 0
+        self._unicos = np.empty(0, dtype=np.int64)
+        self._contagens = np.empty(0, dtype=np.int64)
+        self._reserva = None
+        self._total = 0
+        self._bytes_lidos = 0
+
+    @property
+    def total(self) -> int:
+        """Quantidade de números recebidos até agora."""
+        if self._reserva is not None:
+            return self._reserva.total
+        return self._total
+
+    @property
+    def bytes_lidos(self) -> int:
+        """Quantidade de bytes recebidos até agora."""
+        if self._reserva is not None:
+            return self._reserva.bytes_lidos
+        return self._bytes_lidos
+
+    def alimentar(self, bloco: bytes):
+        """
+        Processa o próximo bloco de bytes do arquivo.
+
+        Args:
+            bloco: Bloco de bytes, na ordem do arquivo
+        """
+        if self._reserva is not None:
+            self._reserva.alimentar(bloco)
+            return
+
+        self._bytes_lidos += len(bloco)
+        self._lote.append(bloco)
+        self._tamanho_lote += len(bloco)
+        if self._tamanho_lote >= TAMANHO_LOTE_BYTES:
+            self._converter_lote(final=False)
+
+    def adicionar_varios(self, numeros: Iterable[int]):
+        """
+        Registra números já convertidos para int, em lotes.
+
+        Args:
+            numeros: Números na ordem em que aparecem no arquivo (um array
+                int64 é acumulado diretamente, sem conversão)
+        """
+        if isinstance(numeros, np.ndarray):
+            if self._reserva is None:
+                self._acumular(numeros.astype(np.int64, copy=False))
+                return
+            numeros = numeros.tolist()
+        numeros = iter(numeros)
+        while self._reserva is None:
+            lote = list(islice(numeros, LIMITE_PENDENTES))
+            if not lote:
+                return
+            try:
+                self._acumular(np.array(lote, dtype=np.int64))
+            except OverflowError:
+                self._transferir_para_reserva()
+                self._reserva.adicionar_varios(lote)
+        self._reserva.adicionar_varios(numeros)
+
+    def _converter_lote(self, final: bool):
+        """Converte os bytes agrupados, retendo um número incompleto no fim."""
+        dados = self._resto + b''.join(self._lote)
+        self._lote = []
+        self._tamanho_lote = 0
+
+        corte = len(dados)
+        if not final:
+            corte = len(dados.rstrip(b'0123456789'))
+            if corte and dados[corte - 1] == 0x2D:  # '-'
+                corte -= 1
+        self._resto = dados[corte:]
+
+        try:
+            arrays = extrair_numeros_vetorizado(dados[:corte])
+        except OverflowError:
+            # O tokenizador do backend puro Python assume os bytes ainda
+            # não convertidos, inclusive o número retido no fim
+            self._resto = b''
+            self._transferir_para_reserva()
+            self._reserva.tokenizador.bytes_lidos -= len(dados)
+            self._reserva.alimentar(dados)
+            if final:
+                # Vindo de finalizar_leitura, não haverá outro bloco para
+                # liberar o número que o tokenizador reteve no fim: ele é
+                # registrado já, pois total e intervalo() são lidos antes de
+                # concluir() (a admissão amplia a reserva pelo intervalo)
+                self._reserva.finalizar_leitura()
+            return
+
+        for array in arrays:
+            self._acumular(array)
+
+    def _acumular(self, valores: np.ndarray):
+        """Guarda números convertidos até a próxima compactação."""
+        self._pendentes.append(valores)
+        self._total_pendentes += len(valores)
+        self._total += len(valores)
+        if self._total_pendentes >= LIMITE_PENDENTES:
+            self._compactar()
+
+    def _compactar(self):
+        """Funde os números pendentes na contagem de únicos."""
+        if not self._pendentes:
+            return
+
+        novos = np.concatenate(self._pendentes)
+        self._pendentes = []
+        self._total_pendentes = 0
+
+        if not len(self._unicos):
+            self._unicos, self._contagens = np.unique(novos, return_counts=True)
+            return
+
+        unicos, inverso = np.unique(
+            np.concatenate([self._unicos, novos]), return_inverse=True
+        )
+        pesos = np.concatenate([self._contagens, np.ones(len(novos), dtype=np.int64)])
+        contagens = np.zeros(len(unicos), dtype=np.int64)
+        np.add.at(contagens, inverso, pesos)
+        self._unicos, self._contagens = unicos, contagens
+
+    def _transferir_para_reserva(self):
+        """Passa tudo o que foi acumulado para o backend puro Python."""
+        self._compactar()
+        reserva = MotorPython()
+        reserva.tokenizador.bytes_lidos = self._bytes_lidos
+        unicos = self._unicos.tolist()
+        reserva.adicionar_varios(unicos)
+        reserva.adicionar_varios(
+            numero
+            for numero, quantidade in zip(unicos, self._contagens.tolist())
+            for _ in range(quantidade - 1)
+        )
+        self._unicos = self._contagens = None
+        self._reserva = reserva
+
+    def finalizar_leitura(self):
+        """Converte os bytes ainda agrupados, inclusive o número retido no fim."""
+        if self._reserva is not None:
+            self._reserva.finalizar_leitura()
+        elif self._lote or self._resto:
+            self._converter_lote(final=True)
+
+    def intervalo(self) -> Optional[Intervalo]:
+        """
+        Menor e maior número registrados até agora, sem contar os bytes
+        ainda agrupados (chamar depois de finalizar_leitura).
+
+        Returns:
+            Optional[Intervalo]: (menor, maior), ou None se não houver números
+        """
+        if self._reserva is not None:
+            return self._reserva.intervalo()
+        self._compactar()
+        if not len(self._unicos):
+            return None
+        return int(self._unicos[0]), int(self._unicos[-1])
+
+    def concluir(self, limite_gap: int) -> SnapshotAnalise:
+        """
+        Encerra a leitura e congela o resultado.
+
+        Args:
+            limite_gap: Tamanho a partir do qual uma lacuna é um gap grande
+
+        Returns:
+            SnapshotAnalise: Snapshot da análise
+        """
+        parcial = self.concluir_parcial(limite_gap)
+        if isinstance(parcial, SnapshotAnalise):
+            return parcial
+        return SnapshotAnalise.criar(
+            parcial.total, zip(*parcial.corridas.T.tolist()), zip(*parcial.duplicados.T.tolist()), limite_gap
+        )
+
+    def concluir_parcial(self, limite_gap: int):
+        """
+        Encerra a leitura de um trecho do arquivo, devolvendo corridas e
+        duplicados em arrays, sem montar as tuplas do snapshot (análises em
+        trechos, combinadas depois por combinar_snapshots).
+
+        Args:
+            limite_gap: Tamanho a partir do qual uma lacuna é um gap grande
+
+        Returns:
+            ParcialNumpy, ou SnapshotAnalise se o backend puro Python assumiu
+        """
+        self.finalizar_leitura()
+        if self._reserva is not None:
+            return self._reserva.concluir(limite_gap)
+
+        self._compactar()
+        unicos, contagens = self._unicos, self._contagens
+
+        if not len(unicos):
+            vazio = np.empty((0, 2), dtype=np.int64)
+            return ParcialNumpy(0, vazio, vazio)
+
+        quebras = np.flatnonzero(np.diff(unicos) != 1)
+        inicios = unicos[np.concatenate(([0], quebras + 1))]
+        fins = unicos[np.concatenate((quebras, [len(unicos) - 1]))]
+
+        repetidos = np.flatnonzero(contagens > 1)
+
+        return ParcialNumpy(
+            self._total,
+            np.column_stack((inicios, fins)),
+            np.column_stack((unicos[repetidos], contagens[repetidos])),
+        )
@@ -0,0 +1,343 @@
+import math
+import re
+from itertools import islice
+from typing import Iterable
+
+from .leitura import TokenizadorNumeros
+
+
+# Precisão do HyperLogLog: 2^16 registradores (64KB), com erro padrão de
+# cerca de 0,4% na contagem de números únicos
+PRECISAO_HLL = 16
+
+# Células do mapa de ocupação (64KB). Enquanto o intervalo dos números
+# couber nele, cada célula é um único número e a prévia é exata.
+CELULAS_MAPA = 1 << 16
+
+# Números distintos guardados, com as suas ocorrências, na amostra usada
+# para estimar os duplicados
+MAXIMO_AMOSTRA = 4096
+
+# Repetidos na amostra abaixo dos quais a prévia não estima os duplicados
+# (o erro padrão passaria de 20%); só dá o limite superior
+MINIMO_REPETIDOS_AMOSTRA = 25
+
+# Números registrados de cada vez em adicionar_varios
+TAMANHO_LOTE_PREVIA = 1 << 16
+
+_MASCARA_64 = (1 << 64) - 1
+_CELULAS_VAZIAS = re.compile(rb'\x00+')
+_CELULAS_OCUPADAS = re.compile(rb'[^\x00]+')
+
+
+def _misturar(n: int) -> int:
+    """Hash de 64 bits de um número (finalizador do splitmix64)."""
+    z = (n * 0x9E3779B97F4A7C15) & _MASCARA_64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASCARA_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASCARA_64
+    return z ^ (z >> 31)
+
+
+class EsbocoSequencia:
+    """
+    Resumo de tamanho fixo de uma sequência, para uma prévia rápida de
+    arquivos muito grandes antes da análise exata.
+
+    Em uma única passada, com memória constante (cerca de 250KB, qualquer
+    que seja o arquivo), guarda:
+    - a quantidade, o menor e o maior número, exatos;
+    - um HyperLogLog, que estima a quantidade de números únicos;
+    - um mapa de ocupação do intervalo em CELULAS_MAPA células alinhadas a
+      múltiplos da sua largura. Quando o intervalo cresce além do mapa,
+      cada célula passa a cobrir o dobro de números. Uma sequência de
+      células vazias é um trecho sem nenhum número, o que revela os gaps
+      grandes e limita a estimativa de únicos;
+    - uma amostra dos números distintos, escolhidos pelo hash (todas as
+      ocorrências de um número escolhido são contadas), com até
+      MAXIMO_AMOSTRA números. Quando enche, a taxa de amostragem cai pela
+      metade. A fração de repetidos na amostra estima a de toda a sequência.
+
+    O estado final não depende da ordem dos números nem de como foram
+    agrupados, e o EsbocoNumpy calcula o mesmo hash, de modo que os dois
+    produzem a mesma prévia.
+    """
+
+    nome = 'python'
+
+    def __init__(self, precisao: int = PRECISAO_HLL):
+        self.precisao = precisao
+        self.registradores = bytearray(1 << precisao)
+        self.mapa = bytearray(CELULAS_MAPA)
+        self.origem = None  # Primeiro número coberto pela célula 0
+        self.largura = 1  # Números por célula (sempre uma potência de 2)
+        self.amostra = {}  # Número amostrado -> ocorrências
+        self.nivel_amostra = 0  # Um número é amostrado se os últimos bits do hash forem zero
+        self.total = 0
+        self.menor = None
+        self.maior = None
+        self.tokenizador = TokenizadorNumeros()
+
+    @property
+    def bytes_lidos(self) -> int:
+        """Quantidade de bytes recebidos até agora."""
+        return self.tokenizador.bytes_lidos
+
+    def alimentar(self, bloco: bytes):
+        """
+        Processa o próximo bloco de bytes do arquivo.
+
+        Args:
+            bloco: Bloco de bytes, na ordem do arquivo
+        """
+        self.adicionar_varios(self.tokenizador.alimentar(bloco))
+
+    def finalizar_leitura(self):
+        """Registra o número que estava retido no fim do último bloco."""
+        self.adicionar_varios(self.tokenizador.finalizar())
+
+    def adicionar_varios(self, numeros: Iterable[int]):
+        """
+        Registra números já convertidos para int.
+
+        Args:
+            numeros: Números, em qualquer ordem
+        """
+        numeros = iter(numeros)
+        deslocamento = 64 - self.precisao
+        mascara = (1 << deslocamento) - 1
+        registradores = self.registradores
+        mapa = self.mapa
+        amostra = self.amostra
+        while True:
+            lote = list(islice(numeros, TAMANHO_LOTE_PREVIA))
+            if not lote:
+                return
+            self._cobrir(min(lote), max(lote))
+            self.total += len(lote)
+            origem, largura = self.origem, self.largura
+            filtro = (1 << self.nivel_amostra) - 1
+            for n in lote:
+                mapa[(n - origem) // largura] = 1
+                z = (n * 0x9E3779B97F4A7C15) & _MASCARA_64
+                z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASCARA_64
+                z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASCARA_64
+                z ^= z >> 31
+                # Posição do primeiro bit 1 nos bits que não escolhem o registrador
+                posicao = deslocamento + 1 - (z & mascara).bit_length()
+                if posicao > registradores[z >> deslocamento]:
+                    registradores[z >> deslocamento] = posicao
+                if not z & filtro:
+                    amostra[n] = amostra.get(n, 0) + 1
+            self._reduzir_amostra()
+
+    def _reduzir_amostra(self):
+        """Reduz a taxa de amostragem até a amostra caber em MAXIMO_AMOSTRA."""
+        while len(self.amostra) > MAXIMO_AMOSTRA:
+            self.nivel_amostra += 1
+            filtro = (1 << self.nivel_amostra) - 1
+            for n in [n for n in self.amostra if _misturar(n) & filtro]:
+                del self.amostra[n]
+
+    def _cobrir(self, menor: int, maior: int):
+        """Amplia o mapa de ocupação, se preciso, para cobrir [menor, maior]."""
+        self.menor = menor if self.menor is None else min(self.menor, menor)
+        self.maior = maior if self.maior is None else max(self.maior, maior)
+        if self.origem is None:
+            self.origem = menor
+            self.largura = 1
+
+        # A origem é sempre múltipla da largura, de modo que cada célula
+        # antiga cabe inteira em uma célula nova
+        largura = self.largura
+        while self.maior >= self.menor // largura * largura + CELULAS_MAPA * largura:
+            largura *= 2
+        origem = self.menor // largura * largura
+        if origem != self.origem or largura != self.largura:
+            self._redimensionar(origem, largura)
+
+    def _redimensionar(self, origem: int, largura: int):
+        """Refaz o mapa de ocupação com a nova origem e largura das células."""
+        novo = bytearray(CELULAS_MAPA)
+        for ocupadas in _CELULAS_OCUPADAS.finditer(self.mapa):
+            primeira = (self.origem + ocupadas.start() * self.largura - origem) // largura
+            ultima = (self.origem + (ocupadas.end() - 1) * self.largura - origem) // largura
+            novo[primeira:ultima + 1] = b'\x01' * (ultima - primeira + 1)
+        self.mapa[:] = novo
+        self.origem = origem
+        self.largura = largura
+
+    def estimar_unicos(self) -> int:
+        """
+        Estima a quantidade de números únicos pelo HyperLogLog.
+
+        Returns:
+            int: Estimativa, com erro padrão de ``1.04 / sqrt(registradores)``
+        """
+        m = len(self.registradores)
+        alfa = 0.7213 / (1 + 1.079 / m)
+        estimativa = alfa * m * m / sum(2.0 ** -r for r in self.registradores)
+        zeros = self.registradores.count(0)
+        if estimativa <= 2.5 * m and zeros:
+            # Poucos números: a contagem linear é mais precisa
+            estimativa = m * math.log(m / zeros)
+        return round(estimativa)
+
+    def _estimar_unicos_combinado(self):
+        """
+        Estima os números únicos pelo HyperLogLog ou pela amostra, o que
+        tiver o menor erro padrão.
+
+        A amostra é uniforme entre os números distintos, de modo que a média
+        de ocorrências nela estima ``total / únicos``. Com poucos repetidos
+        essa média quase não varia e a estimativa é bem mais precisa que a
+        do HyperLogLog.
+
+        Returns:
+            tuple: (estimativa, erro padrão relativo)
+        """
+        erro_hll = 1.04 / math.sqrt(len(self.registradores))
+        ocorrencias = list(self.amostra.values())
+        media = sum(ocorrencias) / len(ocorrencias)
+        variancia = sum((c - media) ** 2 for c in ocorrencias) / len(ocorrencias)
+        # Sem repetidos na amostra, ainda pode haver repetidos raros fora dela
+        erro_amostra = max(math.sqrt(variancia / len(ocorrencias)) / media, 1 / len(ocorrencias))
+        if erro_amostra < erro_hll:
+            return round(self.total / media), erro_amostra
+        return self.estimar_unicos(), erro_hll
+
+    def _estimar_duplicados(self, numeros_unicos: int, repetidos: int):
+        """
+        Estima os duplicados pela fração de repetidos na amostra.
+
+        O número de repetidos na amostra é binomial, com erro padrão relativo
+        ``sqrt((1 - p) / repetidos)``. Sem repetidos, a regra de três dá o
+        limite superior de 3 / amostra; com alguns, o limite soma dois
+        desvios padrão a essa folga.
+
+        Args:
+            numeros_unicos: Números únicos estimados
+            repetidos: Números repetidos na amostra
+
+        Returns:
+            tuple: (estimativa ou None, erro padrão relativo ou None,
+            limite superior)
+        """
+        tamanho = len(self.amostra)
+        fracao_maxima = min((repetidos + 2 * math.sqrt(repetidos) + 3) / tamanho, 1)
+        maximo = round(numeros_unicos * fracao_maxima)
+        if repetidos < MINIMO_REPETIDOS_AMOSTRA:
+            return None, None, maximo
+        fracao = repetidos / tamanho
+        return round(numeros_unicos * fracao), math.sqrt((1 - fracao) / repetidos), maximo
+
+    def estatisticas(self, limite_gap: int) -> dict:
+        """
+        Estima as estatísticas da análise exata a partir do esboço.
+
+        As chaves são as mesmas de AnalisadorSequencia._gerar_estatisticas,
+        mais ``estimativa`` (sempre True), ``margem_erro_unicos`` e
+        ``margem_erro_duplicados`` (erros padrão relativos, em percentual;
+        0 quando o valor é exato) e ``maximo_duplicados`` (limite superior,
+        com cerca de 95% de confiança, dos duplicados).
+        A prévia é exata enquanto a amostra tiver todos os números (até
+        MAXIMO_AMOSTRA distintos); depois, os números únicos e as lacunas
+        continuam exatos enquanto o intervalo couber no mapa de ocupação.
+        Com células mais largas que ``limite_gap``, as lacunas dentro das
+        células ocupadas são tratadas como se os números estivessem
+        espalhados por igual.
+
+        Args:
+            limite_gap: Tamanho a partir do qual uma lacuna é um gap grande
+
+        Returns:
+            dict: Estatísticas estimadas
+        """
+        tamanho_esperado = self.maior - self.menor + 1
+        repetidos = sum(1 for ocorrencias in self.amostra.values() if ocorrencias > 1)
+
+        if self.nivel_amostra == 0:
+            # A amostra tem todos os números: a prévia é exata
+            numeros_unicos = len(self.amostra)
+            total_duplicados = repetidos
+            total_faltantes = total_gaps_grandes = 0
+            ordenados = sorted(self.amostra)
+            for anterior, numero in zip(ordenados, ordenados[1:]):
+                lacuna = numero - anterior - 1
+                if lacuna > limite_gap:
+                    total_gaps_grandes += 1
+                else:
+                    total_faltantes += lacuna
+            margem_erro = margem_erro_duplicados = 0
+            maximo_duplicados = total_duplicados
+        else:
+            largura = self.largura
+            primeira = (self.menor - self.origem) // largura
+            ultima = (self.maior - self.origem) // largura
+            ocupacao = bytes(self.mapa[primeira:ultima + 1])
+            ocupadas = len(ocupacao) - ocupacao.count(0)
+            vazios = [len(trecho) * largura for trecho in _CELULAS_VAZIAS.findall(ocupacao)]
+            gaps_grandes = [vazio for vazio in vazios if vazio > limite_gap]
+            total_gaps_grandes = len(gaps_grandes)
+
+            if largura == 1:
+                numeros_unicos = tamanho_esperado - sum(vazios)
+                margem_erro = 0
+            else:
+                estimativa, margem_erro = self._estimar_unicos_combinado()
+                numeros_unicos = max(ocupadas, min(estimativa, self.total, tamanho_esperado - sum(vazios)))
+            total_duplicados, margem_erro_duplicados, maximo_duplicados = self._estimar_duplicados(
+                numeros_unicos, repetidos
+            )
+
+            # Números ausentes fora dos gaps grandes vistos no mapa
+            total_faltantes = max(tamanho_esperado - numeros_unicos - sum(gaps_grandes), 0)
+            if largura > limite_gap:
+                # Todas as células vazias já são gaps grandes; as lacunas dentro
+                # das células ocupadas também o são se, espalhados os números, o
+                # espaço médio entre eles passar do limite
+                lacunas = max(numeros_unicos - ocupadas, 0)
+                if lacunas and total_faltantes / lacunas > limite_gap:
+                    total_gaps_grandes += lacunas
+                    total_faltantes = 0
+
+        return {
+            'total_numeros_arquivo': self.total,
+            'numeros_unicos': numeros_unicos,
+            'total_duplicados': total_duplicados,
+            'total_faltantes': total_faltantes,
+            'tamanho_sequencia_esperada': tamanho_esperado,
+            'percentual_completo': round(numeros_unicos / tamanho_esperado * 100, 2),
+            'tem_gaps_grandes': total_gaps_grandes > 0,
+            'total_gaps_grandes': total_gaps_grandes,
+            'estimativa': True,
+            'margem_erro_unicos': round(margem_erro * 100, 2),
+            'margem_erro_duplicados': (
+                None if margem_erro_duplicados is None else round(margem_erro_duplicados * 100, 2)
+            ),
+            'maximo_duplicados': maximo_duplicados,
+        }
+
+
+def criar_esboco(backend: str = 'auto'):
+    """
+    Cria o esboço usado na prévia, seguindo a escolha de backend de criar_motor.
+
+    Args:
+        backend: ``'auto'``, ``'python'`` ou ``'numpy'``
+
+    Returns:
+        EsbocoSequencia ou EsbocoNumpy: Esboço pronto para receber dados
+
+    Raises:
+        ImportError: Se ``'numpy'`` for pedido sem o NumPy instalado
+    """
+    if backend != 'python':
+        try:
+            from .previa_numpy import EsbocoNumpy
+        except ImportError:
+            if backend == 'numpy':
+                raise
+        else:
+            return EsbocoNumpy()
+
+    return EsbocoSequencia()
@@ -0,0 +1,102 @@
+import numpy as np
+
+from .leitura import PADRAO_NUMEROS_BYTES
+from .motor_numpy import extrair_numeros_vetorizado
+from .previa import EsbocoSequencia
+
+
+class EsbocoNumpy(EsbocoSequencia):
+    """
+    Esboço da prévia vetorizado com NumPy.
+
+    Os bytes são convertidos por extrair_numeros_vetorizado() e o hash, o
+    HyperLogLog e o mapa de ocupação são atualizados de uma vez para cada
+    bloco. Os registradores e o mapa são os mesmos bytearrays do
+    EsbocoSequencia, vistos como arrays, e a prévia é idêntica à dele.
+
+    Blocos com números que não cabem em int64 são registrados pelo
+    caminho puro Python.
+    """
+
+    nome = 'numpy'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._resto = b''
+        self._bytes_lidos = 0
+
+    @property
+    def bytes_lidos(self) -> int:
+        """Quantidade de bytes recebidos até agora."""
+        return self._bytes_lidos
+
+    def alimentar(self, bloco: bytes):
+        """
+        Processa o próximo bloco de bytes do arquivo.
+
+        Args:
+            bloco: Bloco de bytes, na ordem do arquivo
+        """
+        self._bytes_lidos += len(bloco)
+        dados = self._resto + bloco if self._resto else bytes(bloco)
+
+        # Retém o número que pode continuar no próximo bloco
+        corte = len(dados.rstrip(b'0123456789'))
+        if corte and dados[corte - 1] == 0x2D:  # '-'
+            corte -= 1
+        self._resto = dados[corte:]
+        self._converter(dados[:corte])
+
+    def finalizar_leitura(self):
+        """Registra o número que estava retido no fim do último bloco."""
+        resto, self._resto = self._resto, b''
+        self._converter(resto)
+
+    def _converter(self, dados: bytes):
+        """Converte e registra os números de um trecho completo de bytes."""
+        try:
+            arrays = extrair_numeros_vetorizado(dados)
+        except OverflowError:
+            self.adicionar_varios(map(int, PADRAO_NUMEROS_BYTES.findall(dados)))
+            return
+        for valores in arrays:
+            self.adicionar_array(valores)
+
+    def adicionar_array(self, valores: np.ndarray):
+        """
+        Registra um array int64 de números.
+
+        Args:
+            valores: Números, em qualquer ordem
+        """
+        if not len(valores):
+            return
+        self._cobrir(int(valores.min()), int(valores.max()))
+        try:
+            celulas = (valores - np.int64(self.origem)) // self.largura
+        except OverflowError:
+            # Origem fora de int64 (por números grandes registrados antes)
+            self.adicionar_varios(valores.tolist())
+            return
+        self.total += len(valores)
+        np.frombuffer(self.mapa, dtype=np.uint8)[celulas] = 1
+
+        z = valores.view(np.uint64) * np.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z ^= z >> np.uint64(31)
+
+        deslocamento = 64 - self.precisao
+        indices = (z >> np.uint64(deslocamento)).astype(np.intp)
+        # bit_length dos bits restantes, pelo expoente do float (exato abaixo de 2^53)
+        _, comprimentos = np.frexp((z & np.uint64((1 << deslocamento) - 1)).astype(np.float64))
+        posicoes = (deslocamento + 1 - comprimentos).astype(np.uint8)
+        np.maximum.at(np.frombuffer(self.registradores, dtype=np.uint8), indices, posicoes)
+
+        amostrados = valores[(z & np.uint64((1 << self.nivel_amostra) - 1)) == 0]
+        if len(amostrados):
+            numeros, ocorrencias = np.unique(amostrados, return_counts=True)
+            amostra = self.amostra
+            for n, c in zip(numeros.tolist(), ocorrencias.tolist()):
+                amostra[n] = amostra.get(n, 0) + c
+            self._reduzir_amostra()
@@ -0,0 +1,92 @@
+import hashlib
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers
+
+from .motor import criar_motor
+
+
+class ArquivoAnalisado(UploadedFile):
+    """
+    Arquivo enviado cujos números foram registrados em um backend de
+    análise à medida que os bytes chegavam, por AnaliseDuranteUpload.
+
+    O conteúdo não é guardado (nem em memória, nem em arquivo temporário):
+    restam apenas o backend alimentado e o SHA-256 do conteúdo, que
+    identifica o resultado no cache como em calcular_hash. ``chunks()``
+    e ``read()`` não estão disponíveis.
+    """
+
+    def __init__(self, name, content_type, size, charset, content_type_extra,
+                 motor, hash_conteudo: str, tempo_analise: float, erro: Optional[Exception]):
+        super().__init__(None, name, content_type, size, charset, content_type_extra)
+        self.motor = motor
+        self.hash_conteudo = hash_conteudo
+        self.tempo_analise = tempo_analise  # Segundos gastos alimentando o backend
+        self.erro = erro  # Exceção levantada pelo backend durante o upload, se houver
+
+    def close(self):
+        self.motor = None
+
+
+class AnaliseDuranteUpload(FileUploadHandler):
+    """
+    Handler de upload que analisa o arquivo enquanto ele é recebido.
+
+    Cada bloco que chega do corpo multipart é entregue ao tokenizador do
+    backend e somado ao SHA-256, de modo que, quando o último byte chega,
+    só falta consolidar a análise. Os handlers seguintes (memória e arquivo
+    temporário) não são acionados para o campo analisado: o arquivo não é
+    gravado em disco nem lido de novo.
+
+    Deve ser instalado no início de ``request.upload_handlers``, antes do
+    primeiro acesso a ``request.POST`` ou ``request.FILES``. Os demais
+    campos de arquivo, e arquivos ``.gz`` (que precisam ser descomprimidos
+    antes), seguem para os handlers padrão.
+    """
+
+    def __init__(self, request=None, campo: str = 'arquivo', backend: str = 'auto'):
+        super().__init__(request)
+        self.campo = campo
+        self.backend = backend
+        self.limite = settings.ANALISADOR_TAMANHO_MAXIMO
+        self.motor = None
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None,
+                 content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.motor = None
+        if field_name != self.campo or file_name.endswith('.gz'):
+            return
+        self.motor = criar_motor(self.backend)
+        self.sha = hashlib.sha256()
+        self.tempo_analise = 0.0
+        self.erro = None
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.motor is None:
+            return raw_data
+        # Acima do limite, os bytes restantes só são contados; o arquivo
+        # será recusado pela view pelo tamanho
+        if self.erro is None and start + len(raw_data) <= self.limite:
+            self.sha.update(raw_data)
+            inicio = time.perf_counter()
+            try:
+                self.motor.alimentar(raw_data)
+            except Exception as e:
+                self.erro = e
+            self.tempo_analise += time.perf_counter() - inicio
+        return None
+
+    def file_complete(self, file_size):
+        if self.motor is None:
+            return None
+        motor, self.motor = self.motor, None
+        return ArquivoAnalisado(
+            self.file_name, self.content_type, file_size, self.charset, self.content_type_extra,
+            motor=motor, hash_conteudo=self.sha.hexdigest(), tempo_analise=self.tempo_analise, erro=self.erro,
+        )
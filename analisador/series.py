@@ -0,0 +1,302 @@
+import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from .leitura import PADRAO_NUMEROS_BYTES
+from .motor import SnapshotAnalise, criar_motor
+
+
+# Máximo de séries distintas em um arquivo. Cada série tem o seu próprio
+# backend de análise; o limite evita que um arquivo com uma chave diferente
+# por linha esgote a memória.
+MAXIMO_SERIES = 1000
+
+# Threads usadas para consolidar as séries depois da leitura
+WORKERS_SERIES = 4
+
+# Caracteres removidos das pontas de cada campo no modo CSV
+_ASPAS_E_ESPACOS = b' \t\r"\''
+
+# Início de cada linha que não está em branco
+_LINHA_PREENCHIDA = re.compile(rb'^[^\S\n]*\S', re.MULTILINE)
+
+
+def _converter_numero(campo: bytes) -> Optional[int]:
+    """
+    Converte o campo do número de uma linha, que deve ser um ``-`` opcional
+    seguido só de dígitos ASCII, como em PADRAO_NUMEROS (int() aceitaria
+    também ``+``, ``_`` e espaços no meio do campo).
+
+    Returns:
+        Optional[int]: O número, ou None se o campo não for um número
+    """
+    if PADRAO_NUMEROS_BYTES.fullmatch(campo) is None:
+        return None
+    return int(campo)
+
+
+class FormatoInvalido(ValueError):
+    """A configuração do formato de linha não é válida."""
+
+
+class FormatoSeries:
+    """
+    Formato das linhas de um arquivo com várias séries: cada linha traz a
+    chave da série e o número, como em ``NF-001;1042`` ou ``serie 2: 1042``.
+
+    Há dois modos:
+    - ``regex``: expressão regular com os grupos nomeados ``serie`` e ``numero``;
+    - ``csv``: colunas (contadas a partir de 1) da série e do número.
+
+    Linhas que não seguem o formato (cabeçalhos, linhas em branco) são
+    ignoradas e contadas à parte.
+
+    No modo ``regex``, os blocos do arquivo são lidos com uma só busca por
+    bloco (separar): a expressão é ancorada no início de cada linha e
+    aplicada ao bloco inteiro, em vez de linha a linha.
+    """
+
+    def __init__(self, padrao: Optional[str] = None, coluna_serie: Optional[int] = None,
+                 coluna_numero: Optional[int] = None, delimitador: str = ','):
+        if padrao is not None:
+            try:
+                self._regex = re.compile(padrao.encode())
+            except re.error as e:
+                raise FormatoInvalido(f'Expressão regular inválida: {e}')
+            if not {'serie', 'numero'} <= set(self._regex.groupindex):
+                raise FormatoInvalido('A expressão regular precisa dos grupos (?P<serie>...) e (?P<numero>...).')
+            self.extrair = self._extrair_regex
+            self.assinatura = f'regex:{padrao}'
+            self.colunas = None
+            try:
+                # Casa com a primeira ocorrência da expressão em cada linha, como search()
+                self._bloco = re.compile(rb'^([^\n]*?(?:' + padrao.encode() + rb'))', self._regex.flags | re.MULTILINE)
+            except re.error:
+                # Flags globais no meio da expressão: os blocos são lidos linha a linha
+                self._bloco = None
+            else:
+                grupos = self._bloco.groupindex
+                self._indices = (grupos['serie'] - 1, grupos['numero'] - 1)
+        elif coluna_serie is not None and coluna_numero is not None:
+            if coluna_serie < 1 or coluna_numero < 1 or coluna_serie == coluna_numero:
+                raise FormatoInvalido('As colunas da série e do número devem ser diferentes e maiores que zero.')
+            if len(delimitador) != 1:
+                raise FormatoInvalido('O delimitador deve ter um único caractere.')
+            self.colunas = (coluna_serie - 1, coluna_numero - 1)
+            self.delimitador = delimitador.encode()
+            self.extrair = self._extrair_csv
+            self.assinatura = f'csv:{coluna_serie}:{coluna_numero}:{delimitador}'
+            self._bloco = None
+        else:
+            raise FormatoInvalido('Informe uma expressão regular ou as colunas da série e do número.')
+
+    def separar(self, dados: bytes) -> Optional[Tuple[Dict[bytes, List[int]], int]]:
+        """
+        Agrupa por série os números de um bloco de linhas completas, com uma
+        só busca da expressão no bloco (modo ``regex``).
+
+        Args:
+            dados: Linhas completas do arquivo
+
+        Returns:
+            Optional[tuple]: (números de cada série, pela chave ainda sem
+            limpar; linhas que seguem o formato), ou None se o bloco precisar
+            ser lido linha a linha (modo CSV, expressão que não pode ser
+            aplicada ao bloco ou que casou além do fim de uma linha)
+        """
+        if self._bloco is None:
+            return None
+        encontrados = self._bloco.findall(dados)
+        if b'\n' in b'\0'.join([par[0] for par in encontrados]):
+            return None
+
+        indice_serie, indice_numero = self._indices
+        por_serie = defaultdict(list)
+        validas = 0
+        for par in encontrados:
+            numero = _converter_numero(par[indice_numero].strip())
+            if numero is None:
+                continue
+            por_serie[par[indice_serie]].append(numero)
+            validas += 1
+        return por_serie, validas
+
+    def _extrair_regex(self, linha: bytes) -> Optional[Tuple[bytes, int]]:
+        """Extrai (série, número) de uma linha, ou None se ela não seguir o formato."""
+        encontrado = self._regex.search(linha)
+        if encontrado is None or encontrado['serie'] is None or encontrado['numero'] is None:
+            return None
+        numero = _converter_numero(encontrado['numero'].strip())
+        if numero is None:
+            return None
+        return encontrado['serie'].strip(), numero
+
+    def _extrair_csv(self, linha: bytes) -> Optional[Tuple[bytes, int]]:
+        """Extrai (série, número) das colunas de uma linha, ou None se ela não seguir o formato."""
+        campos = linha.split(self.delimitador)
+        coluna_serie, coluna_numero = self.colunas
+        if len(campos) <= max(coluna_serie, coluna_numero):
+            return None
+        numero = _converter_numero(campos[coluna_numero].strip(_ASPAS_E_ESPACOS))
+        if numero is None:
+            return None
+        return campos[coluna_serie].strip(_ASPAS_E_ESPACOS), numero
+
+
+class SeparadorSeries:
+    """
+    Divide um fluxo de blocos de bytes em uma sequência por série, em uma
+    única passada.
+
+    Como no TokenizadorNumeros, a última linha de cada bloco (que pode
+    continuar no bloco seguinte) fica retida até a chegada do próximo. Os
+    números de cada série vão direto para o backend de análise dela, de
+    modo que o arquivo nunca é carregado inteiro na memória.
+
+    As linhas completas de cada bloco são separadas de uma vez: no modo
+    CSV com NumPy, por separar_csv_vetorizado(); no modo regex, por uma só
+    busca da expressão no bloco (FormatoSeries.separar). Os demais casos
+    são lidos linha a linha.
+    """
+
+    def __init__(self, formato: FormatoSeries, backend: str = 'auto'):
+        self.formato = formato
+        self.backend = backend
+        self.motores = {}
+        self.linhas_ignoradas = 0
+        self.bytes_lidos = 0
+        self._resto = b''
+        self._separar_csv = None
+        if formato.colunas is not None and backend != 'python':
+            try:
+                from .series_numpy import separar_csv_vetorizado
+            except ImportError:
+                pass
+            else:
+                self._separar_csv = separar_csv_vetorizado
+
+    @property
+    def total(self) -> int:
+        """Quantidade de números lidos até agora, somando todas as séries."""
+        return sum(motor.total for motor in self.motores.values())
+
+    def alimentar(self, bloco: bytes):
+        """
+        Processa o próximo bloco de bytes do arquivo.
+
+        Raises:
+            FormatoInvalido: Se o arquivo tiver mais de MAXIMO_SERIES séries
+        """
+        self.bytes_lidos += len(bloco)
+        dados = self._resto + bloco if self._resto else bytes(bloco)
+        corte = dados.rfind(b'\n') + 1
+        self._resto = dados[corte:]
+        self._registrar_bloco(dados[:corte])
+
+    def finalizar(self):
+        """Processa a última linha do arquivo, se não terminar em quebra de linha."""
+        resto, self._resto = self._resto, b''
+        self._registrar_bloco(resto)
+
+    def _registrar_bloco(self, dados: bytes):
+        """Agrupa os números de um bloco de linhas completas por série e os entrega aos backends."""
+        if self._separar_csv is not None:
+            separado = self._separar_csv(dados, self.formato.delimitador, self.formato.colunas)
+            if separado is not None:
+                por_serie, preenchidas, validas = separado
+                self.linhas_ignoradas += preenchidas - validas
+                for chave, numeros in por_serie.items():
+                    self._motor(chave).adicionar_varios(numeros)
+                return
+
+        separado = self.formato.separar(dados)
+        if separado is None:
+            self._registrar(dados.split(b'\n'))
+            return
+
+        por_serie, validas = separado
+        linhas = dados.count(b'\n') + (not dados.endswith(b'\n'))
+        if validas < linhas:
+            self.linhas_ignoradas += len(_LINHA_PREENCHIDA.findall(dados)) - validas
+        for chave, numeros in por_serie.items():
+            self._motor(chave.strip()).adicionar_varios(numeros)
+
+    def _registrar(self, linhas: List[bytes]):
+        """Agrupa os números das linhas por série, linha a linha, e os entrega aos backends."""
+        extrair = self.formato.extrair
+        por_serie = defaultdict(list)
+        for linha in linhas:
+            par = extrair(linha)
+            if par is None:
+                if linha.strip():
+                    self.linhas_ignoradas += 1
+                continue
+            por_serie[par[0]].append(par[1])
+
+        for chave, numeros in por_serie.items():
+            self._motor(chave).adicionar_varios(numeros)
+
+    def _motor(self, chave: bytes):
+        """
+        Retorna o backend de análise de uma série, criando-o na primeira vez.
+
+        Raises:
+            FormatoInvalido: Se o arquivo tiver mais de MAXIMO_SERIES séries
+        """
+        motor = self.motores.get(chave)
+        if motor is None:
+            if len(self.motores) >= MAXIMO_SERIES:
+                raise FormatoInvalido(
+                    f'O arquivo tem mais de {MAXIMO_SERIES} séries. Verifique o formato de linha.'
+                )
+            motor = self.motores[chave] = criar_motor(self.backend)
+        return motor
+
+    def concluir(self, limite_gap: int) -> Dict[str, SnapshotAnalise]:
+        """
+        Encerra a leitura e congela a análise de cada série.
+
+        As séries são independentes e são consolidadas em threads. No
+        backend NumPy a ordenação libera o GIL e as séries são consolidadas
+        de fato em paralelo; no backend Python as threads se revezam, sem
+        custo extra relevante.
+
+        Args:
+            limite_gap: Tamanho a partir do qual uma lacuna é um gap grande
+
+        Returns:
+            Dict[str, SnapshotAnalise]: Snapshot de cada série, pela chave da série
+        """
+        self.finalizar()
+        chaves = sorted(self.motores)
+        motores = [self.motores.pop(chave) for chave in chaves]
+        with ThreadPoolExecutor(max_workers=WORKERS_SERIES) as executor:
+            snapshots = list(executor.map(lambda motor: motor.concluir(limite_gap), motores))
+        return {
+            chave.decode('utf-8', 'replace'): snapshot
+            for chave, snapshot in zip(chaves, snapshots)
+        }
+
+
+def resumo_serie(serie: str, snapshot: SnapshotAnalise, id_resultado: Optional[str] = None) -> dict:
+    """
+    Resume a análise de uma série para a tabela de séries.
+
+    Returns:
+        dict: Série, id do resultado e estatísticas, nos mesmos campos do resumo de um arquivo do lote
+    """
+    tamanho_esperado = snapshot.tamanho_esperado
+    return {
+        'serie': serie,
+        'id_resultado': id_resultado,
+        'total_numeros': snapshot.total,
+        'numeros_unicos': snapshot.total_unicos,
+        'total_faltantes': snapshot.total_faltantes,
+        'total_duplicados': len(snapshot.duplicados),
+        'total_gaps_grandes': len(snapshot.gaps_grandes),
+        'menor': snapshot.menor,
+        'maior': snapshot.maior,
+        'percentual_completo': round(snapshot.total_unicos / tamanho_esperado * 100, 2) if tamanho_esperado else 0,
+    }
+
@@ -0,0 +1,173 @@
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from .motor_numpy import _POTENCIAS_10, MAX_DIGITOS_VETORIZADO
+
+
+# Chaves de série mais longas que isto fazem o bloco ser separado pelo
+# caminho puro Python (as chaves são agrupadas em uma matriz de largura fixa)
+MAX_TAMANHO_CHAVE = 64
+
+# Bytes removidos das pontas de cada campo (os mesmos de _ASPAS_E_ESPACOS)
+_REMOVIDOS = np.zeros(256, dtype=bool)
+_REMOVIDOS[list(b' \t\r"\'')] = True
+
+# Bytes que não tornam uma linha preenchida (os removidos por bytes.strip())
+_BRANCOS = np.zeros(256, dtype=bool)
+_BRANCOS[list(b' \t\n\r\x0b\x0c')] = True
+
+
+def _aparar(b: np.ndarray, inicios: np.ndarray, fins: np.ndarray):
+    """Avança ``inicios`` e recua ``fins`` (no lugar) sobre os bytes de _REMOVIDOS."""
+    ativos = np.flatnonzero(inicios < fins)
+    while len(ativos):
+        ativos = ativos[_REMOVIDOS[b[inicios[ativos]]]]
+        inicios[ativos] += 1
+        ativos = ativos[inicios[ativos] < fins[ativos]]
+
+    ativos = np.flatnonzero(inicios < fins)
+    while len(ativos):
+        ativos = ativos[_REMOVIDOS[b[fins[ativos] - 1]]]
+        fins[ativos] -= 1
+        ativos = ativos[inicios[ativos] < fins[ativos]]
+
+
+def _campo(separadores: np.ndarray, primeiro: np.ndarray, inicios: np.ndarray,
+           fins: np.ndarray, quantidade: np.ndarray, coluna: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Limites (início, fim) da coluna em cada linha, que tem ao menos ``coluna`` separadores."""
+    if coluna == 0:
+        inicio = inicios.copy()
+    else:
+        inicio = separadores[primeiro + coluna - 1] + 1
+    ultima = quantidade == coluna
+    fim = np.where(ultima, fins, separadores[np.minimum(primeiro + coluna, len(separadores) - 1)])
+    return inicio, fim
+
+
+def _converter_campos(b: np.ndarray, inicios: np.ndarray, fins: np.ndarray,
+                      negativos: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converte campos de até MAX_DIGITOS_VETORIZADO bytes em int64.
+
+    Os bytes são alinhados à direita em uma matriz, com uma coluna por casa
+    decimal, e multiplicados pelas potências de 10.
+
+    Returns:
+        tuple: (valores, se cada campo tem só dígitos); o valor de um campo
+        com outros bytes não tem significado
+    """
+    comprimentos = fins - inicios
+    casas = np.arange(int(comprimentos.max()) - 1, -1, -1)
+    matriz = b[np.maximum(fins[:, None] - 1 - casas, 0)].astype(np.int64) - 0x30
+    matriz[casas >= comprimentos[:, None]] = 0
+    so_digitos = ((matriz >= 0) & (matriz <= 9)).all(axis=1)
+    valores = matriz @ _POTENCIAS_10[casas]
+    valores[negativos] *= -1
+    return valores, so_digitos
+
+
+def separar_csv_vetorizado(dados: bytes, delimitador: bytes,
+                           colunas: Tuple[int, int]) -> Optional[Tuple[Dict[bytes, np.ndarray], int, int]]:
+    """
+    Separa os números de um bloco de linhas CSV por série, de uma só vez.
+
+    Equivale a dividir cada linha pelo delimitador e ler as colunas da
+    série e do número (FormatoSeries no modo CSV), sem percorrer as linhas
+    em Python: os limites dos campos saem de ``np.searchsorted`` sobre as
+    posições das quebras de linha e dos delimitadores, os números são
+    convertidos de uma vez (como em extrair_numeros_vetorizado) e as linhas
+    são agrupadas por série com uma ordenação estável das chaves.
+
+    Args:
+        dados: Linhas completas do arquivo
+        delimitador: Delimitador das colunas (um byte)
+        colunas: Índices (a partir de 0) das colunas da série e do número
+
+    Returns:
+        Optional[tuple]: (números de cada série, em arrays int64 na ordem do
+        arquivo; linhas preenchidas; linhas que seguem o formato), ou None se
+        o bloco tiver números longos demais ou chaves de série longas demais
+        para a conversão vetorizada
+    """
+    b = np.frombuffer(dados, dtype=np.uint8)
+    if not len(b):
+        return {}, 0, 0
+
+    quebras = np.flatnonzero(b == 0x0A)
+    inicios = np.concatenate(([0], quebras + 1))
+    fins = np.concatenate((quebras, [len(b)]))
+    if inicios[-1] == len(b):
+        inicios, fins = inicios[:-1], fins[:-1]
+
+    todas = (inicios, fins)
+
+    # Linhas com colunas suficientes
+    separadores = np.flatnonzero(b == delimitador[0])
+    primeiro = np.searchsorted(separadores, inicios)
+    quantidade = np.searchsorted(separadores, fins) - primeiro
+    completas = quantidade >= max(colunas)
+    inicios, fins, primeiro, quantidade = (
+        inicios[completas], fins[completas], primeiro[completas], quantidade[completas]
+    )
+    if not len(inicios):
+        return {}, _contar_preenchidas(b, *todas), 0
+
+    coluna_serie, coluna_numero = colunas
+    inicio_serie, fim_serie = _campo(separadores, primeiro, inicios, fins, quantidade, coluna_serie)
+    inicio_numero, fim_numero = _campo(separadores, primeiro, inicios, fins, quantidade, coluna_numero)
+    _aparar(b, inicio_serie, fim_serie)
+    _aparar(b, inicio_numero, fim_numero)
+
+    # O número é um '-' opcional seguido só de dígitos ASCII, como em PADRAO_NUMEROS
+    primeiro_byte = b[np.minimum(inicio_numero, len(b) - 1)]
+    negativos = (inicio_numero < fim_numero) & (primeiro_byte == 0x2D)
+    inicio_digitos = inicio_numero + negativos
+    comprimento = fim_numero - inicio_digitos
+    longos = comprimento > MAX_DIGITOS_VETORIZADO
+    if longos.any():
+        # Números longos demais para int64 ficam com o caminho puro Python
+        campos = zip(inicio_digitos[longos].tolist(), fim_numero[longos].tolist())
+        if any(dados[inicio:fim].isdigit() for inicio, fim in campos):
+            return None
+
+    validas = (comprimento > 0) & ~longos
+    if not validas.any():
+        return {}, _contar_preenchidas(b, *todas), 0
+    valores, so_digitos = _converter_campos(b, inicio_digitos[validas], fim_numero[validas], negativos[validas])
+    validas[validas] = so_digitos
+    valores = valores[so_digitos]
+    if not len(valores):
+        return {}, _contar_preenchidas(b, *todas), 0
+
+    inicio_serie, fim_serie = inicio_serie[validas], fim_serie[validas]
+
+    tamanho_chave = fim_serie - inicio_serie
+    largura = int(tamanho_chave.max())
+    if largura > MAX_TAMANHO_CHAVE:
+        return None
+
+    # Chaves em uma matriz de largura fixa, completadas com zeros; chaves de
+    # até 8 bytes são comparadas como inteiros
+    largura = 8 if largura <= 8 else largura
+    deslocamento = np.arange(largura)
+    matriz = b[np.minimum(inicio_serie[:, None] + deslocamento, len(b) - 1)]
+    matriz[deslocamento >= tamanho_chave[:, None]] = 0
+    chaves = matriz.view(np.uint64 if largura == 8 else f'S{largura}').ravel()
+
+    # Uma ordenação estável agrupa as linhas por chave, mantendo a ordem do arquivo
+    ordem = np.argsort(chaves, kind='stable')
+    ordenadas = chaves[ordem]
+    limites = np.flatnonzero(ordenadas[1:] != ordenadas[:-1]) + 1
+    grupos = np.split(valores[ordem], limites)
+    primeiras = ordem[np.concatenate(([0], limites))]
+    nomes = [dados[inicio:fim] for inicio, fim in zip(inicio_serie[primeiras].tolist(), fim_serie[primeiras].tolist())]
+
+    linhas_preenchidas = len(valores) if len(valores) == len(todas[0]) else _contar_preenchidas(b, *todas)
+    return dict(zip(nomes, grupos)), linhas_preenchidas, len(valores)
+
+
+def _contar_preenchidas(b: np.ndarray, inicios: np.ndarray, fins: np.ndarray) -> int:
+    """Conta as linhas que não estão em branco."""
+    preenchidos = np.concatenate(([0], np.cumsum(~_BRANCOS[b], dtype=np.int32)))
+    return int(np.count_nonzero(preenchidos[fins] - preenchidos[inicios]))
@@ -1,6 +1,14 @@
-import re
-from typing import List, Tuple, Set
-from collections import Counter
+import time
+from typing import Callable, Iterable, List, Optional
+
+from .admissao import RESERVA_NULA, SemCapacidade, custo_resultado
+from .intervalos import Intervalo, formatar_intervalo
+from .leitura import PADRAO_NUMEROS, ler_mapeado
+from .empacotamento import desempacotar_snapshot, empacotar_snapshot
+from .metricas import MEDIDOR_NULO
+from .motor import criar_motor
+from .previa import criar_esboco
+from .series import FormatoInvalido, FormatoSeries, SeparadorSeries, resumo_serie
 
 
 class AnalisadorSequencia:
@@ -9,14 +17,16 @@ class AnalisadorSequencia:
     e identificar números faltantes e duplicados.
     """
     
-    def __init__(self):
-        self.numeros_encontrados = []
-        self.numeros_faltantes = []
-        self.numeros_duplicados = []
+    def __init__(self, backend: str = 'auto', metricas=None, reserva=None):
+        self.backend = backend  # 'auto', 'python' ou 'numpy'
+        self.metricas = metricas or MEDIDOR_NULO  # MedidorEtapas para medir cada etapa
+        self.reserva = reserva or RESERVA_NULA  # Reserva do controle de admissão, ampliada após a leitura
+        self.motor = criar_motor(backend)
+        self.snapshot = None
+        self.series = {}  # Snapshot de cada série, em processar_series
         self.menor_numero = None
         self.maior_numero = None
         self.limite_gap = 1000  # Limite para gaps muito grandes
-        self.limite_total_numeros = 50000  # Limite total de números a processar
     
     def processar_arquivo(self, conteudo_arquivo: str) -> dict:
         """
@@ -26,82 +36,398 @@ class AnalisadorSequencia:
             conteudo_arquivo (str): Conteúdo do arquivo TXT
             
         Returns:
-            dict: Resultado da análise com números encontrados, faltantes e duplicados
+            dict: Resultado da análise com intervalos encontrados, faltantes e duplicados
+        """
+        numeros = map(int, PADRAO_NUMEROS.findall(conteudo_arquivo))
+        return self._processar(lambda motor: motor.adicionar_varios(numeros))
+    
+    def processar_chunks(self, chunks: Iterable[bytes],
+                         progresso: Optional[Callable[[int, int], None]] = None) -> dict:
+        """
+        Processa o arquivo em blocos de bytes, como os de UploadedFile.chunks().
+        
+        Os números são registrados pelo backend à medida que os blocos chegam,
+        sem carregar o conteúdo inteiro do arquivo na memória.
+        
+        Args:
+            chunks: Blocos de bytes do arquivo TXT
+            progresso: Função opcional chamada após cada bloco com
+                (bytes lidos, números lidos)
+            
+        Returns:
+            dict: Resultado da análise, no mesmo formato de processar_arquivo
+        """
+        return self._processar(self._alimentador(chunks, progresso))
+    
+    def processar_caminho(self, caminho: str,
+                          progresso: Optional[Callable[[int, int], None]] = None) -> dict:
+        """
+        Processa um arquivo em disco, percorrido por mmap.
+        
+        O arquivo é varrido direto nos bytes mapeados, sem ser lido para a
+        memória nem decodificado, de modo que a memória usada não depende
+        do tamanho do arquivo.
+        
+        Args:
+            caminho: Caminho do arquivo TXT
+            progresso: Função opcional chamada após cada fatia com
+                (bytes lidos, números lidos)
+            
+        Returns:
+            dict: Resultado da análise, no mesmo formato de processar_arquivo
+        """
+        return self.processar_chunks(ler_mapeado(caminho), progresso)
+    
+    def estimar_chunks(self, chunks: Iterable[bytes],
+                       progresso: Optional[Callable[[int, int], None]] = None) -> dict:
+        """
+        Gera uma prévia aproximada do arquivo, sem a análise exata.
+        
+        Os blocos são lidos uma única vez por um EsbocoSequencia, com memória
+        constante, e nenhuma lista de faltantes, duplicados ou gaps é montada.
+        Serve para decidir se vale a pena analisar por completo um arquivo
+        muito grande. A análise atual do analisador não é alterada.
+        
+        Args:
+            chunks: Blocos de bytes do arquivo TXT
+            progresso: Função opcional chamada após cada bloco com
+                (bytes lidos, números lidos)
+        
+        Returns:
+            dict: ``sucesso``, ``previa`` (sempre True), ``intervalo`` e
+            ``estatisticas`` com as mesmas chaves de processar_arquivo,
+            marcadas com ``estimativa``
         """
         try:
-            # Limpar dados anteriores
-            self._limpar_dados()
+            esboco = criar_esboco(self.backend)
+            with self.metricas.etapa('estimativa') as etapa:
+                self._alimentador(chunks, progresso)(esboco)
+                esboco.finalizar_leitura()
+                etapa['numeros'] = esboco.total
             
-            # Extrair números do conteúdo
-            self.numeros_encontrados = self._extrair_numeros(conteudo_arquivo)
+            if not esboco.total:
+                return {'sucesso': False, 'erro': 'Nenhum número foi encontrado no arquivo.', 'estatisticas': {}}
             
-            if not self.numeros_encontrados:
-                return {
-                    'sucesso': False,
-                    'erro': 'Nenhum número foi encontrado no arquivo.',
-                    'numeros_encontrados': [],
-                    'numeros_faltantes': [],
-                    'numeros_duplicados': [],
-                    'estatisticas': {}
+            resultado = {
+                'sucesso': True,
+                'previa': True,
+                'estatisticas': esboco.estatisticas(self.limite_gap),
+                'intervalo': {
+                    'menor': esboco.menor,
+                    'maior': esboco.maior
                 }
+            }
+            if self.metricas.ativo:
+                resultado['metricas'] = self.metricas.como_dict()
+            return resultado
+            
+        except Exception as e:
+            return {'sucesso': False, 'erro': f'Erro ao processar arquivo: {str(e)}', 'estatisticas': {}}
+    
+    def processar_recebido(self, arquivo) -> dict:
+        """
+        Conclui a análise de um arquivo cujos números já foram registrados
+        durante o upload, por AnaliseDuranteUpload.
+        
+        Args:
+            arquivo (ArquivoAnalisado): Arquivo recebido, com o backend já alimentado
+            
+        Returns:
+            dict: Resultado da análise, no mesmo formato de processar_arquivo
+        """
+        def alimentar(motor):
+            if arquivo.erro is not None:
+                raise arquivo.erro
+        
+        self.metricas.adicionar('recepcao', arquivo.tempo_analise * 1000)
+        return self._processar(alimentar, motor=arquivo.motor)
+    
+    def processar_series(self, chunks: Iterable[bytes], formato: FormatoSeries) -> dict:
+        """
+        Processa um arquivo com várias séries misturadas (por exemplo, notas
+        de séries diferentes), analisando cada série separadamente.
+        
+        Cada linha é lida pelo ``formato`` (chave da série e número) em uma
+        única passada; os números de cada série alimentam um backend próprio,
+        e as séries são consolidadas em paralelo no final. Os snapshots ficam
+        em ``self.series``.
+        
+        Args:
+            chunks: Blocos de bytes do arquivo
+            formato: Formato das linhas (regex com grupos nomeados ou colunas CSV)
             
-            # Identificar duplicados
-            self.numeros_duplicados = self._identificar_duplicados()
+        Returns:
+            dict: Resumo de cada série em ``series``, ordenadas pela chave
+        """
+        self._limpar_dados()
+        separador = SeparadorSeries(formato, self.backend)
+        
+        try:
+            with self.metricas.etapa('extracao') as etapa:
+                for bloco in chunks:
+                    separador.alimentar(bloco)
+                separador.finalizar()
+                etapa['numeros'] = separador.total
             
-            # Determinar intervalo da sequência
-            self.menor_numero = min(self.numeros_encontrados)
-            self.maior_numero = max(self.numeros_encontrados)
+            # Reservar a memória da consolidação de todas as séries, que
+            # ficam prontas ao mesmo tempo, antes de começá-la
+            custo = 0
+            for motor in separador.motores.values():
+                intervalo = motor.intervalo()
+                if intervalo is not None:
+                    custo += custo_resultado(motor.total, *intervalo)
+            self.reserva.ampliar(custo)
             
-            # Verificar se o gap é muito grande
-            tamanho_sequencia = self.maior_numero - self.menor_numero + 1
+            with self.metricas.etapa('consolidacao', len(separador.motores)):
+                self.series = separador.concluir(self.limite_gap)
             
-            if tamanho_sequencia > self.limite_total_numeros:
+        except SemCapacidade:
+            raise
+        except FormatoInvalido as e:
+            return {'sucesso': False, 'erro': str(e), 'series': [], 'estatisticas': {}}
+        except Exception as e:
+            return {'sucesso': False, 'erro': f'Erro ao processar arquivo: {str(e)}', 'series': [], 'estatisticas': {}}
+        
+        if not self.series:
+            return {
+                'sucesso': False,
+                'erro': 'Nenhuma linha do arquivo segue o formato informado.',
+                'series': [],
+                'estatisticas': {},
+            }
+        
+        resultado = {
+            'sucesso': True,
+            'series': [resumo_serie(serie, snapshot) for serie, snapshot in self.series.items()],
+            'estatisticas': {
+                'total_series': len(self.series),
+                'total_numeros_arquivo': sum(snapshot.total for snapshot in self.series.values()),
+                'linhas_ignoradas': separador.linhas_ignoradas,
+            },
+        }
+        if self.metricas.ativo:
+            resultado['metricas'] = self.metricas.como_dict()
+        return resultado
+    
+    def acrescentar_chunks(self, chunks: Iterable[bytes],
+                           progresso: Optional[Callable[[int, int], None]] = None) -> dict:
+        """
+        Acrescenta números novos à análise carregada (por carregar_snapshot,
+        carregar_estado ou uma análise anterior deste analisador).
+        
+        Apenas os números novos são analisados; o resultado é mesclado ao
+        estado atual por SnapshotAnalise.acrescentar(), que só recalcula o
+        trecho da sequência tocado por eles. Sem análise carregada, equivale
+        a processar_chunks.
+        
+        Args:
+            chunks: Blocos de bytes com os números novos
+            progresso: Função opcional chamada após cada bloco com
+                (bytes lidos, números lidos)
+            
+        Returns:
+            dict: Resultado da sequência completa, no mesmo formato de processar_arquivo
+        """
+        return self._processar(self._alimentador(chunks, progresso), base=self.snapshot)
+    
+    def acrescentar_arquivo(self, conteudo_arquivo: str) -> dict:
+        """
+        Acrescenta à análise carregada os números de um texto.
+        
+        Args:
+            conteudo_arquivo (str): Texto com os números novos
+            
+        Returns:
+            dict: Resultado da sequência completa, no mesmo formato de processar_arquivo
+        """
+        numeros = map(int, PADRAO_NUMEROS.findall(conteudo_arquivo))
+        return self._processar(lambda motor: motor.adicionar_varios(numeros), base=self.snapshot)
+    
+    def salvar_estado(self) -> bytes:
+        """
+        Serializa o estado da análise atual (corridas e contagem de
+        duplicados), para ser retomado depois por carregar_estado.
+        
+        Returns:
+            bytes: Estado compacto da análise
+        """
+        if self.snapshot is None:
+            raise ValueError('Nenhuma análise para salvar.')
+        return empacotar_snapshot(self.snapshot)
+    
+    def carregar_estado(self, estado: bytes) -> dict:
+        """
+        Retoma uma análise salva por salvar_estado.
+        
+        Args:
+            estado: Bytes gerados por salvar_estado
+            
+        Returns:
+            dict: Resultado da análise salva, no mesmo formato de processar_arquivo
+        """
+        return self.carregar_snapshot(desempacotar_snapshot(estado))
+    
+    def _alimentador(self, chunks: Iterable[bytes],
+                     progresso: Optional[Callable[[int, int], None]]):
+        """Monta a função que entrega os blocos ao backend, informando o progresso."""
+        blocos = self._medir_leitura(chunks) if self.metricas.ativo else chunks
+        
+        def alimentar(motor):
+            for bloco in blocos:
+                motor.alimentar(bloco)
+                if progresso is not None:
+                    progresso(motor.bytes_lidos, motor.total)
+        
+        return alimentar
+    
+    def _medir_leitura(self, chunks: Iterable[bytes]):
+        """
+        Repassa os blocos acumulando o tempo gasto para obtê-los (leitura do
+        upload, descompressão), que é descontado da etapa de extração.
+        """
+        self._tempo_leitura = 0.0
+        iterador = iter(chunks)
+        while True:
+            inicio = time.perf_counter()
+            bloco = next(iterador, None)
+            self._tempo_leitura += time.perf_counter() - inicio
+            if bloco is None:
+                return
+            yield bloco
+    
+    def _processar(self, alimentar, base=None, motor=None) -> dict:
+        """
+        Executa a análise, entregando os dados ao backend por meio de ``alimentar``.
+        
+        Args:
+            alimentar: Função que recebe o backend e envia a ele o conteúdo do arquivo
+            base (SnapshotAnalise): Análise à qual os números são acrescentados, se houver
+            motor: Backend que já recebeu parte dos dados; se omitido, um novo é usado
+            
+        Returns:
+            dict: Resultado da análise com intervalos encontrados, faltantes e duplicados
+        """
+        try:
+            # Limpar dados anteriores
+            self._limpar_dados()
+            if motor is not None:
+                self.motor = motor
+            
+            # Registrar os números sem materializar a lista completa
+            self._tempo_leitura = 0.0
+            with self.metricas.etapa('extracao') as etapa:
+                alimentar(self.motor)
+                self.motor.finalizar_leitura()
+                etapa['numeros'] = self.motor.total
+            if self._tempo_leitura:
+                etapa['tempo_ms'] = round(etapa['tempo_ms'] - self._tempo_leitura * 1000, 3)
+                self.metricas.adicionar('leitura', self._tempo_leitura * 1000)
+            
+            # Com a quantidade e o intervalo conhecidos, reservar a memória
+            # da consolidação antes de começá-la
+            intervalo = self.motor.intervalo()
+            if intervalo is not None:
+                self.reserva.ampliar(custo_resultado(self.motor.total, *intervalo))
+            
+            # Congelar a análise: corridas, duplicados e lacunas são
+            # calculados uma única vez e lidos pelos demais métodos
+            with self.metricas.etapa('consolidacao') as etapa:
+                self.snapshot = self.motor.concluir(self.limite_gap)
+                etapa['numeros'] = self.snapshot.total_unicos
+            self.motor = criar_motor(self.backend)
+            
+            if base is not None:
+                with self.metricas.etapa('mesclagem', self.snapshot.total):
+                    self.snapshot = base.acrescentar(self.snapshot)
+            
+            if not self.snapshot.total:
                 return {
                     'sucesso': False,
-                    'erro': f'O intervalo da sequência é muito grande ({tamanho_sequencia:,} números). '
-                           f'Para análises de sequências com mais de {self.limite_total_numeros:,} números, '
-                           f'considere dividir o arquivo em partes menores.',
-                    'numeros_encontrados': [],
-                    'numeros_faltantes': [],
+                    'erro': 'Nenhum número foi encontrado no arquivo.',
+                    'intervalos_encontrados': [],
+                    'intervalos_faltantes': [],
                     'numeros_duplicados': [],
-                    'estatisticas': {},
-                    'gap_muito_grande': True
+                    'estatisticas': {}
                 }
             
-            # Identificar números faltantes (agora com otimização)
-            self.numeros_faltantes = self._identificar_faltantes_otimizado()
+            # Determinar intervalo da sequência
+            self.menor_numero = self.snapshot.menor
+            self.maior_numero = self.snapshot.maior
             
-            # Preparar estatísticas
-            estatisticas = self._gerar_estatisticas()
-            
-            return {
-                'sucesso': True,
-                'numeros_encontrados': sorted(list(set(self.numeros_encontrados))),
-                'numeros_faltantes': self.numeros_faltantes,
-                'numeros_duplicados': self.numeros_duplicados,
-                'estatisticas': estatisticas,
-                'intervalo': {
-                    'menor': self.menor_numero,
-                    'maior': self.maior_numero
-                },
-                'gap_detectado': self._detectar_gaps_grandes()
-            }
+            return self._montar_resultado()
             
         except Exception as e:
+            # Em um acréscimo que falhou, a análise anterior continua valendo
+            if base is not None:
+                self.carregar_snapshot(base)
+            if isinstance(e, SemCapacidade):
+                raise
             return {
                 'sucesso': False,
                 'erro': f'Erro ao processar arquivo: {str(e)}',
-                'numeros_encontrados': [],
-                'numeros_faltantes': [],
+                'intervalos_encontrados': [],
+                'intervalos_faltantes': [],
                 'numeros_duplicados': [],
                 'estatisticas': {}
             }
     
+    def carregar_snapshot(self, snapshot) -> dict:
+        """
+        Carrega o snapshot de uma análise anterior, sem reprocessar o arquivo.
+        
+        Args:
+            snapshot (SnapshotAnalise): Snapshot de uma análise bem-sucedida
+            
+        Returns:
+            dict: Resultado da análise, no mesmo formato de processar_arquivo
+        """
+        self._limpar_dados()
+        self.snapshot = snapshot
+        self.limite_gap = snapshot.limite_gap
+        self.menor_numero = snapshot.menor
+        self.maior_numero = snapshot.maior
+        return self._montar_resultado()
+    
+    def _montar_resultado(self) -> dict:
+        """
+        Monta o dicionário de resultado a partir do snapshot da análise.
+        
+        Returns:
+            dict: Resultado da análise com intervalos encontrados, faltantes e duplicados
+        """
+        metricas = self.metricas
+        snapshot = self.snapshot
+        
+        with metricas.etapa('faltantes', len(snapshot.faltantes)):
+            faltantes = self._identificar_faltantes_otimizado()
+        with metricas.etapa('duplicados', len(snapshot.duplicados)):
+            duplicados = self._identificar_duplicados()
+        with metricas.etapa('gaps', len(snapshot.gaps_grandes)):
+            gaps = self._detectar_gaps_grandes()
+        
+        resultado = {
+            'sucesso': True,
+            'intervalos_encontrados': list(snapshot.corridas),
+            'intervalos_faltantes': faltantes,
+            'numeros_duplicados': duplicados,
+            'estatisticas': self._gerar_estatisticas(),
+            'intervalo': {
+                'menor': self.menor_numero,
+                'maior': self.maior_numero
+            },
+            'gap_detectado': gaps
+        }
+        
+        if metricas.ativo:
+            resultado['metricas'] = metricas.como_dict()
+        
+        return resultado
+    
     def _limpar_dados(self):
         """Limpa os dados de análises anteriores."""
-        self.numeros_encontrados = []
-        self.numeros_faltantes = []
-        self.numeros_duplicados = []
+        self.motor = criar_motor(self.backend)
+        self.snapshot = None
+        self.series = {}
         self.menor_numero = None
         self.maior_numero = None
     
@@ -121,11 +447,8 @@ class AnalisadorSequencia:
         # Remove espaços extras e quebras de linha desnecessárias
         conteudo_limpo = conteudo.strip()
         
-        # Padrão regex para encontrar números (incluindo negativos)
-        padrao_numeros = r'-?\d+'
-        
         # Encontra todos os números no texto
-        numeros_texto = re.findall(padrao_numeros, conteudo_limpo)
+        numeros_texto = PADRAO_NUMEROS.findall(conteudo_limpo)
         
         # Converte para inteiros
         numeros = []
@@ -146,19 +469,13 @@ class AnalisadorSequencia:
         Returns:
             List[dict]: Lista com números duplicados e suas quantidades
         """
-        contador = Counter(self.numeros_encontrados)
-        duplicados = []
-        
-        for numero, quantidade in contador.items():
-            if quantidade > 1:
-                duplicados.append({
-                    'numero': numero,
-                    'quantidade': quantidade
-                })
+        if self.snapshot is None:
+            return []
         
-        # Ordena por número
-        duplicados.sort(key=lambda x: x['numero'])
-        return duplicados
+        return [
+            {'numero': numero, 'quantidade': quantidade}
+            for numero, quantidade in self.snapshot.duplicados
+        ]
     
     def _detectar_gaps_grandes(self) -> List[dict]:
         """
@@ -167,85 +484,33 @@ class AnalisadorSequencia:
         Returns:
             List[dict]: Lista com informações sobre gaps grandes
         """
-        if not self.numeros_encontrados:
+        if self.snapshot is None:
             return []
         
-        numeros_unicos = sorted(set(self.numeros_encontrados))
-        gaps_grandes = []
-        
-        for i in range(len(numeros_unicos) - 1):
-            gap = numeros_unicos[i + 1] - numeros_unicos[i] - 1
-            if gap > self.limite_gap:
-                gaps_grandes.append({
-                    'inicio': numeros_unicos[i],
-                    'fim': numeros_unicos[i + 1],
-                    'tamanho_gap': gap
-                })
-        
-        return gaps_grandes
+        return [
+            {'inicio': inicio - 1, 'fim': fim + 1, 'tamanho_gap': fim - inicio + 1}
+            for inicio, fim in self.snapshot.gaps_grandes
+        ]
     
-    def _identificar_faltantes_otimizado(self) -> List[int]:
+    def _identificar_faltantes_otimizado(self) -> List[Intervalo]:
         """
-        Versão otimizada para identificar números faltantes na sequência.
-        Evita problemas de memória com gaps muito grandes.
+        Identifica números faltantes a partir das lacunas do snapshot.
         
-        Returns:
-            List[int]: Lista de números faltantes na sequência
-        """
-        if not self.numeros_encontrados:
-            return []
-        
-        # Cria set dos números únicos encontrados
-        numeros_unicos_set = set(self.numeros_encontrados)
-        numeros_unicos_lista = sorted(numeros_unicos_set)
-        
-        # Verifica se há gaps muito grandes
-        gaps_grandes = self._detectar_gaps_grandes()
-        
-        faltantes = []
-        
-        # Se não há gaps grandes, usa método tradicional
-        if not gaps_grandes:
-            if self.menor_numero is not None and self.maior_numero is not None:
-                for numero in range(self.menor_numero, self.maior_numero + 1):
-                    if numero not in numeros_unicos_set:
-                        faltantes.append(numero)
-        else:
-            # Com gaps grandes, analisa apenas blocos consecutivos
-            faltantes = self._identificar_faltantes_por_blocos(numeros_unicos_lista)
-        
-        return faltantes
-    
-    def _identificar_faltantes_por_blocos(self, numeros_ordenados: List[int]) -> List[int]:
-        """
-        Identifica números faltantes analisando apenas blocos consecutivos.
-        Evita análise de gaps muito grandes.
+        Lacunas maiores que ``limite_gap`` indicam blocos diferentes e são
+        reportadas por _detectar_gaps_grandes(); apenas as lacunas pequenas
+        entram na lista de faltantes. Cada lacuna é mantida como um intervalo
+        (início, fim), de modo que o custo depende da quantidade de lacunas e
+        não da quantidade de números faltantes.
         
-        Args:
-            numeros_ordenados: Lista de números únicos ordenados
-            
         Returns:
-            List[int]: Lista de números faltantes em blocos consecutivos
+            List[Intervalo]: Intervalos de números faltantes na sequência
         """
-        if len(numeros_ordenados) <= 1:
+        if self.snapshot is None:
             return []
         
-        faltantes = []
-        numeros_set = set(numeros_ordenados)
-        
-        for i in range(len(numeros_ordenados) - 1):
-            atual = numeros_ordenados[i]
-            proximo = numeros_ordenados[i + 1]
-            gap = proximo - atual - 1
-            
-            # Só analisa gaps pequenos
-            if 0 < gap <= self.limite_gap:
-                for num in range(atual + 1, proximo):
-                    faltantes.append(num)
-        
-        return faltantes
+        return list(self.snapshot.faltantes)
     
-    def _identificar_faltantes(self) -> List[int]:
+    def _identificar_faltantes(self) -> List[Intervalo]:
         """
         MÉTODO LEGACY - Mantido para compatibilidade.
         Use _identificar_faltantes_otimizado() para melhor performance.
@@ -259,29 +524,18 @@ class AnalisadorSequencia:
         Returns:
             dict: Estatísticas da análise
         """
-        total_numeros_encontrados = len(self.numeros_encontrados)
-        numeros_unicos = len(set(self.numeros_encontrados))
-        total_duplicados = len(self.numeros_duplicados)
-        total_faltantes = len(self.numeros_faltantes)
-        
-        # Calcula tamanho esperado da sequência
-        tamanho_esperado = 0
-        if self.menor_numero is not None and self.maior_numero is not None:
-            tamanho_esperado = self.maior_numero - self.menor_numero + 1
-        
-        # Detecta se há gaps grandes
-        gaps_grandes = self._detectar_gaps_grandes()
-        tem_gaps_grandes = len(gaps_grandes) > 0
+        snapshot = self.snapshot
+        tamanho_esperado = snapshot.tamanho_esperado
         
         estatisticas = {
-            'total_numeros_arquivo': total_numeros_encontrados,
-            'numeros_unicos': numeros_unicos,
-            'total_duplicados': total_duplicados,
-            'total_faltantes': total_faltantes,
+            'total_numeros_arquivo': snapshot.total,
+            'numeros_unicos': snapshot.total_unicos,
+            'total_duplicados': len(snapshot.duplicados),
+            'total_faltantes': snapshot.total_faltantes,
             'tamanho_sequencia_esperada': tamanho_esperado,
-            'percentual_completo': round((numeros_unicos / tamanho_esperado * 100), 2) if tamanho_esperado > 0 else 0,
-            'tem_gaps_grandes': tem_gaps_grandes,
-            'total_gaps_grandes': len(gaps_grandes)
+            'percentual_completo': round((snapshot.total_unicos / tamanho_esperado * 100), 2) if tamanho_esperado > 0 else 0,
+            'tem_gaps_grandes': len(snapshot.gaps_grandes) > 0,
+            'total_gaps_grandes': len(snapshot.gaps_grandes)
         }
         
         return estatisticas
@@ -290,17 +544,21 @@ class AnalisadorSequencia:
         """
         Gera uma string formatada dos números faltantes para cópia.
         
+        Números consecutivos aparecem agrupados, como em "1001-1050".
+        
         Returns:
-            str: String com números faltantes separados por vírgula
+            str: String com números e intervalos faltantes separados por vírgula
         """
-        if not self.numeros_faltantes:
+        faltantes = self.snapshot.faltantes if self.snapshot else ()
+        
+        if not faltantes:
             return "Nenhum número faltante"
         
-        # Se há muitos números faltantes, sugere análise por blocos
-        if len(self.numeros_faltantes) > 1000:
-            return f"Muitos números faltantes ({len(self.numeros_faltantes)}). Considere analisar por blocos menores."
+        # Se há muitos intervalos faltantes, a lista completa fica para a exportação
+        if len(faltantes) > 1000:
+            return f"Muitos intervalos faltantes ({len(faltantes)}). Baixe a lista completa em CSV ou TXT."
         
-        return ", ".join(map(str, self.numeros_faltantes))
+        return ", ".join(map(formatar_intervalo, faltantes))
     
     def gerar_relatorio_gaps(self) -> str:
         """
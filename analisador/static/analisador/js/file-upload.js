@@ -2,6 +2,10 @@
 (function() {
     'use strict';
     
+    // Acima deste tamanho, a análise roda em segundo plano com progresso
+    const LIMITE_ASSINCRONO = 2 * 1024 * 1024;
+    const INTERVALO_STATUS = 500;
+    
     // Versão simplificada e mais robusta
     function initFileUpload() {
         const fileInput = document.getElementById('arquivo');
@@ -78,10 +82,12 @@
             // Mostrar informações do arquivo
             fileInfo.style.display = 'block';
             
-            // Validar tamanho (5MB máximo)
-            if (file.size > 30 * 1024 * 1024) {
+            // Validar tamanho (limite definido no servidor)
+            const tamanhoMaximo = Number(uploadForm.dataset.tamanhoMaximo);
+            if (tamanhoMaximo && file.size > tamanhoMaximo) {
                 fileInfo.className = 'alert alert-danger';
-                fileInfo.innerHTML = '<i class="bi bi-exclamation-triangle"></i> <strong>Erro:</strong> Arquivo muito grande (máximo 5MB)';
+                fileInfo.innerHTML = '<i class="bi bi-exclamation-triangle"></i> <strong>Erro:</strong> Arquivo muito grande (máximo ' +
+                    Math.round(tamanhoMaximo / (1024 * 1024)) + 'MB)';
                 submitBtn.disabled = true;
             } else {
                 fileInfo.className = 'alert alert-info';
@@ -111,8 +117,65 @@
             submitBtn.innerHTML = '<i class="bi bi-hourglass-split"></i> Processando...';
             submitBtn.disabled = true;
             
+            // Arquivos grandes são analisados em segundo plano, com progresso
+            const urlAssincrono = uploadForm.dataset.assincronoUrl;
+            if (urlAssincrono && fileInput.files[0].size > LIMITE_ASSINCRONO) {
+                e.preventDefault();
+                enviarAssincrono(urlAssincrono);
+                return false;
+            }
+            
             return true;
         });
+        
+        function enviarAssincrono(url) {
+            const progresso = document.getElementById('progressoAnalise');
+            const barra = document.getElementById('progressoBarra');
+            const texto = document.getElementById('progressoTexto');
+            
+            progresso.style.display = 'block';
+            texto.textContent = 'Enviando arquivo...';
+            
+            fetch(url, { method: 'POST', body: new FormData(uploadForm) })
+                .then(resposta => resposta.json().then(dados => ({ ok: resposta.ok, dados })))
+                .then(({ ok, dados }) => {
+                    if (!ok) {
+                        throw new Error(dados.erro || 'Erro ao enviar arquivo.');
+                    }
+                    acompanharTarefa(dados, barra, texto);
+                })
+                .catch(falhar);
+        }
+        
+        function acompanharTarefa(tarefa, barra, texto) {
+            fetch(tarefa.status_url)
+                .then(resposta => resposta.json())
+                .then(status => {
+                    if (status.estado === 'erro' || status.erro) {
+                        throw new Error(status.erro || 'Erro ao processar arquivo.');
+                    }
+                    
+                    barra.style.width = status.percentual + '%';
+                    barra.textContent = status.percentual + '%';
+                    texto.textContent = `${(status.bytes_lidos / 1024 / 1024).toFixed(1)} MB lidos, ` +
+                        `${status.numeros_lidos.toLocaleString('pt-BR')} números encontrados`;
+                    
+                    if (status.estado === 'concluida') {
+                        window.location.href = tarefa.resultado_url;
+                    } else {
+                        setTimeout(() => acompanharTarefa(tarefa, barra, texto), INTERVALO_STATUS);
+                    }
+                })
+                .catch(falhar);
+        }
+        
+        function falhar(erro) {
+            document.getElementById('progressoAnalise').style.display = 'none';
+            alert(erro.message);
+            formSubmitted = false;
+            submitBtn.innerHTML = '<i class="bi bi-play-circle"></i> Analisar Sequência Numérica';
+            submitBtn.disabled = false;
+        }
     }
     
     // Inicializar quando a página carregar
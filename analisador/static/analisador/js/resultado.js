@@ -66,4 +66,71 @@ document.addEventListener('DOMContentLoaded', function() {
             }, 2000);
         }
     }
-});
\ No newline at end of file
+    
+    // Listas do resultado carregadas por página
+    document.querySelectorAll('.lista-paginada').forEach(iniciarListaPaginada);
+});
+
+function iniciarListaPaginada(container) {
+    const itens = container.querySelector('.lista-itens');
+    const botao = container.querySelector('.carregar-mais');
+    const tipo = container.dataset.tipo;
+    let proximaPagina = 1;
+    
+    function criarItem(item) {
+        if (tipo === 'duplicados') {
+            const coluna = document.createElement('div');
+            coluna.className = 'col-md-6 col-lg-4 mb-3';
+            coluna.innerHTML =
+                '<div class="card border-warning">' +
+                    '<div class="card-body text-center p-3">' +
+                        '<h5 class="card-title text-warning mb-1"></h5>' +
+                        '<p class="card-text mb-0"><small class="text-muted"></small></p>' +
+                        '<span class="badge numero-badge duplicado"></span>' +
+                    '</div>' +
+                '</div>';
+            coluna.querySelector('h5').textContent = item.numero;
+            coluna.querySelector('small').textContent = 'Aparece ' + item.quantidade + ' vezes';
+            coluna.querySelector('.badge').textContent = item.quantidade + 'x';
+            return coluna;
+        }
+        
+        const badge = document.createElement('span');
+        badge.className = 'badge numero-badge faltante';
+        badge.textContent = item;
+        return badge;
+    }
+    
+    async function carregarPagina() {
+        botao.disabled = true;
+        try {
+            const resposta = await fetch(container.dataset.url + '?pagina=' + proximaPagina);
+            const dados = await resposta.json();
+            if (!resposta.ok) {
+                throw new Error(dados.erro || 'Erro ao carregar a lista.');
+            }
+            
+            const fragmento = document.createDocumentFragment();
+            dados.itens.forEach(function(item) {
+                fragmento.appendChild(criarItem(item));
+                fragmento.appendChild(document.createTextNode(' '));
+            });
+            itens.appendChild(fragmento);
+            
+            proximaPagina = dados.pagina + 1;
+            botao.classList.toggle('d-none', !dados.tem_proxima);
+        } catch (err) {
+            console.error('Erro ao carregar lista:', err);
+            const aviso = document.createElement('div');
+            aviso.className = 'alert alert-warning mt-2 mb-0';
+            aviso.textContent = err.message;
+            container.appendChild(aviso);
+            botao.classList.add('d-none');
+        } finally {
+            botao.disabled = false;
+        }
+    }
+    
+    botao.addEventListener('click', carregarPagina);
+    carregarPagina();
+}
\ No newline at end of file
@@ -0,0 +1,269 @@
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import BinaryIO, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections, connection
+
+from .admissao import SemCapacidade, custo_leitura, obter_controle
+from .cache_resultados import analisar_com_cache
+from .leitura import ler_mapeado
+from .metricas import criar_medidor
+from .servicos import AnalisadorSequencia
+
+
+# Intervalo mínimo, em segundos, entre duas publicações do progresso no cache
+INTERVALO_PUBLICACAO = 0.5
+
+# Tamanho das fatias lidas do arquivo retido; menores que as da leitura
+# comum para que o progresso seja atualizado com frequência
+TAMANHO_FATIA = 1024 * 1024
+
+# Estados possíveis de uma tarefa
+NA_FILA = 'na_fila'
+PROCESSANDO = 'processando'
+CONCLUIDA = 'concluida'
+ERRO = 'erro'
+
+
+@dataclass
+class Tarefa:
+    """
+    Análise executada em segundo plano, fora do ciclo de request/response.
+    """
+    id: str
+    nome_arquivo: str
+    bytes_total: int
+    estado: str = NA_FILA
+    bytes_lidos: int = 0
+    numeros_lidos: int = 0
+    id_resultado: Optional[str] = None
+    erro: Optional[str] = None
+    criada_em: float = field(default_factory=time.time)
+    concluida_em: Optional[float] = None
+
+    @property
+    def finalizada(self) -> bool:
+        return self.estado in (CONCLUIDA, ERRO)
+
+    def progresso(self) -> dict:
+        """
+        Resume o andamento da tarefa para o endpoint de status.
+
+        Returns:
+            dict: Estado, bytes e números processados até agora
+        """
+        percentual = 100.0 if self.estado == CONCLUIDA else 0.0
+        if self.estado == PROCESSANDO and self.bytes_total:
+            percentual = round(min(self.bytes_lidos / self.bytes_total * 100, 100), 1)
+
+        return {
+            'id': self.id,
+            'estado': self.estado,
+            'nome_arquivo': self.nome_arquivo,
+            'bytes_total': self.bytes_total,
+            'bytes_lidos': self.bytes_lidos,
+            'numeros_lidos': self.numeros_lidos,
+            'percentual': percentual,
+            'id_resultado': self.id_resultado,
+            'erro': self.erro,
+        }
+
+
+class FilaCheia(Exception):
+    """Há tarefas demais aguardando ou em andamento neste processo."""
+
+    def __init__(self, mensagem: str, retry_after: int):
+        super().__init__(mensagem)
+        self.retry_after = retry_after  # Segundos sugeridos antes de tentar de novo
+
+
+_tarefas: Dict[str, Tarefa] = {}
+_lock = threading.Lock()
+_executor = None
+
+
+def _obter_executor() -> ThreadPoolExecutor:
+    """Cria o pool de threads na primeira tarefa, usando a configuração do projeto."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'ANALISADOR_TAREFAS_WORKERS', 2),
+                thread_name_prefix='analisador',
+            )
+        return _executor
+
+
+def _cache():
+    return caches[getattr(settings, 'ANALISADOR_CACHE_ALIAS', 'default')]
+
+
+def _chave(tarefa_id: str) -> str:
+    return f'tarefa:{tarefa_id}'
+
+
+def _publicar(tarefa: Tarefa):
+    """
+    Grava o estado da tarefa no cache de resultados, de onde obter_tarefa o
+    lê quando a tarefa foi criada por outro processo.
+
+    Com um cache compartilhado (Redis, Memcached, banco de dados), qualquer
+    processo do servidor responde pelo andamento; com o LocMemCache padrão,
+    cada processo só enxerga as próprias tarefas.
+    """
+    _cache().set(_chave(tarefa.id), asdict(tarefa), getattr(settings, 'ANALISADOR_TAREFAS_TTL', 3600))
+
+
+def _remover_expiradas():
+    """Descarta tarefas finalizadas há mais tempo que ANALISADOR_TAREFAS_TTL."""
+    limite = time.time() - getattr(settings, 'ANALISADOR_TAREFAS_TTL', 3600)
+    with _lock:
+        for tarefa_id in [
+            t.id for t in _tarefas.values()
+            if t.finalizada and t.concluida_em < limite
+        ]:
+            del _tarefas[tarefa_id]
+
+
+def reter_arquivo(arquivo) -> BinaryIO:
+    """
+    Mantém o conteúdo de um upload acessível depois do fim do request.
+
+    O Django fecha (e apaga) os arquivos enviados ao terminar o request.
+    Arquivos em disco são reabertos por um descritor próprio, que continua
+    válido mesmo depois de o Django apagar o arquivo temporário; arquivos
+    em memória são copiados para um arquivo temporário anônimo, para que as
+    tarefas na fila não retenham memória.
+
+    Args:
+        arquivo: UploadedFile recebido no request
+
+    Returns:
+        BinaryIO: Arquivo aberto para leitura a partir do início
+    """
+    if hasattr(arquivo, 'temporary_file_path'):
+        return open(arquivo.temporary_file_path(), 'rb')
+
+    arquivo.seek(0)
+    copia = tempfile.TemporaryFile()
+    shutil.copyfileobj(arquivo, copia)
+    copia.seek(0)
+    return copia
+
+
+def _executar(tarefa: Tarefa, fonte: BinaryIO):
+    """
+    Roda a análise na thread do pool, atualizando o progresso da tarefa.
+
+    A tarefa continua na fila até o controle de admissão liberar memória
+    para ela; em segundo plano, a espera não tem limite de tempo. A thread
+    fica fora do ciclo de request do Django, que fecha as conexões com o
+    banco: a conexão usada pelo histórico é fechada ao final da tarefa.
+    """
+    publicado_em = 0.0
+
+    def progresso(bytes_lidos, numeros_lidos):
+        nonlocal publicado_em
+        tarefa.bytes_lidos = bytes_lidos
+        tarefa.numeros_lidos = numeros_lidos
+        if time.monotonic() - publicado_em >= INTERVALO_PUBLICACAO:
+            publicado_em = time.monotonic()
+            _publicar(tarefa)
+
+    medidor = criar_medidor()
+    close_old_connections()
+    try:
+        with obter_controle().admitir(custo_leitura(tarefa.bytes_total), limitar_espera=False) as reserva:
+            tarefa.estado = PROCESSANDO
+            _publicar(tarefa)
+            analisador = AnalisadorSequencia(metricas=medidor, reserva=reserva)
+            resultado = analisar_com_cache(
+                analisador, lambda: ler_mapeado(fonte, TAMANHO_FATIA), progresso=progresso,
+                nome_arquivo=tarefa.nome_arquivo,
+            )
+    except SemCapacidade as e:
+        tarefa.erro = str(e)
+        tarefa.estado = ERRO
+    except Exception as e:
+        tarefa.erro = f'Erro inesperado ao processar arquivo: {str(e)}'
+        tarefa.estado = ERRO
+    else:
+        if resultado['sucesso']:
+            tarefa.id_resultado = resultado['id_resultado']
+            tarefa.numeros_lidos = resultado['estatisticas']['total_numeros_arquivo']
+            tarefa.estado = CONCLUIDA
+        else:
+            tarefa.erro = resultado['erro']
+            tarefa.estado = ERRO
+    finally:
+        fonte.close()
+        tarefa.concluida_em = time.time()
+        _publicar(tarefa)
+        medidor.finalizar(origem='tarefa', arquivo=tarefa.nome_arquivo, bytes=tarefa.bytes_total)
+        connection.close()
+
+
+def iniciar_tarefa(arquivo) -> Tarefa:
+    """
+    Agenda a análise de um upload e retorna imediatamente.
+
+    Args:
+        arquivo: UploadedFile já validado
+
+    Returns:
+        Tarefa: Tarefa registrada, ainda na fila
+
+    Raises:
+        FilaCheia: Se já houver ANALISADOR_TAREFAS_FILA tarefas não finalizadas
+    """
+    _remover_expiradas()
+
+    tarefa = Tarefa(
+        id=uuid.uuid4().hex,
+        nome_arquivo=arquivo.name,
+        bytes_total=arquivo.size,
+    )
+
+    with _lock:
+        pendentes = sum(1 for t in _tarefas.values() if not t.finalizada)
+        if pendentes >= getattr(settings, 'ANALISADOR_TAREFAS_FILA', 20):
+            raise FilaCheia(
+                'Há análises demais na fila. Tente novamente em instantes.',
+                getattr(settings, 'ANALISADOR_ADMISSAO_RETRY_AFTER', 10),
+            )
+        _tarefas[tarefa.id] = tarefa
+
+    try:
+        fonte = reter_arquivo(arquivo)
+    except Exception:
+        with _lock:
+            del _tarefas[tarefa.id]
+        raise
+
+    _publicar(tarefa)
+    _obter_executor().submit(_executar, tarefa, fonte)
+    return tarefa
+
+
+def obter_tarefa(tarefa_id: str) -> Optional[Tarefa]:
+    """
+    Busca uma tarefa pelo id: neste processo ou, se foi criada por outro,
+    no estado publicado no cache.
+
+    Returns:
+        Optional[Tarefa]: A tarefa, ou None se não existir ou já tiver expirado
+    """
+    with _lock:
+        tarefa = _tarefas.get(tarefa_id)
+    if tarefa is not None:
+        return tarefa
+
+    campos = _cache().get(_chave(tarefa_id))
+    return Tarefa(**campos) if campos is not None else None
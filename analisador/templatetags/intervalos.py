@@ -0,0 +1,13 @@
+from django import template
+
+from .. import intervalos
+
+register = template.Library()
+
+
+@register.filter
+def formatar_intervalo(intervalo):
+    """
+    Exibe um intervalo (início, fim) como "1001-1050", ou "1001" se for um único número.
+    """
+    return intervalos.formatar_intervalo(intervalo)
@@ -0,0 +1,125 @@
+import json
+import threading
+import time
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from analisador import views
+from analisador.admissao import ControleAdmissao, SemCapacidade, custo_leitura
+from analisador.motor_numpy import MotorNumpy
+
+
+@views._com_admissao(json=True)
+def _view(request):
+    return HttpResponse(str(request.reserva_analise.custo if request.reserva_analise else 0))
+
+
+@override_settings(ANALISADOR_TAMANHO_MAXIMO=1024 * 1024)
+class ComAdmissaoTests(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.controle = ControleAdmissao(orcamento=1 << 30, maximo_fila=0, espera_maxima=0, retry_after=7)
+        patcher = mock.patch.object(views, 'obter_controle', return_value=self.controle)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _post(self, **meta):
+        request = self.factory.post('/', data=b'', content_type='text/plain')
+        request.META.pop('CONTENT_LENGTH', None)
+        request.META.update(meta)
+        return _view(request)
+
+    def test_reserva_pelo_content_length(self):
+        resposta = self._post(CONTENT_LENGTH='1000')
+        self.assertEqual(int(resposta.content), custo_leitura(1000))
+        self.assertEqual(self.controle.em_uso, 0)
+
+    def test_content_length_invalido_responde_400(self):
+        for valor in ('abc', '-5', '1.5'):
+            with self.subTest(valor=valor):
+                resposta = self._post(CONTENT_LENGTH=valor)
+                self.assertEqual(resposta.status_code, 400)
+                self.assertFalse(json.loads(resposta.content)['sucesso'])
+
+    def test_corpo_em_partes_reserva_o_maior_arquivo(self):
+        resposta = self._post(HTTP_TRANSFER_ENCODING='chunked')
+        self.assertEqual(int(resposta.content), custo_leitura(1024 * 1024))
+
+    def test_sem_corpo_passa_direto(self):
+        resposta = self._post()
+        self.assertEqual(resposta.content, b'0')
+
+    def test_sem_capacidade_responde_503_com_retry_after(self):
+        self.controle.orcamento = custo_leitura(0)
+        with self.controle.admitir(custo_leitura(0)):
+            resposta = self._post(HTTP_TRANSFER_ENCODING='chunked')
+        self.assertEqual(resposta.status_code, 503)
+        self.assertEqual(resposta['Retry-After'], '7')
+
+
+class FilasDeAdmissaoTests(SimpleTestCase):
+
+    def setUp(self):
+        self.controle = ControleAdmissao(orcamento=100, maximo_fila=1, espera_maxima=5, retry_after=1)
+        self.admitidos = []
+
+    def _em_thread(self, custo, limitar_espera):
+        def admitir():
+            with self.controle.admitir(custo, limitar_espera=limitar_espera):
+                self.admitidos.append(custo)
+
+        thread = threading.Thread(target=admitir)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        return thread
+
+    def _aguardar(self, **estado):
+        prazo = time.monotonic() + 5
+        while any(self.controle.estado()[chave] != valor for chave, valor in estado.items()):
+            self.assertLess(time.monotonic(), prazo, self.controle.estado())
+            time.sleep(0.005)
+
+    def test_request_passa_a_frente_de_tarefa_aguardando(self):
+        with self.controle.admitir(60):
+            tarefa = self._em_thread(80, limitar_espera=False)
+            self._aguardar(na_fila_segundo_plano=1)
+
+            # Cabe no orçamento: admitido na hora, sem esperar a tarefa
+            with self.controle.admitir(30):
+                self.assertEqual(self.controle.estado()['em_andamento'], 2)
+                # A tarefa não conta para o limite da fila dos requests: o
+                # próximo entra na fila e só desiste quando a espera esgota
+                self.controle.espera_maxima = 0.05
+                with self.assertRaisesMessage(SemCapacidade, 'continua ocupado'):
+                    self.controle.admitir(30)
+        tarefa.join(5)
+        self.assertEqual(self.admitidos, [80])
+
+    def test_tarefa_aguarda_a_fila_dos_requests(self):
+        with self.controle.admitir(60):
+            request = self._em_thread(50, limitar_espera=True)
+            self._aguardar(na_fila=1)
+            tarefa = self._em_thread(10, limitar_espera=False)
+            self._aguardar(na_fila_segundo_plano=1)
+            # A tarefa caberia, mas o request chegou antes e ainda aguarda
+            time.sleep(0.05)
+            self.assertEqual(self.admitidos, [])
+        request.join(5)
+        tarefa.join(5)
+        self.assertEqual(sorted(self.admitidos), [10, 50])
+        self.assertEqual(self.controle.estado()['memoria_reservada'], 0)
+
+
+class MotorNumpyReservaTests(SimpleTestCase):
+
+    def test_numero_retido_conta_apos_finalizar_leitura(self):
+        motor = MotorNumpy()
+        motor.alimentar(b'1\n2\n' + b'9' * 25)
+        motor.finalizar_leitura()
+
+        self.assertEqual(motor.total, 3)
+        self.assertEqual(motor.intervalo(), (1, int('9' * 25)))
+        self.assertEqual(motor.concluir(10).total, 3)
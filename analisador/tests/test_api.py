@@ -0,0 +1,91 @@
+import gzip
+import json
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from analisador.models import Analise
+
+
+@override_settings(ANALISADOR_METRICAS=False)
+class ApiAnalisarTests(TestCase):
+
+    URL = reverse('analisador:api_analisar')
+    DADOS = b'5\r\n1,2\n2\n4,\n'
+
+    def _json(self, resposta):
+        self.assertTrue(resposta.streaming)
+        self.assertEqual(resposta['Content-Type'], 'application/json; charset=utf-8')
+        return json.loads(b''.join(resposta.streaming_content))
+
+    def _conferir_resultado(self, corpo):
+        self.assertTrue(corpo['sucesso'])
+        self.assertEqual(corpo['intervalos_encontrados'], [[1, 2], [4, 5]])
+        self.assertEqual(corpo['intervalos_faltantes'], [[3, 3]])
+        self.assertEqual(corpo['numeros_duplicados'], [{'numero': 2, 'quantidade': 2}])
+        self.assertEqual(corpo['estatisticas']['total_numeros_arquivo'], 5)
+
+    def test_corpo_em_texto(self):
+        resposta = self.client.post(self.URL, self.DADOS, content_type='text/plain', HTTP_X_NOME_ARQUIVO='dados.txt')
+        self.assertEqual(resposta.status_code, 200)
+        corpo = self._json(resposta)
+        self._conferir_resultado(corpo)
+        self.assertEqual(Analise.objects.get(id_resultado=corpo['id_resultado']).nome_arquivo, 'dados.txt')
+
+    def test_corpo_em_gzip(self):
+        resposta = self.client.post(
+            self.URL, gzip.compress(self.DADOS), content_type='text/plain', HTTP_CONTENT_ENCODING='gzip'
+        )
+        self.assertEqual(resposta.status_code, 200)
+        corpo = self._json(resposta)
+        self._conferir_resultado(corpo)
+
+        # Mesmo conteúdo, mesmo resultado, com ou sem compressão
+        sem_gzip = self._json(self.client.post(self.URL, self.DADOS, content_type='text/plain'))
+        self.assertEqual(corpo['id_resultado'], sem_gzip['id_resultado'])
+
+    def test_arquivo_multipart_e_gz(self):
+        arquivos = (
+            SimpleUploadedFile('dados.txt', self.DADOS),
+            SimpleUploadedFile('dados.txt.gz', gzip.compress(self.DADOS)),
+        )
+        for arquivo in arquivos:
+            with self.subTest(arquivo=arquivo.name):
+                resposta = self.client.post(self.URL, {'arquivo': arquivo})
+                self.assertEqual(resposta.status_code, 200)
+                self._conferir_resultado(self._json(resposta))
+
+    def test_sem_numeros_responde_400(self):
+        resposta = self.client.post(self.URL, b'a b c\n', content_type='text/plain')
+        self.assertEqual(resposta.status_code, 400)
+        corpo = self._json(resposta)
+        self.assertFalse(corpo['sucesso'])
+        self.assertIn('Nenhum número', corpo['erro'])
+
+    def test_gzip_invalido_responde_400(self):
+        resposta = self.client.post(self.URL, b'nao e gzip', content_type='text/plain', HTTP_CONTENT_ENCODING='gzip')
+        self.assertEqual(resposta.status_code, 400)
+        self.assertFalse(self._json(resposta)['sucesso'])
+
+    def test_multipart_sem_arquivo_responde_400(self):
+        resposta = self.client.post(self.URL, {'outro': SimpleUploadedFile('dados.txt', self.DADOS)})
+        self.assertEqual(resposta.status_code, 400)
+        self.assertFalse(json.loads(resposta.content)['sucesso'])
+
+    @override_settings(ANALISADOR_TAMANHO_MAXIMO=8)
+    def test_conteudo_acima_do_limite_responde_413(self):
+        resposta = self.client.post(self.URL, self.DADOS, content_type='text/plain')
+        self.assertEqual(resposta.status_code, 413)
+        self.assertFalse(json.loads(resposta.content)['sucesso'])
+
+        resposta = self.client.post(self.URL, {'arquivo': SimpleUploadedFile('dados.txt', self.DADOS)})
+        self.assertEqual(resposta.status_code, 413)
+
+    @override_settings(ANALISADOR_TAMANHO_MAXIMO=100)
+    def test_gzip_que_descomprime_acima_do_limite_responde_400(self):
+        resposta = self.client.post(
+            self.URL, gzip.compress(self.DADOS * 100), content_type='text/plain', HTTP_CONTENT_ENCODING='gzip'
+        )
+        self.assertEqual(resposta.status_code, 400)
+        self.assertFalse(self._json(resposta)['sucesso'])
@@ -0,0 +1,61 @@
+from django.test import TestCase
+
+from analisador.cache_resultados import (
+    analisar_com_cache, analisar_fluxo_com_cache, esquecer_resultado, estatisticas_cache,
+)
+from analisador.servicos import AnalisadorSequencia
+
+
+class AnalisarComCacheTests(TestCase):
+
+    DADOS = b'1 2 3 5 5 8\n'
+
+    def setUp(self):
+        self.aberturas = 0
+
+    def _abrir(self):
+        self.aberturas += 1
+        return iter([self.DADOS[:5], self.DADOS[5:]])
+
+    def _analisar(self, releitura=True):
+        resultado = analisar_com_cache(AnalisadorSequencia(), self._abrir, releitura=releitura)
+        self.addCleanup(esquecer_resultado, resultado['id_resultado'])
+        return resultado
+
+    def _contadores(self):
+        estatisticas = estatisticas_cache()
+        return estatisticas['acertos'], estatisticas['falhas']
+
+    def test_arquivo_repetido_nao_e_analisado(self):
+        acertos, falhas = self._contadores()
+        primeiro = self._analisar()
+        self.assertEqual(self.aberturas, 2)  # hash, análise
+        self.assertEqual(self._contadores(), (acertos, falhas + 1))
+
+        self.aberturas = 0
+        segundo = self._analisar()
+        self.assertEqual(self.aberturas, 1)
+        self.assertEqual(segundo['id_resultado'], primeiro['id_resultado'])
+        self.assertEqual(segundo['numeros_duplicados'], [{'numero': 5, 'quantidade': 2}])
+        self.assertEqual(self._contadores(), (acertos + 1, falhas + 1))
+
+    def test_sem_releitura_e_lido_uma_vez_so(self):
+        acertos, falhas = self._contadores()
+        primeiro = self._analisar(releitura=False)
+        self.assertEqual(self.aberturas, 1)
+        self.assertEqual(self._contadores(), (acertos, falhas + 1))
+
+        # O hash calculado na análise é o mesmo: o envio seguinte, relendo, é um acerto
+        self.aberturas = 0
+        segundo = self._analisar()
+        self.assertEqual(self.aberturas, 1)
+        self.assertEqual(segundo['id_resultado'], primeiro['id_resultado'])
+        self.assertEqual(self._contadores(), (acertos + 1, falhas + 1))
+
+    def test_fluxo_conta_a_consulta_feita_depois_da_leitura(self):
+        primeiro = self._analisar()
+        acertos, falhas = self._contadores()
+        fluxo = analisar_fluxo_com_cache(AnalisadorSequencia(), self._abrir())
+        self.assertEqual(fluxo['id_resultado'], primeiro['id_resultado'])
+        self.assertEqual(fluxo['intervalos_faltantes'], primeiro['intervalos_faltantes'])
+        self.assertEqual(self._contadores(), (acertos + 1, falhas))
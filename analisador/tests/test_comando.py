@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from analisador.management.commands.analisar_sequencia import COLUNAS_CSV
+
+
+class AnalisarSequenciaTests(SimpleTestCase):
+
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.diretorio = diretorio.name
+
+    def _arquivo(self, nome, dados):
+        caminho = os.path.join(self.diretorio, nome)
+        with open(caminho, 'wb') as arquivo:
+            arquivo.write(dados)
+        return caminho
+
+    def _executar(self, *args, stdin=None):
+        saida = io.StringIO()
+        if stdin is None:
+            call_command('analisar_sequencia', *args, stdout=saida)
+        else:
+            with mock.patch('sys.stdin', io.TextIOWrapper(io.BytesIO(stdin))):
+                call_command('analisar_sequencia', *args, stdout=saida)
+        return saida.getvalue()
+
+    def _json(self, *args, **kwargs):
+        return [json.loads(linha) for linha in self._executar(*args, **kwargs).splitlines()]
+
+    def test_saida_json_uma_linha_por_arquivo(self):
+        primeiro = self._arquivo('a.txt', b'1\n2\n4\n4\n')
+        segundo = self._arquivo('b.txt', b'10 11 12')
+        resultados = self._json(primeiro, segundo, '--backend', 'python')
+
+        self.assertEqual([r['arquivo'] for r in resultados], [primeiro, segundo])
+        self.assertTrue(all(r['sucesso'] for r in resultados))
+        self.assertEqual(resultados[0]['estatisticas']['total_duplicados'], 1)
+        self.assertEqual(resultados[0]['estatisticas']['total_faltantes'], 1)
+        self.assertEqual(resultados[1]['estatisticas']['total_faltantes'], 0)
+
+    def test_saida_csv(self):
+        caminho = self._arquivo('a.txt', b'1\n2\n4\n4\n')
+        linhas = list(csv.reader(io.StringIO(self._executar(caminho, '--formato', 'csv'))))
+
+        self.assertEqual(tuple(linhas[0]), COLUNAS_CSV)
+        self.assertEqual(len(linhas), 2)
+        linha = dict(zip(COLUNAS_CSV, linhas[1]))
+        self.assertEqual(linha['arquivo'], caminho)
+        self.assertEqual(linha['sucesso'], '1')
+        self.assertEqual(linha['total_numeros_arquivo'], '4')
+        self.assertEqual((linha['menor'], linha['maior']), ('1', '4'))
+        self.assertEqual(linha['total_faltantes'], '1')
+        self.assertEqual(linha['total_duplicados'], '1')
+        self.assertEqual(linha['erro'], '')
+
+    def test_entrada_padrao(self):
+        for args in ((), ('-',)):
+            with self.subTest(args=args):
+                resultado, = self._json(*args, stdin=b'5 6 8')
+                self.assertEqual(resultado['arquivo'], 'stdin')
+                self.assertEqual(resultado['estatisticas']['total_numeros_arquivo'], 3)
+                self.assertEqual(resultado['estatisticas']['total_faltantes'], 1)
+
+    def test_entrada_padrao_lida_uma_vez(self):
+        with self.assertRaisesMessage(CommandError, 'só pode ser lida uma vez'):
+            self._executar('-', '-', stdin=b'1 2')
+
+    def test_workers_mesmo_resultado(self):
+        caminhos = [
+            self._arquivo(f'{i}.txt', ' '.join(map(str, range(i, 5000 * (i + 1), i + 1))).encode())
+            for i in range(3)
+        ]
+        sequencial = self._json(*caminhos, '--backend', 'python')
+        self.assertEqual(self._json(*caminhos, '--backend', 'python', '--workers', '2'), sequencial)
+        # Um único arquivo é dividido em trechos, um por processo
+        self.assertEqual(self._json(caminhos[2], '--backend', 'python', '--workers', '3'), sequencial[2:])
+
+    def test_workers_invalido(self):
+        caminho = self._arquivo('a.txt', b'1 2 3')
+        with self.assertRaisesMessage(CommandError, '--workers deve ser pelo menos 1.'):
+            self._executar(caminho, '--workers', '0')
+
+    def test_entrada_invalida(self):
+        valido = self._arquivo('a.txt', b'1 2 3')
+        invalido = self._arquivo('b.txt', b'sem numeros aqui')
+        saida = io.StringIO()
+        with self.assertRaisesMessage(CommandError, '1 de 2 arquivo(s) não puderam ser analisados.'):
+            call_command('analisar_sequencia', valido, invalido, '--formato', 'csv', stdout=saida)
+
+        # O arquivo válido continua no resultado; o inválido traz o erro
+        linhas = list(csv.DictReader(io.StringIO(saida.getvalue())))
+        self.assertEqual([linha['sucesso'] for linha in linhas], ['1', '0'])
+        self.assertEqual(linhas[1]['erro'], 'Nenhum número foi encontrado no arquivo.')
+
+    def test_arquivo_inexistente(self):
+        with self.assertRaisesMessage(CommandError, '1 de 1 arquivo(s)'):
+            self._executar(os.path.join(self.diretorio, 'nao-existe.txt'))
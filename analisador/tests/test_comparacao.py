@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from analisador import views
+from analisador.admissao import ControleAdmissao, custo_resultado
+from analisador.comparacao import ComparacaoAnalises
+from analisador.servicos import AnalisadorSequencia
+
+
+def _snapshot(texto):
+    analisador = AnalisadorSequencia('python')
+    analisador.processar_arquivo(texto)
+    return analisador.snapshot
+
+
+class ComparacaoAnalisesTests(SimpleTestCase):
+
+    def test_diferencas_entre_duas_analises(self):
+        anterior = _snapshot('1 2 3 6 7 8 9 10 15 20 20 21')
+        atual = _snapshot('1 2 3 4 5 6 8 9 10 15 16 20 21 21 21 22 30 31 31')
+        comparacao = ComparacaoAnalises.entre(anterior, atual)
+
+        self.assertEqual(comparacao.lacunas_preenchidas, ((4, 5), (16, 16)))
+        self.assertEqual(comparacao.novas_lacunas, ((7, 7), (23, 29)))
+        self.assertEqual(comparacao.numeros_removidos, ((7, 7),))
+        self.assertEqual(comparacao.novos_duplicados, ((21, 3), (31, 2)))
+
+    def test_analises_iguais_nao_tem_diferencas(self):
+        snapshot = _snapshot('5 7 7 9')
+        comparacao = ComparacaoAnalises.entre(snapshot, snapshot)
+        self.assertEqual(comparacao.como_dict()['totais'], {
+            'lacunas_preenchidas': 0, 'novas_lacunas': 0, 'numeros_removidos': 0, 'novos_duplicados': 0,
+        })
+
+    def test_sequencia_que_cresceu_so_mostra_lacunas_da_parte_nova(self):
+        comparacao = ComparacaoAnalises.entre(_snapshot('10 11 12'), _snapshot('1 3 10 11 12 14 15'))
+        self.assertEqual(comparacao.lacunas_preenchidas, ())
+        self.assertEqual(comparacao.novas_lacunas, ((2, 2), (4, 9), (13, 13)))
+        self.assertEqual(comparacao.numeros_removidos, ())
+
+    def test_como_dict_corta_as_listas_e_mantem_os_totais(self):
+        comparacao = ComparacaoAnalises.entre(_snapshot('1 3 5 7 9'), _snapshot('1 2 3 4 5 6 7 8 9'))
+        dados = comparacao.como_dict(limite_itens=2)
+        self.assertEqual(dados['lacunas_preenchidas'], ['2', '4'])
+        self.assertEqual(dados['totais']['lacunas_preenchidas'], 4)
+        self.assertTrue(dados['listas_truncadas'])
+
+
+class CompararArquivosTests(TestCase):
+
+    def test_reserva_soma_os_resultados_dos_dois_arquivos(self):
+        controle = ControleAdmissao(orcamento=1 << 40, maximo_fila=0, espera_maxima=0, retry_after=1)
+        custos = []
+        ampliar = controle._ampliar
+
+        def registrar(reserva, custo):
+            custos.append(custo)
+            ampliar(reserva, custo)
+
+        anterior, atual = b'1\n3\n5\n7\n', b'1\n2\n3\n10\n20\n30\n'
+        with mock.patch.object(views, 'obter_controle', return_value=controle), \
+                mock.patch.object(controle, '_ampliar', side_effect=registrar):
+            resposta = self.client.post(reverse('analisador:comparar_analises') + '?formato=json', {
+                'anterior': SimpleUploadedFile('anterior.txt', anterior),
+                'atual': SimpleUploadedFile('atual.txt', atual),
+            })
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.json()['numeros_removidos'], ['5', '7'])
+        self.assertEqual(max(custos), custo_resultado(4, 1, 7) + custo_resultado(6, 1, 30))
+        self.assertEqual(controle.em_uso, 0)
@@ -0,0 +1,75 @@
+from unittest import mock
+
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from analisador import desempenho
+from analisador.cache_resultados import estatisticas_cache, obter_snapshot
+from analisador.models import Analise
+
+
+@override_settings(ANALISADOR_METRICAS=False)
+class OperacaoDaViewTests(TestCase):
+
+    def test_envia_o_arquivo_e_abre_a_pagina_do_resultado(self):
+        enviar, preparar = desempenho.operacao_da_view(b'1\n2\n4\n')
+        preparar()
+        enviar()
+
+        analise = Analise.objects.get()
+        self.assertEqual(analise.nome_arquivo, 'benchmark.txt')
+        self.assertIsNotNone(obter_snapshot(analise.id_resultado))
+
+    def test_cada_repeticao_faz_a_analise_completa(self):
+        enviar, preparar = desempenho.operacao_da_view(b'10\n11\n13\n')
+        falhas = estatisticas_cache()['falhas']
+
+        desempenho.medir(enviar, 2, preparar)
+
+        # Duas repetições cronometradas e a execução com o tracemalloc
+        self.assertEqual(estatisticas_cache()['falhas'] - falhas, 3)
+
+    def test_preparacao_mantem_os_outros_resultados(self):
+        outro, preparar_outro = desempenho.operacao_da_view(b'5\n6\n')
+        preparar_outro()
+        outro()
+        id_outro = Analise.objects.get().id_resultado
+
+        _, preparar = desempenho.operacao_da_view(b'7\n8\n')
+        preparar()
+
+        self.assertIsNotNone(obter_snapshot(id_outro))
+        self.assertTrue(Analise.objects.filter(id_resultado=id_outro).exists())
+
+    def test_erro_na_analise_interrompe_o_benchmark(self):
+        enviar, preparar = desempenho.operacao_da_view(b'sem numeros\n')
+        preparar()
+        with self.assertRaisesMessage(RuntimeError, 'não para o resultado'):
+            enviar()
+
+
+class AmbienteIsoladoTests(SimpleTestCase):
+
+    def test_view_medida_com_banco_e_cache_temporarios(self):
+        nome_original = connection.settings_dict['NAME']
+        locais = []
+
+        def operacao(dados):
+            return (lambda: locais.append(settings.CACHES['analises']['LOCATION'])), None
+
+        with mock.patch.object(connection.creation, 'create_test_db') as criar, \
+                mock.patch.object(connection.creation, 'destroy_test_db') as destruir, \
+                mock.patch.object(desempenho, 'operacao_da_view', side_effect=operacao):
+            medicoes = desempenho.executar(['denso'], escala=0.001, repeticoes=1, backends=['python'])
+
+        self.assertEqual(medicoes[-1].operacao, 'view_processar_arquivo')
+        self.assertEqual(set(locais), {'analisador-benchmark'})
+        criar.assert_called_once()
+        destruir.assert_called_once_with(nome_original, verbosity=0)
+        self.assertEqual(settings.CACHES['analises']['LOCATION'], 'analisador-resultados')
+
+    def test_sem_view_nao_cria_banco(self):
+        with mock.patch.object(connection.creation, 'create_test_db') as criar:
+            desempenho.executar(['denso'], escala=0.001, repeticoes=1, backends=['python'], incluir_view=False)
+        criar.assert_not_called()
@@ -0,0 +1,71 @@
+import gzip
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from analisador.cache_resultados import esquecer_resultado, guardar_snapshot
+from analisador.servicos import AnalisadorSequencia
+
+
+class ExportarResultadoTests(TestCase):
+
+    ID = 'exportacao-teste-1000'
+
+    def setUp(self):
+        analisador = AnalisadorSequencia()
+        analisador.limite_gap = 5
+        analisador.processar_arquivo('1 2 3 5 7 7 8 20 20 20 21')
+        guardar_snapshot(self.ID, analisador.snapshot)
+        self.addCleanup(esquecer_resultado, self.ID)
+
+    def _exportar(self, lista, id_resultado=None, **parametros):
+        url = reverse('analisador:exportar_resultado', args=[id_resultado or self.ID, lista])
+        return self.client.get(url, parametros)
+
+    def _conteudo(self, resposta):
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(resposta.streaming)
+        return b''.join(resposta.streaming_content).decode()
+
+    def test_faltantes_em_csv(self):
+        resposta = self._exportar('faltantes')
+        self.assertEqual(resposta['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertEqual(resposta['Content-Disposition'], f'attachment; filename="faltantes-{self.ID[:12]}.csv"')
+        self.assertEqual(self._conteudo(resposta), 'inicio,fim,quantidade\n4,4,1\n6,6,1\n')
+
+    def test_encontrados_em_txt(self):
+        resposta = self._exportar('encontrados', formato='txt')
+        self.assertEqual(resposta['Content-Type'], 'text/plain; charset=utf-8')
+        self.assertEqual(self._conteudo(resposta), '1-3\n5\n7-8\n20-21\n')
+
+    def test_listas_expandidas(self):
+        self.assertEqual(self._conteudo(self._exportar('encontrados', expandir='1')), 'numero\n1\n2\n3\n5\n7\n8\n20\n21\n')
+        self.assertEqual(self._conteudo(self._exportar('faltantes', formato='txt', expandir='1')), '4\n6\n')
+
+    def test_duplicados_e_gaps(self):
+        self.assertEqual(self._conteudo(self._exportar('duplicados')), 'numero,quantidade\n7,2\n20,3\n')
+        self.assertEqual(self._conteudo(self._exportar('duplicados', formato='txt')), '7\t2\n20\t3\n')
+        self.assertEqual(
+            self._conteudo(self._exportar('gaps')), 'primeiro_faltante,ultimo_faltante,tamanho_gap\n9,19,11\n'
+        )
+        self.assertEqual(self._conteudo(self._exportar('gaps', formato='txt')), '9-19\n')
+
+    def test_lista_enviada_em_varios_trechos(self):
+        with mock.patch('analisador.fluxos.ITENS_POR_TRECHO', 2):
+            resposta = self._exportar('encontrados', expandir='1')
+            trechos = list(resposta.streaming_content)
+        self.assertEqual(len(trechos), 5)
+        self.assertEqual(b''.join(trechos), b'numero\n1\n2\n3\n5\n7\n8\n20\n21\n')
+
+    def test_gzip(self):
+        resposta = self._exportar('faltantes', gzip='1')
+        self.assertEqual(resposta['Content-Type'], 'application/gzip')
+        self.assertTrue(resposta['Content-Disposition'].endswith('.csv.gz"'))
+        conteudo = gzip.decompress(b''.join(resposta.streaming_content))
+        self.assertEqual(conteudo, b'inicio,fim,quantidade\n4,4,1\n6,6,1\n')
+
+    def test_erros(self):
+        self.assertEqual(self._exportar('faltantes', formato='xlsx').status_code, 400)
+        self.assertEqual(self._exportar('outra').status_code, 404)
+        self.assertEqual(self._exportar('faltantes', id_resultado='nao-existe-1000').status_code, 404)
@@ -0,0 +1,71 @@
+import hashlib
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from analisador.historico import carregar_snapshot_salvo, registrar_analise
+from analisador.models import Analise
+from analisador.servicos import AnalisadorSequencia
+
+
+@override_settings(ANALISADOR_METRICAS=False)
+class HashConteudoTests(TestCase):
+
+    def enviar(self, url, nome, dados, **campos):
+        return self.client.post(url, {'arquivo': SimpleUploadedFile(nome, dados), **campos})
+
+    def test_analise_de_um_arquivo_guarda_o_hash_do_conteudo(self):
+        dados = b'1\n2\n4\n'
+        self.enviar(reverse('analisador:processar'), 'a.txt', dados)
+
+        analise = Analise.objects.get()
+        self.assertEqual(analise.hash_conteudo, hashlib.sha256(dados).hexdigest())
+
+    def test_lote_guarda_o_hash_de_cada_arquivo_e_nenhum_no_combinado(self):
+        arquivos = [SimpleUploadedFile('a.txt', b'1\n2\n'), SimpleUploadedFile('b.txt', b'5\n6\n')]
+        self.client.post(reverse('analisador:processar_lote'), {'arquivos': arquivos})
+
+        self.assertEqual(
+            Analise.objects.get(nome_arquivo='a.txt').hash_conteudo, hashlib.sha256(b'1\n2\n').hexdigest()
+        )
+        self.assertEqual(
+            Analise.objects.get(nome_arquivo='b.txt').hash_conteudo, hashlib.sha256(b'5\n6\n').hexdigest()
+        )
+        self.assertIsNone(Analise.objects.get(nome_arquivo__startswith='Lote:').hash_conteudo)
+
+    def test_series_e_acrescimos_nao_tem_hash_de_conteudo(self):
+        self.enviar(reverse('analisador:processar_series'), 's.csv', b'A,1\nB,2\n',
+                    modo='csv', coluna_serie='1', coluna_numero='2', delimitador=',')
+        self.assertFalse(Analise.objects.filter(hash_conteudo__isnull=False).exists())
+
+        self.enviar(reverse('analisador:processar'), 'base.txt', b'1\n2\n')
+        base = Analise.objects.get(nome_arquivo='base.txt')
+        self.enviar(reverse('analisador:acrescentar_analise', args=[base.id_resultado]), 'novo.txt', b'3\n')
+
+        self.assertIsNone(Analise.objects.get(nome_arquivo='base.txt + novo.txt').hash_conteudo)
+
+    def test_historico_exibe_analises_sem_hash(self):
+        arquivos = [SimpleUploadedFile('a.txt', b'1\n2\n'), SimpleUploadedFile('b.txt', b'5\n6\n')]
+        self.client.post(reverse('analisador:processar_lote'), {'arquivos': arquivos})
+
+        resposta = self.client.get(reverse('analisador:historico'))
+
+        self.assertContains(resposta, 'Lote: a.txt, b.txt')
+        self.assertNotContains(resposta, '?hash=None')
+
+
+class NumerosGrandesTests(TestCase):
+
+    def test_menor_e_maior_com_mais_de_64_digitos(self):
+        grande = 10 ** 80
+        analisador = AnalisadorSequencia('python')
+        analisador.processar_chunks([f'{-grande}\n{grande}\n'.encode()])
+
+        registrar_analise('grande-1000', analisador.snapshot, 'grande.txt')
+
+        analise = Analise.objects.get()
+        self.assertEqual(analise.menor, str(-grande))
+        self.assertEqual(analise.maior, str(grande))
+        self.assertEqual(carregar_snapshot_salvo('grande-1000'), analisador.snapshot)
+        self.assertIsNone(analise.hash_conteudo)
@@ -0,0 +1,136 @@
+import io
+import os
+import random
+import tempfile
+
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.test import SimpleTestCase
+
+from analisador.leitura import PADRAO_NUMEROS, TokenizadorNumeros, extrair_numeros_de_chunks, ler_mapeado
+from analisador.servicos import AnalisadorSequencia
+
+
+def _em_blocos(dados: bytes, tamanho: int):
+    return [dados[i:i + tamanho] for i in range(0, len(dados), tamanho)]
+
+
+class TokenizadorNumerosTests(SimpleTestCase):
+
+    def test_numero_dividido_entre_blocos(self):
+        self.assertEqual(list(extrair_numeros_de_chunks([b'12', b'34 5', b'6\n'])), [1234, 56])
+
+    def test_sinal_no_final_do_bloco(self):
+        self.assertEqual(list(extrair_numeros_de_chunks([b'1 -', b'5 -', b'-7'])), [1, -5, -7])
+
+    def test_sinal_sozinho_no_final_do_fluxo(self):
+        self.assertEqual(list(extrair_numeros_de_chunks([b'3 -'])), [3])
+
+    def test_qualquer_divisao_em_blocos_da_o_mesmo_resultado(self):
+        dados = b'10,-20\r\n30 ,\r\n-4,5\n\n6000000000000000000000\r\n-1'
+        esperado = [int(n) for n in PADRAO_NUMEROS.findall(dados.decode())]
+        for tamanho in range(1, len(dados) + 1):
+            with self.subTest(tamanho=tamanho):
+                self.assertEqual(list(extrair_numeros_de_chunks(_em_blocos(dados, tamanho))), esperado)
+
+    def test_crlf_e_virgula_separam_numeros(self):
+        self.assertEqual(list(extrair_numeros_de_chunks([b'1\r\n2,3\r\n', b',4'])), [1, 2, 3, 4])
+
+    def test_digitos_nao_ascii_nao_formam_numeros(self):
+        dados = '1٢3 ４5 ²7 ١٢٣'.encode('utf-8')
+        self.assertEqual(list(extrair_numeros_de_chunks([dados])), [1, 3, 5, 7])
+        for tamanho in range(1, len(dados) + 1):
+            with self.subTest(tamanho=tamanho):
+                self.assertEqual(list(extrair_numeros_de_chunks(_em_blocos(dados, tamanho))), [1, 3, 5, 7])
+
+    def test_blocos_vazios_sao_ignorados(self):
+        self.assertEqual(list(extrair_numeros_de_chunks([b'', b'1', b'', b'2 3', b''])), [12, 3])
+
+    def test_ultimo_numero_sem_separador_final(self):
+        tokenizador = TokenizadorNumeros()
+        self.assertEqual(list(tokenizador.alimentar(b'7 8 -9')), [7, 8])
+        self.assertEqual(list(tokenizador.finalizar()), [-9])
+        self.assertEqual(list(tokenizador.finalizar()), [])
+        self.assertEqual(tokenizador.bytes_lidos, 6)
+
+
+class _SemDescritor:
+    """Arquivo só com read e seek, sem o método fileno."""
+
+    def __init__(self, dados):
+        self._arquivo = io.BytesIO(dados)
+        self.read = self._arquivo.read
+        self.seek = self._arquivo.seek
+
+
+class LerMapeadoTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        aleatorio = random.Random(20)
+        numeros = [aleatorio.randrange(-50, 3000) for _ in range(2000)] + [1 << 70]
+        cls.dados = ''.join(f'{n}{aleatorio.choice([",", " ", chr(10), "; "])}' for n in numeros).encode()
+        arquivo = tempfile.NamedTemporaryFile(suffix='.txt', delete=False)
+        with arquivo:
+            arquivo.write(cls.dados)
+        cls.caminho = arquivo.name
+        vazio = tempfile.NamedTemporaryFile(suffix='.txt', delete=False)
+        vazio.close()
+        cls.vazio = vazio.name
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.caminho)
+        os.remove(cls.vazio)
+        super().tearDownClass()
+
+    def _origens(self):
+        """Caminho, arquivo aberto, upload temporário, BytesIO e arquivo sem fileno, com os mesmos dados."""
+        upload = TemporaryUploadedFile('dados.txt', 'text/plain', len(self.dados), None)
+        upload.write(self.dados)
+        upload.flush()
+        aberto = open(self.caminho, 'rb')
+        self.addCleanup(upload.close)
+        self.addCleanup(aberto.close)
+        return {
+            'caminho': self.caminho,
+            'aberto': aberto,
+            'temporario': upload,
+            'bytesio': io.BytesIO(self.dados),
+            'sem_fileno': _SemDescritor(self.dados),
+        }
+
+    def test_fatias_reproduzem_o_arquivo(self):
+        for nome, origem in self._origens().items():
+            with self.subTest(origem=nome):
+                fatias = list(ler_mapeado(origem, tamanho_fatia=1000))
+                self.assertEqual(b''.join(fatias), self.dados)
+                self.assertTrue(all(len(fatia) <= 1000 for fatia in fatias))
+
+    def test_trecho(self):
+        tamanho = len(self.dados)
+        for inicio, fim in ((0, 10), (5, 1234), (1000, None), (tamanho - 3, tamanho + 50), (tamanho, None)):
+            for nome, origem in self._origens().items():
+                with self.subTest(origem=nome, inicio=inicio, fim=fim):
+                    trecho = b''.join(ler_mapeado(origem, 64, inicio=inicio, fim=fim))
+                    self.assertEqual(trecho, self.dados[inicio:fim])
+
+    def test_arquivo_vazio(self):
+        self.assertEqual(list(ler_mapeado(self.vazio)), [])
+        for backend in ('python', 'numpy'):
+            with self.subTest(backend=backend):
+                self.assertEqual(
+                    AnalisadorSequencia(backend).processar_caminho(self.vazio),
+                    AnalisadorSequencia(backend).processar_chunks([b'']),
+                )
+
+    def test_processar_caminho_igual_a_processar_chunks(self):
+        for backend in ('python', 'numpy'):
+            esperado = AnalisadorSequencia(backend).processar_chunks([self.dados])
+            self.assertTrue(esperado['sucesso'])
+            with self.subTest(backend=backend):
+                self.assertEqual(AnalisadorSequencia(backend).processar_caminho(self.caminho), esperado)
+            for nome, origem in self._origens().items():
+                with self.subTest(backend=backend, origem=nome):
+                    obtido = AnalisadorSequencia(backend).processar_chunks(ler_mapeado(origem, 333))
+                    self.assertEqual(obtido, esperado)
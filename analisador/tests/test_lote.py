@@ -0,0 +1,131 @@
+import os
+import random
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from analisador import lote, views
+from analisador.admissao import ControleAdmissao, SemCapacidade, custo_resultado
+from analisador.leitura import PADRAO_NUMEROS_BYTES, dividir_em_trechos
+
+
+BACKENDS = ('python', 'numpy')
+
+
+class AnaliseEmTrechosTests(SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        aleatorio = random.Random(23)
+        numeros = [aleatorio.randrange(-2000, 100_000) for _ in range(20_000)]
+        numeros += [1 << 70, 12345678901234567890123]
+        aleatorio.shuffle(numeros)
+        # Números longos e sempre \r\n: os cortes nominais caem no meio de
+        # números e entre o \r e o \n
+        cls.dados = b''.join(b'%d\r\n' % n for n in numeros)
+        arquivo = tempfile.NamedTemporaryFile(suffix='.txt', delete=False)
+        with arquivo:
+            arquivo.write(cls.dados)
+        cls.caminho = arquivo.name
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.caminho)
+        super().tearDownClass()
+
+    def test_trechos_cortam_entre_numeros(self):
+        tamanho = len(self.dados)
+        no_meio_de_numeros = 0
+        for partes in (2, 7, 64):
+            trechos = dividir_em_trechos(self.caminho, partes)
+            nominais = [tamanho * parte // partes for parte in range(1, partes)]
+            no_meio_de_numeros += sum(self.dados[posicao:posicao + 1].isdigit() for posicao in nominais)
+            with self.subTest(partes=partes):
+                self.assertEqual(len(trechos), partes)
+                self.assertEqual(trechos[0][0], 0)
+                self.assertEqual(trechos[-1][1], tamanho)
+                self.assertEqual([fim for _, fim in trechos[:-1]], [inicio for inicio, _ in trechos[1:]])
+                numeros = [
+                    numero for inicio, fim in trechos
+                    for numero in PADRAO_NUMEROS_BYTES.findall(self.dados[inicio:fim])
+                ]
+                self.assertEqual(numeros, PADRAO_NUMEROS_BYTES.findall(self.dados))
+        self.assertGreater(no_meio_de_numeros, 0)
+
+    def test_corte_junto_ao_crlf(self):
+        trechos = dividir_em_trechos(self.caminho, 200)
+        cortes = [inicio for inicio, _ in trechos[1:]]
+        self.assertTrue(all(self.dados[corte:corte + 1] in (b'\r', b'\n') for corte in cortes))
+        self.assertIn(b'\n', [self.dados[corte:corte + 1] for corte in cortes])
+
+    @mock.patch.object(lote, 'TAMANHO_MINIMO_TRECHO', 1)
+    def test_trechos_igual_a_um_trecho_so(self):
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for backend in BACKENDS:
+                esperado, erro = lote.analisar_caminho(self.caminho, 1000, backend)
+                self.assertIsNone(erro)
+                for partes in (2, 7, 64):
+                    with self.subTest(backend=backend, partes=partes):
+                        snapshot, erro = lote.analisar_caminho_em_trechos(
+                            self.caminho, 1000, executor, partes, backend
+                        )
+                        self.assertIsNone(erro)
+                        self.assertEqual(snapshot, esperado)
+
+    @mock.patch.object(lote, 'TAMANHO_MINIMO_TRECHO', 1)
+    def test_trechos_em_processos(self):
+        esperado, _ = lote.analisar_caminho(self.caminho, 1000, 'python')
+        with ProcessPoolExecutor(max_workers=2, mp_context=get_context('spawn')) as executor:
+            for backend in BACKENDS:
+                with self.subTest(backend=backend):
+                    snapshot, erro = lote.analisar_caminho_em_trechos(self.caminho, 1000, executor, 5, backend)
+                    self.assertIsNone(erro)
+                    self.assertEqual(snapshot, esperado)
+
+
+@override_settings(ANALISADOR_METRICAS=False)
+class ReservaLoteTests(TestCase):
+
+    def setUp(self):
+        self.controle = ControleAdmissao(orcamento=1 << 40, maximo_fila=0, espera_maxima=0, retry_after=3)
+        patcher = mock.patch.object(views, 'obter_controle', return_value=self.controle)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reserva_a_visao_combinada(self):
+        custos = []
+        ampliar = self.controle._ampliar
+
+        def registrar(reserva, custo):
+            custos.append(custo)
+            ampliar(reserva, custo)
+
+        with mock.patch.object(self.controle, '_ampliar', side_effect=registrar):
+            resposta = self.client.post(reverse('analisador:processar_lote'), {'arquivos': [
+                SimpleUploadedFile('a.txt', b'1\n2\n3\n'),
+                SimpleUploadedFile('b.txt', b'100\n300\n1000\n'),
+            ]})
+
+        self.assertEqual(resposta.status_code, 302)
+        self.assertEqual(custos, [custo_resultado(6, 1, 1000)])
+        self.assertEqual(self.controle.em_uso, 0)
+
+    def test_sem_capacidade_responde_503(self):
+        sem_capacidade = SemCapacidade('Ocupado.', 3)
+        envios = (
+            ('processar_lote', 'analisador.lote.analisar_lote', {'arquivos': SimpleUploadedFile('a.txt', b'1\n')}),
+            ('processar_series', 'analisador.views.analisar_series_com_cache', {
+                'arquivo': SimpleUploadedFile('a.csv', b'A,1\n'), 'modo': 'csv', 'coluna_serie': '1', 'coluna_numero': '2',
+            }),
+        )
+        for view, alvo, dados in envios:
+            with self.subTest(view=view), mock.patch(alvo, side_effect=sem_capacidade):
+                resposta = self.client.post(reverse(f'analisador:{view}'), dados)
+                self.assertEqual(resposta.status_code, 503)
+                self.assertEqual(resposta['Retry-After'], '3')
@@ -0,0 +1,114 @@
+import json
+import tracemalloc
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from analisador.metricas import MEDIDOR_NULO, MedidorEtapas, criar_medidor
+from analisador.servicos import AnalisadorSequencia
+
+
+ETAPAS_DA_ANALISE = ['extracao', 'consolidacao', 'faltantes', 'duplicados', 'gaps']
+
+
+class MedidorEtapasTests(SimpleTestCase):
+
+    def test_etapas_e_quantidades_no_resultado(self):
+        analisador = AnalisadorSequencia('python', metricas=MedidorEtapas())
+        analisador.limite_gap = 10
+        resultado = analisador.processar_chunks([b'1 2 2 5 30'])
+
+        metricas = resultado['metricas']
+        etapas = {etapa['nome']: etapa for etapa in metricas['etapas']}
+        self.assertEqual([nome for nome in etapas if nome in ETAPAS_DA_ANALISE], ETAPAS_DA_ANALISE)
+        self.assertEqual(etapas['extracao']['numeros'], 5)
+        self.assertEqual(etapas['consolidacao']['numeros'], 4)
+        self.assertEqual(etapas['faltantes']['numeros'], 1)  # 3-4; 6-29 é gap grande
+        self.assertEqual(etapas['duplicados']['numeros'], 1)
+        self.assertEqual(etapas['gaps']['numeros'], 1)
+        self.assertTrue(all(etapa['tempo_ms'] >= 0 for etapa in etapas.values()))
+        self.assertGreaterEqual(metricas['tempo_total_ms'], sum(e['tempo_ms'] for e in etapas.values()))
+
+    def test_server_timing_e_log(self):
+        medidor = MedidorEtapas()
+        with medidor.etapa('leitura', 10):
+            pass
+        medidor.adicionar('renderizacao', 1.23456)
+        self.assertRegex(medidor.server_timing(), r'^leitura;dur=[0-9.]+, renderizacao;dur=1\.235$')
+
+        with self.assertLogs('analisador.metricas', 'INFO') as logs:
+            metricas = medidor.finalizar(view='teste', arquivo='dados.txt')
+        linha = json.loads(logs.records[0].getMessage())
+        self.assertEqual(linha['evento'], 'analise')
+        self.assertEqual(linha['view'], 'teste')
+        self.assertEqual(linha['etapas'], metricas['etapas'])
+
+    def test_tracemalloc_desligado_ao_finalizar(self):
+        self.assertFalse(tracemalloc.is_tracing())
+        medidor = MedidorEtapas(memoria=True)
+        self.assertTrue(tracemalloc.is_tracing())
+        with medidor.etapa('alocacao'):
+            dados = bytearray(1024 * 1024)
+        del dados
+        self.assertGreaterEqual(medidor.etapas[0]['pico_memoria_bytes'], 1024 * 1024)
+
+        with self.assertLogs('analisador.metricas'):
+            medidor.finalizar()
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_tracemalloc_ja_ligado_continua_ligado(self):
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+        medidor = MedidorEtapas(memoria=True)
+        with self.assertLogs('analisador.metricas'):
+            medidor.finalizar()
+        self.assertTrue(tracemalloc.is_tracing())
+
+    @override_settings(ANALISADOR_METRICAS=False)
+    def test_medidor_nulo_com_metricas_desligadas(self):
+        medidor = criar_medidor()
+        self.assertIs(medidor, MEDIDOR_NULO)
+        with medidor.etapa('extracao') as registro:
+            registro['numeros'] = 3
+        self.assertEqual(medidor.como_dict(), {})
+        self.assertEqual(medidor.server_timing(), '')
+
+        resultado = AnalisadorSequencia(metricas=medidor).processar_chunks([b'1 2 3'])
+        self.assertNotIn('metricas', resultado)
+
+    @override_settings(ANALISADOR_METRICAS=True, ANALISADOR_METRICAS_MEMORIA=True)
+    def test_criar_medidor_segue_a_configuracao(self):
+        medidor = criar_medidor()
+        self.addCleanup(tracemalloc.stop)
+        self.assertIsInstance(medidor, MedidorEtapas)
+        self.assertTrue(medidor.memoria)
+
+
+class ServerTimingTests(TestCase):
+
+    URL = reverse('analisador:api_analisar')
+
+    def _analisar(self):
+        with self.assertLogs('analisador.metricas', 'INFO'):
+            resposta = self.client.post(self.URL, b'1 2 4 4', content_type='text/plain')
+        self.assertEqual(resposta.status_code, 200)
+        return resposta
+
+    @override_settings(ANALISADOR_METRICAS=True, ANALISADOR_METRICAS_SERVER_TIMING=True)
+    def test_cabecalho_com_server_timing_ligado(self):
+        resposta = self._analisar()
+        nomes = [parte.split(';')[0] for parte in resposta['Server-Timing'].split(', ')]
+        self.assertEqual([nome for nome in nomes if nome in ETAPAS_DA_ANALISE], ETAPAS_DA_ANALISE)
+
+        corpo = json.loads(b''.join(resposta.streaming_content))
+        self.assertEqual([etapa['nome'] for etapa in corpo['metricas']['etapas']], nomes)
+
+    @override_settings(ANALISADOR_METRICAS=True, ANALISADOR_METRICAS_SERVER_TIMING=False)
+    def test_sem_cabecalho_com_server_timing_desligado(self):
+        self.assertNotIn('Server-Timing', self._analisar())
+
+    @override_settings(ANALISADOR_METRICAS=False, ANALISADOR_METRICAS_SERVER_TIMING=True)
+    def test_sem_cabecalho_com_metricas_desligadas(self):
+        resposta = self.client.post(self.URL, b'1 2 4 4', content_type='text/plain')
+        self.assertNotIn('Server-Timing', resposta)
+        self.assertNotIn('metricas', json.loads(b''.join(resposta.streaming_content)))
@@ -0,0 +1,146 @@
+import random
+from collections import Counter
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from analisador import motor
+from analisador.intervalos import compactar_numeros
+from analisador.motor import MapaPresenca, NumerosEsparsos
+
+
+def _referencia(numeros):
+    """Corridas e duplicados calculados com Counter e set."""
+    contador = Counter(numeros)
+    return (
+        compactar_numeros(sorted(set(numeros))),
+        sorted((n, q) for n, q in contador.items() if q > 1),
+    )
+
+
+@mock.patch.object(motor, 'TAMANHO_BLOCO_ESPARSO', 8)
+@mock.patch.object(motor, 'BLOCOS_POR_NIVEL_ESPARSO', 2)
+@mock.patch.object(motor, 'TAMANHO_INICIAL_BITMAP', 4)
+@mock.patch.object(MapaPresenca.__init__, '__defaults__', (64,))  # LIMITE_BITMAP = 64
+class MapaPresencaTests(SimpleTestCase):
+
+    def _conferir(self, numeros, esparso):
+        mapa = MapaPresenca()
+        # Em partes, como os blocos do tokenizador
+        for i in range(0, len(numeros), 7):
+            mapa.adicionar_varios(numeros[i:i + 7])
+
+        corridas, duplicados = _referencia(numeros)
+        self.assertEqual(mapa.esparso is not None, esparso)
+        self.assertEqual(mapa.total, len(numeros))
+        self.assertEqual(list(mapa.corridas()), corridas)
+        self.assertEqual(mapa.duplicados(), duplicados)
+        self.assertEqual(mapa.intervalo(), (min(numeros), max(numeros)))
+
+    def test_bitmap_e_esparso_equivalem_a_referencia(self):
+        aleatorio = random.Random(2024)
+        for rodada in range(300):
+            amplitude = aleatorio.choice((10, 40, 63, 64, 65, 200, 10 ** 6))
+            base = aleatorio.randint(-500, 500)
+            quantidade = aleatorio.randint(1, 120)
+            numeros = [base + aleatorio.randrange(amplitude) for _ in range(quantidade)]
+            with self.subTest(rodada=rodada, amplitude=amplitude):
+                self._conferir(numeros, max(numeros) - min(numeros) + 1 > 64)
+
+    def test_modo_esparso_com_numeros_fora_de_64_bits(self):
+        numeros = [5, 1 << 70, 6, -(1 << 64), 5, 1 << 70, 7, 100, -(1 << 64) + 1]
+        self._conferir(numeros, True)
+
+    def test_passa_para_o_esparso_mantendo_repeticoes_do_bitmap(self):
+        numeros = [3, 3, 4, -2, -2, -2, 10] + [500, 3, 501]
+        self._conferir(numeros, True)
+
+    def test_negativos_no_bitmap(self):
+        self._conferir([-10, -9, -9, -7, -1, -10], False)
+
+    def test_um_so_numero(self):
+        for numeros in ([0], [-5], [7, 7, 7], [1 << 80]):
+            with self.subTest(numeros=numeros):
+                self._conferir(numeros, False)
+
+
+@mock.patch.object(motor, 'TAMANHO_BLOCO_ESPARSO', 8)
+@mock.patch.object(motor, 'BLOCOS_POR_NIVEL_ESPARSO', 4)
+class IntercalacaoEmNiveisTests(SimpleTestCase):
+
+    def test_blocos_grandes_ficam_fora_das_intercalacoes(self):
+        aleatorio = random.Random(18)
+        numeros = [aleatorio.randrange(-10 ** 6, 10 ** 6) for _ in range(8 * 300)]
+        esparsos = NumerosEsparsos()
+        intercalados = []
+        merge = motor.heapq.merge
+
+        def registrar(*blocos):
+            intercalados.append(sum(map(len, blocos)))
+            return merge(*blocos)
+
+        with mock.patch.object(motor.heapq, 'merge', side_effect=registrar):
+            for i in range(0, len(numeros), 8):
+                esparsos.adicionar_varios(numeros[i:i + 8])
+
+                niveis = [motor._nivel_bloco(bloco) for bloco in esparsos.blocos]
+                self.assertEqual(niveis, sorted(niveis, reverse=True))
+                self.assertTrue(all(niveis.count(nivel) < 4 for nivel in niveis))
+
+        # 300 blocos de 8 = 1·4⁴ + 2·4² + 3·4 (base 4); cada número é intercalado até 4 vezes
+        self.assertEqual([len(bloco) for bloco in esparsos.blocos], [2048, 128, 128, 32, 32, 32])
+        self.assertLessEqual(sum(intercalados), 4 * len(numeros))
+        self.assertEqual(esparsos.consolidar(), _referencia(numeros))
+
+
+def _analisar(backend, blocos):
+    analisador = motor.criar_motor(backend)
+    for bloco in blocos:
+        analisador.alimentar(bloco)
+    return analisador.concluir(limite_gap=10), analisador
+
+
+@mock.patch('analisador.motor_numpy.TAMANHO_LOTE_BYTES', 16)
+@mock.patch('analisador.motor_numpy.LIMITE_PENDENTES', 8)
+class MotorNumpyForaDeInt64Tests(SimpleTestCase):
+    """O MotorNumpy passa ao MotorPython ao ver um número fora de int64, com o mesmo resultado."""
+
+    GRANDE = 1 << 63
+    DADOS = (
+        b'1 2 3 3 -4 9223372036854775807 -9223372036854775808 5\n'
+        b'6,7 -9223372036854775809 8 2 18446744073709551616 9\r\n'
+        b'10 11 12 1 -4 99999999999999999999999999 13'
+    )
+
+    def _conferir(self, blocos):
+        esperado, _ = _analisar('python', blocos)
+        obtido, numpy = _analisar('numpy', blocos)
+        self.assertIsNotNone(numpy._reserva)
+        self.assertEqual(obtido, esperado)
+        self.assertEqual(numpy.total, esperado.total)
+        self.assertEqual(numpy.bytes_lidos, sum(map(len, blocos)))
+
+    def test_fora_de_int64_no_meio_do_fluxo(self):
+        for tamanho in (1, 5, 16, 17, 64, len(self.DADOS)):
+            with self.subTest(tamanho=tamanho):
+                self._conferir([self.DADOS[i:i + tamanho] for i in range(0, len(self.DADOS), tamanho)])
+
+    def test_fora_de_int64_cortado_no_limite_do_bloco(self):
+        dados = b'1 2 3 3 -4 9223372036854775807 5\r\n-18446744073709551616\r\n9 2 -4'
+        posicao = dados.index(b'-18446744073709551616')
+        for corte in range(posicao - 1, posicao + 23):
+            with self.subTest(corte=corte):
+                self._conferir([dados[:corte], dados[corte:]])
+
+    def test_fora_de_int64_no_ultimo_numero(self):
+        self._conferir([b'5 6 7 5 ', str(self.GRANDE).encode()[:10], str(self.GRANDE).encode()[10:]])
+        self._conferir([b'-1 0 1 -', str(self.GRANDE + 1).encode()])
+
+    def test_numeros_ja_convertidos(self):
+        numeros = list(range(20)) + [3, -self.GRANDE - 1, 4, self.GRANDE, 4] + list(range(18, 30))
+        esperado = motor.criar_motor('python')
+        esperado.adicionar_varios(numeros)
+        numpy = motor.criar_motor('numpy')
+        numpy.adicionar_varios(iter(numeros))
+        self.assertIsNotNone(numpy._reserva)
+        self.assertEqual(numpy.concluir(10), esperado.concluir(10))
@@ -0,0 +1,67 @@
+import random
+
+from django.test import SimpleTestCase
+
+from analisador.previa import MAXIMO_AMOSTRA, criar_esboco
+from analisador.servicos import AnalisadorSequencia
+
+
+BACKENDS = ('python', 'numpy')
+
+
+def _dados(unicos, duplicados, semente):
+    """Números distintos espalhados, dos quais ``duplicados`` aparecem duas vezes."""
+    aleatorio = random.Random(semente)
+    numeros = aleatorio.sample(range(10_000_000), unicos)
+    numeros += aleatorio.sample(numeros, duplicados)
+    aleatorio.shuffle(numeros)
+    return '\n'.join(map(str, numeros)).encode()
+
+
+def _previa(dados, backend):
+    esboco = criar_esboco(backend)
+    for i in range(0, len(dados), 65536):
+        esboco.alimentar(dados[i:i + 65536])
+    esboco.finalizar_leitura()
+    return esboco.estatisticas(limite_gap=1000)
+
+
+class PreviaDuplicadosTests(SimpleTestCase):
+
+    UNICOS = 200_000
+
+    def test_poucos_duplicados_nao_sao_estimados(self):
+        # 0,02% de duplicados: a amostra não tem repetidos suficientes
+        dados = _dados(self.UNICOS, 40, semente=24)
+        previas = [_previa(dados, backend) for backend in BACKENDS]
+        self.assertEqual(previas[0], previas[1])
+        previa = previas[0]
+        self.assertIsNone(previa['total_duplicados'])
+        self.assertIsNone(previa['margem_erro_duplicados'])
+        self.assertGreaterEqual(previa['maximo_duplicados'], 40)
+        self.assertLess(previa['maximo_duplicados'], self.UNICOS * 10 // MAXIMO_AMOSTRA)
+
+    def test_estimativa_dentro_da_margem(self):
+        duplicados = self.UNICOS // 10
+        dados = _dados(self.UNICOS, duplicados, semente=25)
+        previas = [_previa(dados, backend) for backend in BACKENDS]
+        self.assertEqual(previas[0], previas[1])
+        previa = previas[0]
+        margem = previa['margem_erro_duplicados'] / 100
+        self.assertGreater(margem, 0)
+        self.assertLess(margem, 0.2)
+        self.assertLessEqual(abs(previa['total_duplicados'] - duplicados), 3 * margem * duplicados)
+        self.assertGreaterEqual(previa['maximo_duplicados'], duplicados)
+
+    def test_previa_exata_igual_a_analise(self):
+        dados = _dados(1000, 37, semente=26)
+        analisador = AnalisadorSequencia('python')
+        analisador.limite_gap = 1000
+        esperado = analisador.processar_chunks([dados])['estatisticas']
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                previa = _previa(dados, backend)
+                self.assertEqual(previa['total_duplicados'], esperado['total_duplicados'])
+                self.assertEqual(previa['maximo_duplicados'], esperado['total_duplicados'])
+                self.assertEqual(previa['numeros_unicos'], esperado['numeros_unicos'])
+                self.assertEqual(previa['margem_erro_duplicados'], 0)
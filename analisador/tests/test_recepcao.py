@@ -0,0 +1,83 @@
+import random
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import StopFutureHandlers
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from analisador.cache_resultados import calcular_hash, obter_snapshot
+from analisador.models import Analise
+from analisador.recepcao import AnaliseDuranteUpload, ArquivoAnalisado
+from analisador.servicos import AnalisadorSequencia
+
+
+BACKENDS = ('python', 'numpy')
+
+
+def _receber(dados, tamanhos, backend, nome='dados.txt'):
+    """Entrega os bytes ao handler como o MultiPartParser, em blocos dos tamanhos dados."""
+    handler = AnaliseDuranteUpload(backend=backend)
+    try:
+        handler.new_file('arquivo', nome, 'text/plain', len(dados))
+    except StopFutureHandlers:
+        pass
+    posicao = 0
+    for tamanho in tamanhos:
+        handler.receive_data_chunk(dados[posicao:posicao + tamanho], posicao)
+        posicao += tamanho
+    return handler.file_complete(len(dados))
+
+
+class AnaliseDuranteUploadTests(SimpleTestCase):
+
+    def test_igual_a_processar_chunks(self):
+        aleatorio = random.Random(21)
+        numeros = [aleatorio.randrange(-100, 5000) for _ in range(3000)] + [1 << 70, -(1 << 64)]
+        aleatorio.shuffle(numeros)
+        separadores = (',', '\r\n', '\n', ' ; ')
+        dados = ''.join(str(n) + aleatorio.choice(separadores) for n in numeros).encode()
+
+        for backend in BACKENDS:
+            esperado = AnalisadorSequencia(backend).processar_chunks([dados])
+            for rodada in range(5):
+                tamanhos = []
+                while sum(tamanhos) < len(dados):
+                    tamanhos.append(aleatorio.randint(1, 700))
+                with self.subTest(backend=backend, rodada=rodada):
+                    arquivo = _receber(dados, tamanhos, backend)
+                    self.assertIsInstance(arquivo, ArquivoAnalisado)
+                    self.assertEqual(arquivo.size, len(dados))
+                    self.assertEqual(arquivo.hash_conteudo, calcular_hash([dados]))
+                    self.assertEqual(AnalisadorSequencia(backend).processar_recebido(arquivo), esperado)
+
+    def test_outros_campos_e_gz_seguem_para_os_handlers_padrao(self):
+        handler = AnaliseDuranteUpload()
+        handler.new_file('outro', 'dados.txt', 'text/plain', 3)
+        self.assertEqual(handler.receive_data_chunk(b'1 2', 0), b'1 2')
+        self.assertIsNone(handler.file_complete(3))
+
+        handler.new_file('arquivo', 'dados.txt.gz', 'application/gzip', 3)
+        self.assertEqual(handler.receive_data_chunk(b'abc', 0), b'abc')
+
+    @override_settings(ANALISADOR_TAMANHO_MAXIMO=10)
+    def test_bytes_acima_do_limite_nao_sao_analisados(self):
+        arquivo = _receber(b'1 2 3 4 5 6 7 8 9', [4, 4, 4, 5], 'python')
+        self.assertEqual(arquivo.size, 17)
+        self.assertEqual(arquivo.hash_conteudo, calcular_hash([b'1 2 3 4 5 6 7 8 9'[:8]]))
+
+
+@override_settings(ANALISADOR_METRICAS=False)
+class ProcessarArquivoRecebidoTests(TestCase):
+
+    def test_view_analisa_durante_o_upload(self):
+        dados = b'10\r\n11\r\n13\r\n13\r\n' * 50
+        arquivo = SimpleUploadedFile('dados.txt', dados)
+        resposta = self.client.post(reverse('analisador:processar'), {'arquivo': arquivo})
+        self.assertEqual(resposta.status_code, 302)
+
+        analise = Analise.objects.get()
+        self.assertEqual(analise.hash_conteudo, calcular_hash([dados]))
+        analisador = AnalisadorSequencia()
+        analisador.processar_chunks([dados])
+        self.assertEqual(obter_snapshot(analise.id_resultado), analisador.snapshot)
+        self.assertEqual(analisador.snapshot.duplicados, ((10, 50), (11, 50), (13, 100)))
@@ -0,0 +1,127 @@
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from analisador.cache_resultados import (
+    calcular_hash, esquecer_resultado, gerar_id_resultado, guardar_snapshot,
+)
+from analisador.historico import registrar_analise
+from analisador.servicos import AnalisadorSequencia
+from analisador.views import TAMANHO_PAGINA_RESULTADO
+
+
+@override_settings(ANALISADOR_METRICAS=False)
+class ExibirResultadoTests(TestCase):
+
+    DADOS = b'1\n2\n3\n5\n5\n9\n'
+
+    def setUp(self):
+        analisador = AnalisadorSequencia()
+        analisador.processar_chunks([self.DADOS])
+        self.id_resultado = gerar_id_resultado(calcular_hash([self.DADOS]), analisador)
+        guardar_snapshot(self.id_resultado, analisador.snapshot)
+        registrar_analise(self.id_resultado, analisador.snapshot, 'dados.txt')
+        self.addCleanup(esquecer_resultado, self.id_resultado)
+        self.url = reverse('analisador:resultado', args=[self.id_resultado])
+
+    def test_envio_redireciona_para_o_resultado(self):
+        resposta = self.client.post(reverse('analisador:processar'), {
+            'arquivo': SimpleUploadedFile('outro.txt', self.DADOS),
+        })
+        self.assertRedirects(resposta, self.url, fetch_redirect_response=False)
+
+    def test_pagina_vem_do_snapshot_guardado(self):
+        resposta = self.client.get(self.url)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTemplateUsed(resposta, 'analisador/resultado.html')
+        resultado = resposta.context['resultado']
+        self.assertEqual(resultado['id_resultado'], self.id_resultado)
+        self.assertEqual(resultado['estatisticas']['total_numeros_arquivo'], 6)
+        self.assertEqual(resultado['estatisticas']['total_duplicados'], 1)
+        self.assertEqual(resposta.context['nome_arquivo'], 'dados.txt')
+        self.assertIn('ETag', resposta)
+        self.assertIn('Last-Modified', resposta)
+        self.assertIn('private', resposta['Cache-Control'])
+        self.assertIn('no-cache', resposta['Cache-Control'])
+
+    def test_visita_repetida_responde_304(self):
+        primeira = self.client.get(self.url)
+        resposta = self.client.get(self.url, HTTP_IF_NONE_MATCH=primeira['ETag'])
+        self.assertEqual(resposta.status_code, 304)
+        self.assertEqual(resposta.content, b'')
+
+        resposta = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=primeira['Last-Modified'])
+        self.assertEqual(resposta.status_code, 304)
+
+        resposta = self.client.get(self.url, HTTP_IF_NONE_MATCH='"outro"')
+        self.assertEqual(resposta.status_code, 200)
+
+    def test_mensagens_pendentes_impedem_o_304(self):
+        etag = self.client.get(self.url)['ETag']
+        # Envio sem arquivo: a mensagem de erro fica para a próxima página
+        self.client.post(reverse('analisador:processar'))
+        resposta = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertNotIn('ETag', resposta)
+        self.assertContains(resposta, 'Nenhum arquivo foi enviado.')
+
+    def test_id_desconhecido_responde_404(self):
+        resposta = self.client.get(reverse('analisador:resultado', args=['nao-existe-1000']))
+        self.assertEqual(resposta.status_code, 404)
+        self.assertContains(resposta, 'Resultado não encontrado ou expirado', status_code=404)
+
+
+class PaginaResultadoTests(TestCase):
+
+    def _guardar(self, numeros):
+        analisador = AnalisadorSequencia()
+        analisador.limite_gap = 10 ** 9
+        analisador.processar_chunks([' '.join(map(str, numeros)).encode()])
+        id_resultado = f'paginas-{len(numeros)}-1000'
+        guardar_snapshot(id_resultado, analisador.snapshot)
+        self.addCleanup(esquecer_resultado, id_resultado)
+        return id_resultado
+
+    def _pagina(self, id_resultado, lista='faltantes', **parametros):
+        return self.client.get(reverse('analisador:pagina_resultado', args=[id_resultado, lista]), parametros)
+
+    def test_limites_da_pagina(self):
+        # 1.200 faltantes: páginas de 500, 500 e 200
+        id_resultado = self._guardar(range(1, 2402, 2))
+        for pagina, esperada in (('1', 1), ('2', 2), ('0', 3), ('-1', 3), ('99', 3), ('abc', 1), ('', 1)):
+            with self.subTest(pagina=pagina):
+                dados = self._pagina(id_resultado, pagina=pagina).json()
+                self.assertEqual(dados['pagina'], esperada)
+                self.assertEqual(dados['total_paginas'], 3)
+                self.assertEqual(dados['total_itens'], 1200)
+                self.assertLessEqual(len(dados['itens']), TAMANHO_PAGINA_RESULTADO)
+
+    def test_ultima_pagina(self):
+        id_resultado = self._guardar(range(1, 2402, 2))
+        dados = self._pagina(id_resultado, pagina=3).json()
+        self.assertFalse(dados['tem_proxima'])
+        self.assertEqual(len(dados['itens']), 200)
+        self.assertEqual(dados['itens'][-1], '2400')
+        self.assertTrue(self._pagina(id_resultado, pagina=2).json()['tem_proxima'])
+
+    def test_formato_de_cada_lista(self):
+        id_resultado = self._guardar([1, 2, 2, 5, 6, 100])
+        self.assertEqual(self._pagina(id_resultado, 'encontrados').json()['itens'], ['1-2', '5-6', '100'])
+        self.assertEqual(
+            self._pagina(id_resultado, 'duplicados').json()['itens'], [{'numero': 2, 'quantidade': 2}]
+        )
+        self.assertEqual(self._pagina(id_resultado, 'faltantes').json()['itens'], ['3-4', '7-99'])
+
+    def test_lista_ou_resultado_desconhecidos(self):
+        id_resultado = self._guardar([1, 3])
+        resposta = self._pagina(id_resultado, 'outra')
+        self.assertEqual(resposta.status_code, 404)
+        self.assertEqual(resposta.json()['erro'], 'Lista desconhecida: outra')
+        self.assertEqual(self._pagina('nao-existe-1000').status_code, 404)
+
+    def test_tamanho_da_resposta_nao_cresce_com_o_resultado(self):
+        pequeno = self._pagina(self._guardar(range(1, 2 * 1000, 2)))
+        grande = self._pagina(self._guardar(range(1, 2 * 200_000, 2)))
+        self.assertEqual(len(grande.json()['itens']), TAMANHO_PAGINA_RESULTADO)
+        self.assertEqual(grande.json()['total_itens'], 199_999)
+        self.assertLess(len(grande.content), 2 * len(pequeno.content))
@@ -0,0 +1,70 @@
+from django.test import SimpleTestCase
+
+from analisador.admissao import custo_resultado
+from analisador.series import FormatoSeries, SeparadorSeries
+from analisador.servicos import AnalisadorSequencia
+
+
+BACKENDS = ('python', 'numpy')
+
+# Campos que int() aceitaria, mas que não são números pela regra -?[0-9]+
+CAMPOS_INVALIDOS = ('1_000', '+5', '1 2', '٣', '１２', '--4', '5-', '-', '0x10', '1e3')
+# Campos válidos, depois de retiradas as aspas e os espaços das pontas
+CAMPOS_VALIDOS = {'7': 7, ' 8 ': 8, '"9"': 9, '-10': -10, '0011': 11, "'12'": 12}
+
+
+def _separar(backend, dados, formato, tamanho_bloco):
+    separador = SeparadorSeries(formato, backend)
+    for i in range(0, len(dados), tamanho_bloco):
+        separador.alimentar(dados[i:i + tamanho_bloco])
+    series = separador.concluir(limite_gap=100)
+    return {serie: snapshot.corridas for serie, snapshot in series.items()}, separador.linhas_ignoradas
+
+
+class CampoNumeroTests(SimpleTestCase):
+
+    def _conferir(self, formato, linhas):
+        dados = '\r\n'.join(linhas).encode('utf-8')
+        for tamanho_bloco in (7, len(dados)):
+            resultados = [_separar(backend, dados, formato, tamanho_bloco) for backend in BACKENDS]
+            with self.subTest(tamanho_bloco=tamanho_bloco):
+                self.assertEqual(resultados[0], resultados[1])
+                series, ignoradas = resultados[0]
+                self.assertEqual(ignoradas, len(CAMPOS_INVALIDOS))
+                self.assertEqual(series, {'A': ((-10, -10), (7, 9), (11, 12))})
+
+    def test_csv_so_aceita_digitos_ascii(self):
+        linhas = [f'A;{campo}' for campo in CAMPOS_INVALIDOS + tuple(CAMPOS_VALIDOS)]
+        self._conferir(FormatoSeries(coluna_serie=1, coluna_numero=2, delimitador=';'), linhas)
+
+    def test_regex_so_aceita_digitos_ascii(self):
+        linhas = [f'serie A: [{campo}]' for campo in CAMPOS_INVALIDOS + tuple(CAMPOS_VALIDOS)]
+        formato = FormatoSeries(padrao=r'serie (?P<serie>\w+): \[["\']?(?P<numero>[^]"\']*)["\']?\]')
+        self._conferir(formato, linhas)
+
+    def test_regex_lido_linha_a_linha(self):
+        # Flag global no início: a expressão não pode ser aplicada ao bloco inteiro
+        formato = FormatoSeries(padrao=r'(?i)(?P<serie>a)=(?P<numero>[^;]*);')
+        self.assertIsNone(formato.separar(b'A=1;\n'))
+        linhas = [f'A={campo.strip(chr(34) + chr(39))};' for campo in CAMPOS_INVALIDOS + tuple(CAMPOS_VALIDOS)]
+        self._conferir(formato, linhas)
+
+
+class _ReservaRegistrada:
+
+    def __init__(self):
+        self.custos = []
+
+    def ampliar(self, custo):
+        self.custos.append(custo)
+
+
+class ReservaSeriesTests(SimpleTestCase):
+
+    def test_reserva_a_soma_das_series_antes_de_consolidar(self):
+        reserva = _ReservaRegistrada()
+        analisador = AnalisadorSequencia('python', reserva=reserva)
+        dados = b'A,1\nB,100\nA,2\nB,300\nA,3\nB,1000\n'
+        resultado = analisador.processar_series([dados], FormatoSeries(coluna_serie=1, coluna_numero=2))
+        self.assertTrue(resultado['sucesso'])
+        self.assertEqual(reserva.custos, [custo_resultado(3, 1, 3) + custo_resultado(3, 100, 1000)])
@@ -0,0 +1,142 @@
+import random
+import re
+from collections import Counter
+
+from django.test import SimpleTestCase
+
+from analisador.intervalos import expandir_intervalos
+from analisador.servicos import AnalisadorSequencia
+
+
+BACKENDS = ('python', 'numpy')
+
+
+class IntervaloGrandeTests(SimpleTestCase):
+
+    def test_intervalo_muito_maior_que_50000(self):
+        presentes = [n for n in range(1, 300_001) if not 120_000 <= n <= 120_009 and n != 250_000]
+        presentes += range(5_000_000, 5_000_101)
+        conteudo = '\n'.join(map(str, reversed(presentes)))
+
+        for backend in BACKENDS:
+            with self.subTest(backend=backend):
+                resultado = AnalisadorSequencia(backend).processar_arquivo(conteudo)
+                self.assertTrue(resultado['sucesso'])
+                self.assertEqual(resultado['intervalos_encontrados'], [
+                    (1, 119_999), (120_010, 249_999), (250_001, 300_000), (5_000_000, 5_000_100),
+                ])
+                self.assertEqual(resultado['intervalos_faltantes'], [(120_000, 120_009), (250_000, 250_000)])
+                self.assertEqual(resultado['gap_detectado'], [
+                    {'inicio': 300_000, 'fim': 5_000_000, 'tamanho_gap': 4_699_999},
+                ])
+                self.assertEqual(resultado['estatisticas']['tamanho_sequencia_esperada'], 5_000_100)
+                self.assertEqual(resultado['estatisticas']['total_faltantes'], 11)
+
+
+def _duplicados_antes(numeros):
+    """_identificar_duplicados anterior ao snapshot, sobre a lista de números."""
+    contador = Counter(numeros)
+    return sorted(
+        ({'numero': n, 'quantidade': q} for n, q in contador.items() if q > 1),
+        key=lambda d: d['numero'],
+    )
+
+
+def _gaps_antes(numeros, limite_gap):
+    """_detectar_gaps_grandes anterior ao snapshot."""
+    unicos = sorted(set(numeros))
+    return [
+        {'inicio': a, 'fim': b, 'tamanho_gap': b - a - 1}
+        for a, b in zip(unicos, unicos[1:]) if b - a - 1 > limite_gap
+    ]
+
+
+def _faltantes_antes(numeros, limite_gap):
+    """_identificar_faltantes_otimizado anterior ao snapshot, número a número."""
+    unicos = sorted(set(numeros))
+    return [n for a, b in zip(unicos, unicos[1:]) if b - a - 1 <= limite_gap for n in range(a + 1, b)]
+
+
+def _numeros_da_lista_copia(texto):
+    """Expande a lista para cópia ("1, 3-5, -2--1") de volta em números."""
+    numeros = []
+    for inicio, fim in re.findall(r'(-?\d+)(?:-(-?\d+))?', texto):
+        numeros.extend(range(int(inicio), int(fim or inicio) + 1))
+    return numeros
+
+
+class EquivalenciaSnapshotTests(SimpleTestCase):
+    """Os métodos de consulta leem o snapshot com o mesmo resultado das varreduras anteriores."""
+
+    def test_consultas_iguais_as_de_antes_do_snapshot(self):
+        aleatorio = random.Random(4)
+        for rodada in range(60):
+            amplitude = aleatorio.choice((30, 3000, 10 ** 7))
+            numeros = [aleatorio.randrange(amplitude) - amplitude // 3 for _ in range(aleatorio.randint(1, 400))]
+            limite_gap = aleatorio.choice((0, 5, 1000))
+
+            for backend in BACKENDS:
+                with self.subTest(rodada=rodada, backend=backend):
+                    analisador = AnalisadorSequencia(backend)
+                    analisador.limite_gap = limite_gap
+                    analisador.processar_arquivo(' '.join(map(str, numeros)))
+
+                    self.assertEqual(analisador._identificar_duplicados(), _duplicados_antes(numeros))
+                    self.assertEqual(analisador._detectar_gaps_grandes(), _gaps_antes(numeros, limite_gap))
+                    faltantes = _faltantes_antes(numeros, limite_gap)
+                    self.assertEqual(
+                        list(expandir_intervalos(analisador._identificar_faltantes_otimizado())), faltantes
+                    )
+                    copia = analisador.gerar_lista_copia_faltantes()
+                    if not faltantes:
+                        self.assertEqual(copia, 'Nenhum número faltante')
+                    elif len(analisador.snapshot.faltantes) <= 1000:
+                        self.assertEqual(_numeros_da_lista_copia(copia), faltantes)
+
+
+class AcrescimoTests(SimpleTestCase):
+    """Acrescentar números equivale a analisar de novo o arquivo inteiro."""
+
+    CASOS = {
+        'preenche_lacuna': ('1 2 5 6 9', '3 4'),
+        'estende_corrida': ('10 11 12 40', '13 14 9 41'),
+        'novos_duplicados': ('1 2 3 2', '2 3 3 7'),
+        'fecha_gap_grande': ('1 2 3000 3001', '1500'),
+        'fora_do_intervalo': ('100 101', '-5 -4 5000 100'),
+    }
+
+    def _conferir(self, base, novo, backend, via_estado=False):
+        completo = AnalisadorSequencia(backend)
+        esperado = completo.processar_arquivo(f'{base}\n{novo}')
+
+        analisador = AnalisadorSequencia(backend)
+        analisador.processar_arquivo(base)
+        if via_estado:
+            estado = analisador.salvar_estado()
+            analisador = AnalisadorSequencia(backend)
+            analisador.carregar_estado(estado)
+
+        self.assertEqual(analisador.acrescentar_chunks([novo.encode()]), esperado)
+        self.assertEqual(analisador.snapshot, completo.snapshot)
+
+    def test_acrescimo_igual_a_reanalise(self):
+        for backend in BACKENDS:
+            for nome, (base, novo) in self.CASOS.items():
+                for via_estado in (False, True):
+                    with self.subTest(backend=backend, caso=nome, via_estado=via_estado):
+                        self._conferir(base, novo, backend, via_estado)
+
+    def test_acrescimos_aleatorios(self):
+        aleatorio = random.Random(15)
+        for rodada in range(100):
+            base, novo = (
+                ' '.join(str(aleatorio.randrange(-50, 3000)) for _ in range(aleatorio.randint(1, 60)))
+                for _ in range(2)
+            )
+            with self.subTest(rodada=rodada):
+                self._conferir(base, novo, 'python', via_estado=rodada % 2)
+
+    def test_acrescimo_sem_numeros_mantem_a_analise(self):
+        analisador = AnalisadorSequencia()
+        antes = analisador.processar_arquivo('1 2 4')
+        self.assertEqual(analisador.acrescentar_chunks([b'nada aqui']), antes)
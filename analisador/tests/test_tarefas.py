@@ -0,0 +1,148 @@
+import threading
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from analisador import tarefas
+from analisador.models import Analise
+
+
+class _ExecutorAdiado:
+    """Guarda as tarefas enviadas e só as executa, em outra thread, quando pedido."""
+
+    def __init__(self):
+        self.pendentes = []
+
+    def submit(self, funcao, *args):
+        self.pendentes.append((funcao, args))
+
+    def executar(self):
+        def rodar():
+            for funcao, args in self.pendentes:
+                funcao(*args)
+
+        thread = threading.Thread(target=rodar)
+        thread.start()
+        thread.join()
+        self.pendentes = []
+
+
+@override_settings(ANALISADOR_METRICAS=False)
+class TarefasTests(TransactionTestCase):
+
+    def setUp(self):
+        self.executor = _ExecutorAdiado()
+        self.estados = []
+        publicar = tarefas._publicar
+
+        def registrar(tarefa):
+            self.estados.append(tarefa.estado)
+            publicar(tarefa)
+
+        for patcher in (
+            mock.patch.dict(tarefas._tarefas, clear=True),
+            mock.patch.object(tarefas, '_obter_executor', return_value=self.executor),
+            mock.patch.object(tarefas, '_publicar', side_effect=registrar),
+            # O SQLite em memória dos testes ignora o fechamento da conexão
+            mock.patch.object(tarefas, 'connection'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _enviar(self, dados, nome='dados.txt'):
+        return self.client.post(reverse('analisador:processar_assincrono'), {
+            'arquivo': SimpleUploadedFile(nome, dados),
+        })
+
+    def _status(self, tarefa_id):
+        return self.client.get(reverse('analisador:status_tarefa', args=[tarefa_id]))
+
+    def test_upload_ate_a_conclusao(self):
+        resposta = self._enviar(b'1\n2\n3\n5\n5\n6\n')
+        self.assertEqual(resposta.status_code, 202)
+        dados = resposta.json()
+        self.assertEqual(dados['status_url'], reverse('analisador:status_tarefa', args=[dados['id']]))
+
+        status = self._status(dados['id']).json()
+        self.assertEqual(status['estado'], tarefas.NA_FILA)
+        self.assertIsNone(status['id_resultado'])
+        self.assertNotIn('resultado', status)
+
+        self.executor.executar()
+        self.assertEqual(list(dict.fromkeys(self.estados)), [tarefas.NA_FILA, tarefas.PROCESSANDO, tarefas.CONCLUIDA])
+        tarefas.connection.close.assert_called_once_with()
+
+        status = self._status(dados['id']).json()
+        self.assertEqual(status['estado'], tarefas.CONCLUIDA)
+        self.assertEqual(status['percentual'], 100.0)
+        self.assertEqual(status['numeros_lidos'], 6)
+        self.assertEqual(status['resultado']['id_resultado'], status['id_resultado'])
+        self.assertEqual(status['resultado']['estatisticas']['total_duplicados'], 1)
+        self.assertEqual(status['resultado']['intervalos_faltantes'], [[4, 4]])
+        self.assertTrue(Analise.objects.filter(id_resultado=status['id_resultado']).exists())
+
+        resposta = self.client.get(dados['resultado_url'])
+        self.assertRedirects(
+            resposta, reverse('analisador:resultado', args=[status['id_resultado']]), fetch_redirect_response=False
+        )
+
+    def test_erro_na_analise(self):
+        tarefa_id = self._enviar(b'sem numeros aqui').json()['id']
+        self.executor.executar()
+
+        status = self._status(tarefa_id).json()
+        self.assertEqual(status['estado'], tarefas.ERRO)
+        self.assertEqual(status['erro'], 'Nenhum número foi encontrado no arquivo.')
+        self.assertIsNone(status['id_resultado'])
+        tarefas.connection.close.assert_called_once_with()
+
+        resposta = self.client.get(reverse('analisador:resultado_tarefa', args=[tarefa_id]))
+        self.assertRedirects(resposta, reverse('analisador:index'), fetch_redirect_response=False)
+
+    @override_settings(ANALISADOR_TAREFAS_FILA=1, ANALISADOR_ADMISSAO_RETRY_AFTER=4)
+    def test_fila_cheia_responde_503(self):
+        self.assertEqual(self._enviar(b'1 2 3').status_code, 202)
+        resposta = self._enviar(b'4 5 6')
+        self.assertEqual(resposta.status_code, 503)
+        self.assertEqual(resposta['Retry-After'], '4')
+        self.assertEqual(len(self.executor.pendentes), 1)
+
+        # Finalizada, a tarefa deixa de ocupar a fila
+        self.executor.executar()
+        self.assertEqual(self._enviar(b'4 5 6').status_code, 202)
+
+    def test_tarefa_de_outro_processo_lida_do_cache(self):
+        tarefa_id = self._enviar(b'7 8 9').json()['id']
+        self.executor.executar()
+        tarefas._tarefas.clear()
+
+        status = self._status(tarefa_id).json()
+        self.assertEqual(status['estado'], tarefas.CONCLUIDA)
+        self.assertIn('resultado', status)
+
+    def test_tarefa_inexistente(self):
+        self.assertEqual(self._status('nao-existe').status_code, 404)
+        resposta = self.client.get(reverse('analisador:resultado_tarefa', args=['nao-existe']))
+        self.assertRedirects(resposta, reverse('analisador:index'), fetch_redirect_response=False)
+
+
+class ReterArquivoTests(SimpleTestCase):
+
+    def test_arquivo_em_memoria_e_copiado(self):
+        arquivo = SimpleUploadedFile('dados.txt', b'1 2 3')
+        arquivo.read()
+        fonte = tarefas.reter_arquivo(arquivo)
+        arquivo.close()
+        with fonte:
+            self.assertEqual(fonte.read(), b'1 2 3')
+
+    def test_arquivo_temporario_sobrevive_ao_fim_do_request(self):
+        arquivo = TemporaryUploadedFile('dados.txt', 'text/plain', 5, None)
+        arquivo.write(b'4 5 6')
+        arquivo.flush()
+        fonte = tarefas.reter_arquivo(arquivo)
+        arquivo.close()  # O Django apaga o arquivo temporário
+        with fonte:
+            self.assertEqual(fonte.read(), b'4 5 6')
@@ -7,6 +7,22 @@ app_name = 'analisador'
 urlpatterns = [
     path('', views.pagina_inicial, name='index'),
     path('processar/', views.processar_arquivo, name='processar'),
+    path('processar/lote/', views.processar_lote, name='processar_lote'),
+    path('processar/series/', views.processar_series, name='processar_series'),
+    path('series/<str:id_series>/', views.exibir_series, name='series'),
+    path('processar/assincrono/', views.processar_assincrono, name='processar_assincrono'),
+    path('tarefas/<str:tarefa_id>/', views.status_tarefa, name='status_tarefa'),
+    path('tarefas/<str:tarefa_id>/resultado/', views.resultado_tarefa, name='resultado_tarefa'),
+    path('historico/', views.historico, name='historico'),
+    path('historico/<str:id_resultado>/', views.abrir_analise, name='abrir_analise'),
+    path('historico/<str:id_resultado>/acrescentar/', views.acrescentar_analise, name='acrescentar_analise'),
+    path('comparar/', views.comparar_analises, name='comparar_analises'),
+    path('cache/estatisticas/', views.estatisticas_do_cache, name='estatisticas_cache'),
+    path('api/analisar/', views.api_analisar, name='api_analisar'),
+    path('api/previa/', views.api_previa, name='api_previa'),
+    path('resultado/<str:id_resultado>/', views.exibir_resultado, name='resultado'),
+    path('resultado/<str:id_resultado>/<str:lista>/', views.pagina_resultado, name='pagina_resultado'),
+    path('resultado/<str:id_resultado>/<str:lista>/exportar/', views.exportar_resultado, name='exportar_resultado'),
     path(
         "ads.txt",
         TemplateView.as_view(template_name="analisador/ads.txt", content_type="text/plain"),
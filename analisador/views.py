@@ -1,11 +1,34 @@
 from django.shortcuts import render, redirect
-from django.http import JsonResponse, HttpResponse
+from django.urls import reverse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib import messages
 from django.conf import settings
+from django.core.paginator import Paginator
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from functools import wraps
+import hashlib
 import os
 
+from . import lote, tarefas
+from .admissao import ReservaAcumulada, SemCapacidade, custo_leitura, custo_resultado, obter_controle
+from .comparacao import ComparacaoAnalises
+from .cache_resultados import (
+    acrescentar_com_cache, analisar_com_cache, analisar_fluxo_com_cache, analisar_recebido_com_cache,
+    analisar_series_com_cache, estatisticas_cache, obter_resumos, obter_snapshot,
+)
+from .fluxos import (
+    FORMATOS_EXPORTACAO, abrir_upload, comprimir_gzip, descomprimir_gzip, exportar_lista, ler_corpo,
+    resultado_em_json,
+)
+from .historico import obter_registro
+from .intervalos import formatar_intervalo
+from .metricas import aplicar_server_timing, criar_medidor
+from .models import Analise
+from .recepcao import AnaliseDuranteUpload, ArquivoAnalisado
+from .series import FormatoInvalido, FormatoSeries
 from .servicos import AnalisadorSequencia
 
 
@@ -13,95 +36,840 @@ def pagina_inicial(request):
     """
     View da página inicial com formulário de upload.
     """
-    return render(request, 'analisador/index.html')
+    return render(request, 'analisador/index.html', {
+        'tamanho_maximo': settings.ANALISADOR_TAMANHO_MAXIMO,
+    })
 
 
-@csrf_exempt
-@require_http_methods(["POST"])
-def processar_arquivo(request):
+def _tamanho_do_corpo(request):
     """
-    View para processar o arquivo enviado e exibir resultados.
+    Tamanho do corpo do request usado na admissão.
+    
+    Sem Content-Length, um corpo enviado em partes (Transfer-Encoding) tem
+    tamanho desconhecido e conta como o maior arquivo aceito.
+    
+    Raises:
+        ValueError: Se o Content-Length não for um número válido
+    """
+    declarado = request.META.get('CONTENT_LENGTH')
+    if declarado:
+        tamanho = int(declarado)
+        if tamanho < 0:
+            raise ValueError(declarado)
+        return tamanho
+    if request.META.get('HTTP_TRANSFER_ENCODING'):
+        return settings.ANALISADOR_TAMANHO_MAXIMO
+    return 0
+
+
+def _com_admissao(custo_base=None, json=False):
+    """
+    Decorator que passa a view pelo controle de admissão antes de ler o
+    upload.
+    
+    A memória é reservada pelo tamanho do corpo do request (_tamanho_do_corpo),
+    mais o custo de ``custo_base(**kwargs)`` (por exemplo, a análise à qual
+    os números serão acrescentados). A reserva fica em
+    ``request.reserva_analise``, para ser ampliada pelo AnalisadorSequencia
+    depois da leitura. Sem capacidade, a resposta é 503 com Retry-After; com
+    um Content-Length inválido, 400. As respostas são JSON se ``json`` (ou
+    ``?formato=json``), senão a página inicial com a mensagem. Requests sem
+    corpo passam direto.
+    """
+    def responder(request, mensagem, status):
+        if json or request.GET.get('formato') == 'json':
+            return JsonResponse({'sucesso': False, 'erro': mensagem}, status=status)
+        messages.error(request, mensagem)
+        return render(request, 'analisador/index.html', {
+            'tamanho_maximo': settings.ANALISADOR_TAMANHO_MAXIMO,
+        }, status=status)
+    
+    def decorador(view):
+        @wraps(view)
+        def envolvida(request, *args, **kwargs):
+            request.reserva_analise = None
+            try:
+                tamanho = _tamanho_do_corpo(request)
+            except ValueError:
+                return responder(request, 'Cabeçalho Content-Length inválido.', 400)
+            if not tamanho:
+                return view(request, *args, **kwargs)
+            
+            custo = custo_leitura(tamanho) + (custo_base(**kwargs) if custo_base else 0)
+            try:
+                with obter_controle().admitir(custo) as request.reserva_analise:
+                    return view(request, *args, **kwargs)
+            except SemCapacidade as e:
+                resposta = responder(request, str(e), 503)
+                resposta['Retry-After'] = str(e.retry_after)
+                return resposta
+        return envolvida
+    return decorador
+
+
+def _custo_analise_salva(id_resultado):
+    """Estima a memória do resultado de uma análise do histórico, pelo registro."""
+    registro = obter_registro(id_resultado)
+    if registro is None:
+        return 0
+    return custo_resultado(registro.numeros_unicos, int(registro.menor), int(registro.maior))
+
+
+def _validar_arquivo(request, campo='arquivo', extensoes=('.txt',)):
+    """
+    Valida o arquivo enviado no campo ``campo`` (por padrão, ``arquivo``).
+    
+    Returns:
+        tuple: (arquivo, None) se válido, ou (None, mensagem de erro)
     """
     # Verificar se um arquivo foi enviado
-    if 'arquivo' not in request.FILES:
-        messages.error(request, 'Nenhum arquivo foi enviado.')
-        return redirect('analisador:index')
+    if campo not in request.FILES:
+        return None, 'Nenhum arquivo foi enviado.'
     
-    arquivo = request.FILES['arquivo']
+    arquivo = request.FILES[campo]
     
     # Validar se arquivo não está vazio
     if not arquivo:
-        messages.error(request, 'Arquivo vazio ou inválido.')
-        return redirect('analisador:index')
+        return None, 'Arquivo vazio ou inválido.'
     
     # Validar tipo de arquivo
-    if not arquivo.name.endswith('.txt'):
-        messages.error(request, 'Por favor, envie apenas arquivos com extensão .txt')
-        return redirect('analisador:index')
+    if not arquivo.name.endswith(extensoes):
+        return None, f"Por favor, envie apenas arquivos com extensão {' ou '.join(extensoes)}"
+    
+    # Validar tamanho do arquivo
+    limite = settings.ANALISADOR_TAMANHO_MAXIMO
+    if arquivo.size > limite:
+        return None, f'Arquivo muito grande. Tamanho máximo permitido: {limite // (1024 * 1024)}MB'
+    
+    # Verificar se o arquivo não está vazio
+    if arquivo.size == 0:
+        return None, 'O arquivo está vazio. Por favor, envie um arquivo com números.'
+    
+    return arquivo, None
+
+
+# Listas que podem ser baixadas na página de resultado: (nome na URL, rótulo)
+LISTAS_EXPORTACAO = (
+    ('faltantes', 'Números faltantes'),
+    ('duplicados', 'Números duplicados'),
+    ('gaps', 'Gaps grandes'),
+    ('encontrados', 'Intervalos encontrados'),
+)
+
+
+def _renderizar_resultado(request, analisador, resultado, nome_arquivo):
+    """
+    Renderiza a página de resultado de uma análise bem-sucedida.
+    """
+    # Preparar contexto para o template
+    contexto = {
+        'resultado': resultado,
+        'nome_arquivo': nome_arquivo,
+        'arquivos_lote': resultado.get('arquivos'),
+        'lista_faltantes_copia': analisador.gerar_lista_copia_faltantes(),
+        'tem_faltantes': len(resultado['intervalos_faltantes']) > 0,
+        'tem_duplicados': len(resultado['numeros_duplicados']) > 0,
+        'tem_gaps_grandes': resultado.get('gap_detectado', []),
+        'relatorio_gaps': analisador.gerar_relatorio_gaps() if resultado.get('gap_detectado') else None,
+        'listas_exportacao': LISTAS_EXPORTACAO,
+    }
+    
+    # Adicionar aviso se há gaps grandes
+    if resultado.get('gap_detectado'):
+        messages.warning(request, 
+            f"Detectados gaps grandes na sequência. "
+            f"A análise foi otimizada para evitar problemas de memória. "
+            f"Verifique o relatório de gaps no resultado."
+        )
+    
+    medidor = analisador.metricas
+    with medidor.etapa('renderizacao'):
+        resposta = render(request, 'analisador/resultado.html', contexto)
+    
+    medidor.finalizar(view=request.resolver_match.url_name, arquivo=nome_arquivo)
+    return aplicar_server_timing(resposta, medidor)
+
+
+@require_http_methods(["GET", "HEAD"])
+def exibir_resultado(request, id_resultado):
+    """
+    Exibe um resultado guardado, sem reprocessar o arquivo.
+    
+    É o destino dos envios de arquivo (Post/Redirect/Get): recarregar a
+    página não reenvia o arquivo, e o endereço pode ser compartilhado ou
+    reaberto depois. O resultado vem do cache ou do histórico.
+    
+    Como o id identifica o conteúdo e os parâmetros da análise, a página só
+    muda com o nome do arquivo; visitas repetidas são respondidas com 304 a
+    partir do ETag e do Last-Modified. Um id desconhecido ou expirado
+    responde 404, com a página inicial e a mensagem.
+    """
+    snapshot = obter_snapshot(id_resultado)
+    if snapshot is None:
+        messages.error(request, 'Resultado não encontrado ou expirado. Envie o arquivo novamente.')
+        return render(request, 'analisador/index.html', {
+            'tamanho_maximo': settings.ANALISADOR_TAMANHO_MAXIMO,
+        }, status=404)
+    
+    analise = obter_registro(id_resultado)
+    nome_arquivo = analise.nome_arquivo if analise is not None else 'Arquivo analisado'
+    etag = quote_etag(hashlib.sha256(f'{id_resultado}|{nome_arquivo}'.encode()).hexdigest()[:32])
+    ultima_alteracao = int(analise.enviada_em.timestamp()) if analise is not None else None
+    
+    # Mensagens pendentes (como as de um acréscimo) fazem parte da página,
+    # que então não pode ser reaproveitada pelo navegador
+    validar = not len(messages.get_messages(request))
+    if validar:
+        resposta = get_conditional_response(request, etag=etag, last_modified=ultima_alteracao)
+        if resposta is not None:
+            return resposta
+    
+    analisador = AnalisadorSequencia(metricas=criar_medidor())
+    resultado = analisador.carregar_snapshot(snapshot)
+    resultado['id_resultado'] = id_resultado
+    resultado['arquivos'] = obter_resumos('lote', id_resultado)
+    resposta = _renderizar_resultado(request, analisador, resultado, nome_arquivo)
+    
+    if validar:
+        resposta['ETag'] = etag
+        if ultima_alteracao is not None:
+            resposta['Last-Modified'] = http_date(ultima_alteracao)
+    patch_cache_control(resposta, private=True, no_cache=True)
+    return resposta
+
+
+# Itens por página nas listas do resultado carregadas pelo resultado.js
+TAMANHO_PAGINA_RESULTADO = 500
+
+
+def _itens_da_lista(snapshot, lista):
+    """
+    Retorna os itens de uma das listas do resultado, já no formato exibido.
+    
+    Returns:
+        tuple: (sequência de itens, função de formatação), ou None se a lista não existir
+    """
+    if lista == 'faltantes':
+        return snapshot.faltantes, formatar_intervalo
+    if lista == 'encontrados':
+        return snapshot.corridas, formatar_intervalo
+    if lista == 'duplicados':
+        return snapshot.duplicados, lambda d: {'numero': d[0], 'quantidade': d[1]}
+    if lista == 'gaps':
+        return snapshot.gaps_grandes, lambda g: {
+            'inicio': g[0] - 1, 'fim': g[1] + 1, 'tamanho_gap': g[1] - g[0] + 1,
+        }
+    return None
+
+
+@require_http_methods(["GET"])
+def pagina_resultado(request, id_resultado, lista):
+    """
+    Retorna uma página de uma lista do resultado (faltantes, encontrados,
+    duplicados ou gaps) em JSON.
+    
+    A página de resultado mostra apenas o resumo; as listas são buscadas aos
+    poucos, de modo que o tamanho da resposta não depende do tamanho do resultado.
+    """
+    snapshot = obter_snapshot(id_resultado)
+    if snapshot is None:
+        return JsonResponse({'erro': 'Resultado não encontrado ou expirado. Envie o arquivo novamente.'}, status=404)
+    
+    itens = _itens_da_lista(snapshot, lista)
+    if itens is None:
+        return JsonResponse({'erro': f'Lista desconhecida: {lista}'}, status=404)
+    
+    sequencia, formatar = itens
+    paginador = Paginator(sequencia, TAMANHO_PAGINA_RESULTADO)
+    pagina = paginador.get_page(request.GET.get('pagina'))
+    
+    return JsonResponse({
+        'itens': [formatar(item) for item in pagina.object_list],
+        'pagina': pagina.number,
+        'total_paginas': paginador.num_pages,
+        'total_itens': paginador.count,
+        'tem_proxima': pagina.has_next(),
+    })
+
+
+@require_http_methods(["GET"])
+def exportar_resultado(request, id_resultado, lista):
+    """
+    Baixa uma lista completa do resultado (faltantes, encontrados,
+    duplicados ou gaps) como arquivo CSV ou TXT.
+    
+    Parâmetros: ``formato`` (csv ou txt), ``gzip=1`` para comprimir e
+    ``expandir=1`` para um número por linha em faltantes e encontrados. O
+    arquivo é gerado em fluxo a partir do resultado guardado, sem limite de
+    itens e com memória constante no servidor.
+    """
+    formato = request.GET.get('formato', 'csv')
+    if formato not in FORMATOS_EXPORTACAO:
+        return JsonResponse({'erro': f'Formato desconhecido: {formato}'}, status=400)
+    
+    snapshot = obter_snapshot(id_resultado)
+    if snapshot is None:
+        return JsonResponse({'erro': 'Resultado não encontrado ou expirado. Envie o arquivo novamente.'}, status=404)
+    
+    try:
+        trechos = exportar_lista(snapshot, lista, formato, expandir=request.GET.get('expandir') == '1')
+    except KeyError:
+        return JsonResponse({'erro': f'Lista desconhecida: {lista}'}, status=404)
+    
+    nome = f'{lista}-{id_resultado[:12]}.{formato}'
+    content_type = 'text/csv; charset=utf-8' if formato == 'csv' else 'text/plain; charset=utf-8'
+    if request.GET.get('gzip') == '1':
+        trechos = comprimir_gzip(trechos)
+        nome += '.gz'
+        content_type = 'application/gzip'
+    
+    resposta = StreamingHttpResponse(trechos, content_type=content_type)
+    resposta['Content-Disposition'] = f'attachment; filename="{nome}"'
+    return resposta
+
+
+def _analisar_upload(analisador, arquivo, abrir_blocos):
+    """
+    Analisa um arquivo enviado, reaproveitando o resultado de envios idênticos.
     
-    # Validar tamanho do arquivo (máximo 30MB)
-    if arquivo.size > 30 * 1024 * 1024:  # 30MB em bytes
-        messages.error(request, 'Arquivo muito grande. Tamanho máximo permitido: 30MB')
+    Se o arquivo já foi analisado durante o upload (ArquivoAnalisado), só
+    falta consolidar; caso contrário, ele é lido por ``abrir_blocos`` (um
+    ``.gz``, que seria descomprimido de novo a cada leitura, tem o hash
+    calculado durante a análise).
+    """
+    if isinstance(arquivo, ArquivoAnalisado):
+        return analisar_recebido_com_cache(analisador, arquivo, nome_arquivo=arquivo.name)
+    return analisar_com_cache(
+        analisador, abrir_blocos, nome_arquivo=arquivo.name, releitura=not arquivo.name.endswith('.gz')
+    )
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@_com_admissao()
+def processar_arquivo(request):
+    """
+    View para processar o arquivo enviado e exibir resultados.
+    
+    O arquivo é analisado enquanto é recebido (AnaliseDuranteUpload), sem
+    passar por um arquivo temporário. Em caso de sucesso, redireciona para a
+    página do resultado guardado (Post/Redirect/Get).
+    """
+    analisador = AnalisadorSequencia(metricas=criar_medidor(), reserva=request.reserva_analise)
+    request.upload_handlers.insert(0, AnaliseDuranteUpload(request, backend=analisador.backend))
+    
+    arquivo, erro = _validar_arquivo(request)
+    if erro:
+        messages.error(request, erro)
         return redirect('analisador:index')
     
     try:
-        # Ler conteúdo do arquivo
-        conteudo = arquivo.read().decode('utf-8')
+        # Concluir a análise feita no upload, reaproveitando o resultado de envios idênticos
+        resultado = _analisar_upload(analisador, arquivo, abrir_upload(arquivo))
         
-        # Verificar se o arquivo não está vazio
-        if not conteudo.strip():
-            messages.error(request, 'O arquivo está vazio. Por favor, envie um arquivo com números.')
+        if not resultado['sucesso']:
+            analisador.metricas.finalizar(view='processar', arquivo=arquivo.name, erro=resultado['erro'])
+            messages.error(request, resultado['erro'])
             return redirect('analisador:index')
         
-        # Processar arquivo usando o serviço analisador
-        analisador = AnalisadorSequencia()
-        resultado = analisador.processar_arquivo(conteudo)
+        analisador.metricas.finalizar(view='processar', arquivo=arquivo.name)
+        resposta = redirect('analisador:resultado', id_resultado=resultado['id_resultado'])
+        return aplicar_server_timing(resposta, analisador.metricas)
+        
+    except MemoryError:
+        messages.error(request, 
+            'Erro de memória ao processar arquivo. '
+            'O arquivo contém uma sequência muito grande. '
+            'Tente dividir em arquivos menores ou reduzir o intervalo da sequência.'
+        )
+        return redirect('analisador:index')
+    
+    except SemCapacidade:
+        # Respondido com 503 por _com_admissao
+        raise
+    
+    except Exception as e:
+        messages.error(request, f'Erro inesperado ao processar arquivo: {str(e)}')
+        return redirect('analisador:index')
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@_com_admissao()
+def processar_lote(request):
+    """
+    Analisa vários arquivos (ou arquivos .zip) de uma vez, em paralelo.
+    
+    Em caso de sucesso, redireciona para a página da visão combinada, que
+    trata todos os arquivos como uma única sequência e exibe o resumo de
+    cada arquivo (Post/Redirect/Get).
+    """
+    uploads = request.FILES.getlist('arquivos')
+    if not uploads:
+        messages.error(request, 'Nenhum arquivo foi enviado.')
+        return redirect('analisador:index')
+    
+    try:
+        analisador = AnalisadorSequencia(metricas=criar_medidor(), reserva=request.reserva_analise)
+        with lote.ler_arquivos(uploads) as arquivos:
+            resultado = lote.analisar_lote(analisador, arquivos)
         
         if not resultado['sucesso']:
-            # Verificar se é erro de gap muito grande
-            if resultado.get('gap_muito_grande'):
-                messages.warning(request, 
-                    f"{resultado['erro']}<br><br>"
-                    f"<strong>Dica:</strong> Para sequências com gaps muito grandes (como 10000, 30000, 50000), "
-                    f"considere analisar cada bloco separadamente ou usar uma abordagem diferente."
-                )
-            else:
-                messages.error(request, resultado['erro'])
+            analisador.metricas.finalizar(view='processar_lote', arquivos=len(arquivos), erro=resultado['erro'])
+            erros = '; '.join(f"{a['nome']}: {a['erro']}" for a in resultado['arquivos'])
+            messages.error(request, f"{resultado['erro']} {erros}")
             return redirect('analisador:index')
         
-        # Preparar contexto para o template
-        contexto = {
-            'resultado': resultado,
-            'nome_arquivo': arquivo.name,
-            'lista_faltantes_copia': analisador.gerar_lista_copia_faltantes(),
-            'tem_faltantes': len(resultado['numeros_faltantes']) > 0,
-            'tem_duplicados': len(resultado['numeros_duplicados']) > 0,
-            'tem_gaps_grandes': resultado.get('gap_detectado', []),
-            'relatorio_gaps': analisador.gerar_relatorio_gaps() if resultado.get('gap_detectado') else None,
-        }
+        analisador.metricas.finalizar(view='processar_lote', arquivos=len(arquivos))
+        resposta = redirect('analisador:resultado', id_resultado=resultado['id_resultado'])
+        return aplicar_server_timing(resposta, analisador.metricas)
         
-        # Adicionar aviso se há gaps grandes
-        if resultado.get('gap_detectado'):
-            messages.warning(request, 
-                f"Detectados gaps grandes na sequência. "
-                f"A análise foi otimizada para evitar problemas de memória. "
-                f"Verifique o relatório de gaps no resultado."
-            )
+    except lote.LoteInvalido as e:
+        messages.error(request, str(e))
+        return redirect('analisador:index')
+    
+    except MemoryError:
+        messages.error(request, 
+            'Erro de memória ao processar o lote. '
+            'Tente enviar menos arquivos de uma vez.'
+        )
+        return redirect('analisador:index')
+    
+    except SemCapacidade:
+        # Respondido com 503 por _com_admissao
+        raise
+    
+    except Exception as e:
+        messages.error(request, f'Erro inesperado ao processar o lote: {str(e)}')
+        return redirect('analisador:index')
+
+
+def _formato_do_formulario(dados):
+    """
+    Monta o formato de linha escolhido no formulário de séries.
+    
+    Raises:
+        FormatoInvalido: Se os campos do formato estiverem incompletos ou inválidos
+    """
+    if dados.get('modo') == 'csv':
+        try:
+            coluna_serie = int(dados.get('coluna_serie', ''))
+            coluna_numero = int(dados.get('coluna_numero', ''))
+        except ValueError:
+            raise FormatoInvalido('Informe os números das colunas da série e do número.')
+        return FormatoSeries(
+            coluna_serie=coluna_serie,
+            coluna_numero=coluna_numero,
+            delimitador=dados.get('delimitador') or ',',
+        )
+    return FormatoSeries(padrao=dados.get('padrao', ''))
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@_com_admissao()
+def processar_series(request):
+    """
+    Analisa um arquivo com várias séries misturadas, uma análise por série.
+    
+    O formato de linha é uma expressão regular com os grupos ``serie`` e
+    ``numero`` (campo ``padrao``) ou as colunas de um CSV (``modo=csv``,
+    ``coluna_serie``, ``coluna_numero`` e ``delimitador``). Cada série pode
+    ser aberta depois como uma análise comum. Em caso de sucesso,
+    redireciona para a página das séries (Post/Redirect/Get).
+    """
+    arquivo, erro = _validar_arquivo(request, extensoes=('.txt', '.csv'))
+    if erro:
+        messages.error(request, erro)
+        return redirect('analisador:index')
+    
+    try:
+        formato = _formato_do_formulario(request.POST)
         
-        return render(request, 'analisador/resultado.html', contexto)
+        analisador = AnalisadorSequencia(metricas=criar_medidor(), reserva=request.reserva_analise)
+        resultado = analisar_series_com_cache(analisador, abrir_upload(arquivo)(), formato, nome_arquivo=arquivo.name)
         
-    except UnicodeDecodeError:
-        messages.error(request, 'Erro ao ler o arquivo. Certifique-se de que é um arquivo de texto válido (UTF-8).')
+        if not resultado['sucesso']:
+            analisador.metricas.finalizar(view='processar_series', arquivo=arquivo.name, erro=resultado['erro'])
+            messages.error(request, resultado['erro'])
+            return redirect('analisador:index')
+        
+        analisador.metricas.finalizar(view='processar_series', arquivo=arquivo.name)
+        resposta = redirect('analisador:series', id_series=resultado['id_series'])
+        return aplicar_server_timing(resposta, analisador.metricas)
+        
+    except FormatoInvalido as e:
+        messages.error(request, str(e))
         return redirect('analisador:index')
     
     except MemoryError:
         messages.error(request, 
             'Erro de memória ao processar arquivo. '
-            'O arquivo contém uma sequência muito grande. '
-            'Tente dividir em arquivos menores ou reduzir o intervalo da sequência.'
+            'Tente dividir em arquivos menores.'
         )
         return redirect('analisador:index')
     
+    except SemCapacidade:
+        # Respondido com 503 por _com_admissao
+        raise
+    
+    except Exception as e:
+        messages.error(request, f'Erro inesperado ao processar arquivo: {str(e)}')
+        return redirect('analisador:index')
+
+
+@require_http_methods(["GET"])
+def exibir_series(request, id_series):
+    """
+    Exibe a tabela de séries de um arquivo analisado por processar_series.
+    
+    A tabela fica no cache; cada série continua disponível pelo seu próprio
+    resultado e pelo histórico.
+    """
+    series = obter_resumos('series', id_series)
+    if series is None:
+        messages.error(request, 'Resultado não encontrado ou expirado. Envie o arquivo novamente.')
+        return redirect('analisador:index')
+    
+    resposta = render(request, 'analisador/series.html', {
+        'resultado': series,
+        'nome_arquivo': series['nome_arquivo'] or 'Arquivo analisado',
+    })
+    patch_cache_control(resposta, private=True, no_cache=True)
+    return resposta
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@_com_admissao(json=True)
+def processar_assincrono(request):
+    """
+    Agenda a análise do arquivo em segundo plano e retorna o id da tarefa.
+    
+    O andamento é consultado em status_tarefa; ao final, o resultado fica
+    disponível em resultado_tarefa. Com a fila de tarefas cheia, responde
+    503 com Retry-After.
+    """
+    arquivo, erro = _validar_arquivo(request)
+    if erro:
+        return JsonResponse({'erro': erro}, status=400)
+    
+    try:
+        tarefa = tarefas.iniciar_tarefa(arquivo)
+    except tarefas.FilaCheia as e:
+        resposta = JsonResponse({'erro': str(e)}, status=503)
+        resposta['Retry-After'] = str(e.retry_after)
+        return resposta
+    
+    return JsonResponse({
+        'id': tarefa.id,
+        'status_url': reverse('analisador:status_tarefa', args=[tarefa.id]),
+        'resultado_url': reverse('analisador:resultado_tarefa', args=[tarefa.id]),
+    }, status=202)
+
+
+@require_http_methods(["GET"])
+def status_tarefa(request, tarefa_id):
+    """
+    Informa o andamento de uma tarefa e, quando concluída, o resultado.
+    """
+    tarefa = tarefas.obter_tarefa(tarefa_id)
+    if tarefa is None:
+        return JsonResponse({'erro': 'Tarefa não encontrada ou expirada.'}, status=404)
+    
+    dados = tarefa.progresso()
+    if tarefa.estado == tarefas.CONCLUIDA:
+        snapshot = obter_snapshot(tarefa.id_resultado)
+        if snapshot is not None:
+            dados['resultado'] = AnalisadorSequencia().carregar_snapshot(snapshot)
+            dados['resultado']['id_resultado'] = tarefa.id_resultado
+    
+    return JsonResponse(dados)
+
+
+@require_http_methods(["GET"])
+def resultado_tarefa(request, tarefa_id):
+    """
+    Leva à página de resultado de uma tarefa concluída.
+    """
+    tarefa = tarefas.obter_tarefa(tarefa_id)
+    if tarefa is None:
+        messages.error(request, 'Análise não encontrada ou expirada. Envie o arquivo novamente.')
+        return redirect('analisador:index')
+    
+    if tarefa.estado == tarefas.ERRO:
+        messages.error(request, tarefa.erro)
+        return redirect('analisador:index')
+    
+    if tarefa.estado != tarefas.CONCLUIDA:
+        messages.info(request, 'A análise ainda está em andamento. Aguarde alguns instantes.')
+        return redirect('analisador:index')
+    
+    return redirect('analisador:resultado', id_resultado=tarefa.id_resultado)
+
+
+# Análises por página no histórico
+HISTORICO_POR_PAGINA = 25
+
+
+@require_http_methods(["GET"])
+def historico(request):
+    """
+    Lista as análises já feitas, das mais recentes para as mais antigas.
+    
+    Aceita ``?hash=`` para mostrar apenas as análises de um mesmo conteúdo.
+    """
+    # Os blobs das corridas e duplicados só são lidos ao abrir uma análise
+    analises = Analise.objects.defer('corridas', 'duplicados')
+    hash_conteudo = request.GET.get('hash', '').strip()
+    if hash_conteudo:
+        analises = analises.filter(hash_conteudo=hash_conteudo)
+    
+    pagina = Paginator(analises, HISTORICO_POR_PAGINA).get_page(request.GET.get('pagina'))
+    return render(request, 'analisador/historico.html', {
+        'pagina': pagina,
+        'hash': hash_conteudo,
+    })
+
+
+@require_http_methods(["GET"])
+def abrir_analise(request, id_resultado):
+    """
+    Endereço antigo de uma análise do histórico: redireciona para a página
+    do resultado.
+    """
+    return redirect('analisador:resultado', id_resultado=id_resultado, permanent=True)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@_com_admissao(custo_base=_custo_analise_salva)
+def acrescentar_analise(request, id_resultado):
+    """
+    Acrescenta os números de um novo arquivo a uma análise já feita.
+    
+    Útil para sequências que crescem: em vez de reenviar o arquivo
+    acumulado, envia-se apenas o trecho novo, e a análise anterior é
+    atualizada com ele.
+    """
+    arquivo, erro = _validar_arquivo(request)
+    if erro:
+        messages.error(request, erro)
+        return redirect('analisador:resultado', id_resultado=id_resultado)
+    
+    analise = Analise.objects.filter(id_resultado=id_resultado).only('nome_arquivo').first()
+    nome_base = analise.nome_arquivo if analise else 'Análise anterior'
+    nome_arquivo = f'{nome_base} + {arquivo.name}'
+    
+    try:
+        analisador = AnalisadorSequencia(metricas=criar_medidor(), reserva=request.reserva_analise)
+        resultado = acrescentar_com_cache(analisador, id_resultado, abrir_upload(arquivo), nome_arquivo=nome_arquivo)
+        
+        if not resultado['sucesso']:
+            messages.error(request, resultado['erro'])
+            return redirect('analisador:index')
+        
+        analisador.metricas.finalizar(view='acrescentar_analise', arquivo=nome_arquivo)
+        return redirect('analisador:resultado', id_resultado=resultado['id_resultado'])
+        
+    except MemoryError:
+        messages.error(request, 'Erro de memória ao acrescentar os números. Tente um arquivo menor.')
+        return redirect('analisador:index')
+    
+    except SemCapacidade:
+        # Respondido com 503 por _com_admissao
+        raise
+    
     except Exception as e:
         messages.error(request, f'Erro inesperado ao processar arquivo: {str(e)}')
         return redirect('analisador:index')
+
+
+# Itens exibidos por lista na página de comparação (o JSON traz as listas completas)
+LIMITE_ITENS_COMPARACAO = 1000
+
+
+def _analises_para_comparar(request):
+    """
+    Obtém as duas análises a comparar: pelos ids (``?anterior=`` e
+    ``?atual=``) em um GET, ou pelos arquivos ``anterior`` e ``atual`` em um POST.
+    
+    Os dois resultados ficam na memória até a comparação, de modo que a
+    reserva do request é ampliada para a soma dos dois (ReservaAcumulada).
+    
+    Returns:
+        tuple: ([(nome, id, snapshot) da anterior, da atual], None), ou (None, mensagem de erro)
+    """
+    analises = []
+    reserva = ReservaAcumulada(request.reserva_analise)
+    for campo in ('anterior', 'atual'):
+        if request.method == 'POST':
+            arquivo, erro = _validar_arquivo(request, campo)
+            if erro:
+                return None, f'Arquivo {campo}: {erro}'
+            
+            analisador = AnalisadorSequencia(reserva=reserva)
+            resultado = analisar_com_cache(
+                analisador, abrir_upload(arquivo), nome_arquivo=arquivo.name,
+                releitura=not arquivo.name.endswith('.gz'),
+            )
+            if not resultado['sucesso']:
+                return None, f"{arquivo.name}: {resultado['erro']}"
+            snapshot = analisador.snapshot
+            reserva.acumular(custo_resultado(snapshot.total, snapshot.menor, snapshot.maior))
+            analises.append((arquivo.name, resultado['id_resultado'], snapshot))
+        else:
+            id_resultado = request.GET.get(campo, '')
+            snapshot = obter_snapshot(id_resultado) if id_resultado else None
+            if snapshot is None:
+                return None, 'Análise não encontrada no histórico. Escolha duas análises para comparar.'
+            analise = Analise.objects.filter(id_resultado=id_resultado).only('nome_arquivo').first()
+            nome = analise.nome_arquivo if analise else id_resultado
+            analises.append((nome, id_resultado, snapshot))
+    return analises, None
+
+
+@csrf_exempt
+@require_http_methods(["GET", "POST"])
+@_com_admissao()
+def comparar_analises(request):
+    """
+    Compara duas análises da mesma sequência: lacunas preenchidas, novas
+    lacunas, números removidos e novos duplicados.
+    
+    As análises vêm do histórico (GET com ``?anterior=<id>&atual=<id>``) ou
+    de dois arquivos enviados (POST com os campos ``anterior`` e ``atual``).
+    Com ``?formato=json`` a resposta é o JSON com as listas completas.
+    """
+    quer_json = request.GET.get('formato') == 'json'
+    
+    try:
+        analises, erro = _analises_para_comparar(request)
+    except MemoryError:
+        analises, erro = None, 'Erro de memória ao analisar os arquivos. Tente arquivos menores.'
+    
+    if erro:
+        if quer_json:
+            return JsonResponse({'sucesso': False, 'erro': erro}, status=400)
+        messages.error(request, erro)
+        return redirect('analisador:historico' if request.method == 'GET' else 'analisador:index')
+    
+    (nome_anterior, id_anterior, anterior), (nome_atual, id_atual, atual) = analises
+    comparacao = ComparacaoAnalises.entre(anterior, atual)
+    
+    if quer_json:
+        return JsonResponse({
+            'sucesso': True,
+            'anterior': id_anterior,
+            'atual': id_atual,
+            **comparacao.como_dict(),
+        })
+    
+    return render(request, 'analisador/comparacao.html', {
+        'comparacao': comparacao.como_dict(LIMITE_ITENS_COMPARACAO),
+        'limite_itens': LIMITE_ITENS_COMPARACAO,
+        'anterior': {'nome': nome_anterior, 'id': id_anterior, 'snapshot': anterior},
+        'atual': {'nome': nome_atual, 'id': id_atual, 'snapshot': atual},
+    })
+
+
+@require_http_methods(["GET"])
+def estatisticas_do_cache(request):
+    """
+    Expõe os contadores de acertos e falhas do cache de resultados.
+    """
+    return JsonResponse(estatisticas_cache())
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@_com_admissao(json=True)
+def api_analisar(request):
+    """
+    Endpoint JSON para integrações: retorna o resultado de processar_arquivo.
+    
+    Aceita o arquivo de duas formas:
+    - no corpo do request, como texto puro (ou gzip, com ``Content-Encoding: gzip``);
+    - como multipart, no campo ``arquivo`` (arquivos ``.gz`` são descomprimidos;
+      os demais são analisados enquanto chegam).
+    
+    No envio pelo corpo, o cabeçalho ``X-Nome-Arquivo`` define o nome exibido no histórico.
+    
+    A resposta é enviada em fluxo, de modo que listas grandes de intervalos
+    não precisam ser montadas em uma única string.
+    """
+    limite = settings.ANALISADOR_TAMANHO_MAXIMO
+    analisador = AnalisadorSequencia(metricas=criar_medidor(), reserva=request.reserva_analise)
+    
+    if request.content_type == 'multipart/form-data':
+        request.upload_handlers.insert(0, AnaliseDuranteUpload(request, backend=analisador.backend))
+        arquivo = request.FILES.get('arquivo')
+        if arquivo is None:
+            return JsonResponse({'sucesso': False, 'erro': 'Nenhum arquivo foi enviado no campo "arquivo".'}, status=400)
+        if arquivo.size > limite:
+            return JsonResponse({'sucesso': False, 'erro': f'Arquivo maior que o limite de {limite:,} bytes.'}, status=413)
+        
+        if arquivo.name.endswith('.gz'):
+            abrir_blocos = lambda: descomprimir_gzip(abrir_upload(arquivo)(), limite)
+        else:
+            abrir_blocos = abrir_upload(arquivo)
+        resultado = _analisar_upload(analisador, arquivo, abrir_blocos)
+    else:
+        tamanho = int(request.META.get('CONTENT_LENGTH') or 0)
+        if tamanho > limite:
+            return JsonResponse({'sucesso': False, 'erro': f'Conteúdo maior que o limite de {limite:,} bytes.'}, status=413)
+        
+        chunks = ler_corpo(request)
+        if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+            chunks = descomprimir_gzip(chunks, limite)
+        resultado = analisar_fluxo_com_cache(
+            analisador, chunks, nome_arquivo=request.headers.get('X-Nome-Arquivo', 'Envio pela API')
+        )
+    
+    analisador.metricas.finalizar(view='api_analisar', sucesso=resultado['sucesso'])
+    resposta = StreamingHttpResponse(
+        resultado_em_json(resultado),
+        content_type='application/json; charset=utf-8',
+        status=200 if resultado['sucesso'] else 400,
+    )
+    return aplicar_server_timing(resposta, analisador.metricas)
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def api_previa(request):
+    """
+    Endpoint JSON com uma prévia aproximada do arquivo, calculada por
+    AnalisadorSequencia.estimar_chunks().
+    
+    Aceita o arquivo como em api_analisar (no corpo do request ou como
+    multipart, no campo ``arquivo``). A prévia é lida com memória constante
+    e não é guardada no cache nem no histórico: serve para decidir se vale
+    a pena enviar o arquivo para a análise completa.
+    """
+    limite = settings.ANALISADOR_TAMANHO_MAXIMO
+    analisador = AnalisadorSequencia(metricas=criar_medidor())
+    
+    if request.content_type == 'multipart/form-data':
+        arquivo = request.FILES.get('arquivo')
+        if arquivo is None:
+            return JsonResponse({'sucesso': False, 'erro': 'Nenhum arquivo foi enviado no campo "arquivo".'}, status=400)
+        if arquivo.size > limite:
+            return JsonResponse({'sucesso': False, 'erro': f'Arquivo maior que o limite de {limite:,} bytes.'}, status=413)
+        
+        chunks = abrir_upload(arquivo)()
+        if arquivo.name.endswith('.gz'):
+            chunks = descomprimir_gzip(chunks, limite)
+    else:
+        tamanho = int(request.META.get('CONTENT_LENGTH') or 0)
+        if tamanho > limite:
+            return JsonResponse({'sucesso': False, 'erro': f'Conteúdo maior que o limite de {limite:,} bytes.'}, status=413)
+        
+        chunks = ler_corpo(request)
+        if request.headers.get('Content-Encoding', '').lower() == 'gzip':
+            chunks = descomprimir_gzip(chunks, limite)
+    
+    resultado = analisador.estimar_chunks(chunks)
+    analisador.metricas.finalizar(view='api_previa', sucesso=resultado['sucesso'])
+    resposta = JsonResponse(resultado, status=200 if resultado['sucesso'] else 400)
+    return aplicar_server_timing(resposta, analisador.metricas)
@@ -132,9 +132,81 @@ SESSION_COOKIE_HTTPONLY = True
 SESSION_COOKIE_SAMESITE = 'Lax'
 
 # Configuração de upload de arquivos
-FILE_UPLOAD_MAX_MEMORY_SIZE = 31457280  # 30MB (30 * 1024 * 1024)
+# Uploads maiores que isso vão para um arquivo temporário, que o analisador
+# percorre por mmap; a memória usada não cresce com o tamanho do arquivo
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2621440  # 2.5MB (2.5 * 1024 * 1024)
 DATA_UPLOAD_MAX_MEMORY_SIZE = 31457280  # 30MB
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+ANALISADOR_MEMORIA_PROCESSO = 1536 * 1024 * 1024  # Memória de cada processo do servidor (1.5GB): a da máquina dividida pelos processos
+ANALISADOR_CACHE_MEMORIA = 100 * 1024 * 1024  # Memória do cache de resultados 'analises' em cada processo (100MB)
+ANALISADOR_CACHE_TAMANHO_MAXIMO_ENTRADA = 1024 * 1024  # Snapshots maiores (memória estimada) ficam só no histórico
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Resultados de análises, indexados pelo hash do conteúdo do arquivo.
+    # O LocMemCache descarta as entradas menos usadas recentemente (LRU) ao
+    # atingir MAX_ENTRIES; CULL_FREQUENCY igual a MAX_ENTRIES remove uma por vez.
+    # Nenhuma entrada passa de ANALISADOR_CACHE_TAMANHO_MAXIMO_ENTRADA, e
+    # MAX_ENTRIES sai da memória total: 100 entradas de até 1MB (100MB).
+    'analises': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'analisador-resultados',
+        'TIMEOUT': 24 * 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': ANALISADOR_CACHE_MEMORIA // ANALISADOR_CACHE_TAMANHO_MAXIMO_ENTRADA,
+            'CULL_FREQUENCY': ANALISADOR_CACHE_MEMORIA // ANALISADOR_CACHE_TAMANHO_MAXIMO_ENTRADA,
+        },
+    },
+}
+
+# Configurações do analisador
+ANALISADOR_TAMANHO_MAXIMO = 2 * 1024 * 1024 * 1024  # Tamanho máximo do arquivo analisado (2GB)
+ANALISADOR_CACHE_ALIAS = 'analises'  # Alias em CACHES usado para os resultados
+ANALISADOR_CACHE_MEMORIA_PROCESSO = 256 * 1024 * 1024  # Snapshots recentes mantidos desserializados em cada processo
+ANALISADOR_TAREFAS_WORKERS = 2  # Threads para análises em segundo plano
+ANALISADOR_TAREFAS_TTL = 3600  # Segundos que uma tarefa concluída fica disponível
+ANALISADOR_TAREFAS_FILA = 20  # Tarefas aguardando ou em andamento por processo; além disso, 503
+# O andamento das tarefas é publicado no cache 'analises': para consultar o
+# status em qualquer processo do servidor, use um backend compartilhado
+ANALISADOR_LOTE_WORKERS = None  # Processos para análises em lote (None = número de CPUs)
+ANALISADOR_LOTE_MAXIMO_ARQUIVOS = 100  # Arquivos .txt por lote, contando os de dentro de .zip
+ANALISADOR_LOTE_TAMANHO_MAXIMO = 200 * 1024 * 1024  # Soma dos tamanhos dos arquivos de um lote (200MB)
+# Orçamento das análises simultâneas, por processo: o que sobra de
+# ANALISADOR_MEMORIA_PROCESSO depois do cache 'analises' (100MB) e dos
+# snapshots recentes desserializados (256MB), de modo que os três juntos não
+# passam dela (1.5GB - 356MB = 1180MB). Fora da conta ficam o cache
+# 'default', que o analisador não usa, e os processos do pool de lotes, que
+# têm memória própria.
+ANALISADOR_ADMISSAO_ORCAMENTO = ANALISADOR_MEMORIA_PROCESSO - ANALISADOR_CACHE_MEMORIA - ANALISADOR_CACHE_MEMORIA_PROCESSO
+ANALISADOR_ADMISSAO_FILA = 4  # Requests que aguardam o orçamento liberar; os seguintes recebem 503 na hora
+ANALISADOR_ADMISSAO_ESPERA = 15  # Segundos de espera na fila antes do 503
+ANALISADOR_ADMISSAO_RETRY_AFTER = 10  # Segundos sugeridos no cabeçalho Retry-After do 503
+ANALISADOR_METRICAS = True  # Mede o tempo de cada etapa da análise (resultado, logs e Server-Timing)
+ANALISADOR_METRICAS_MEMORIA = False  # Mede também o pico de memória de cada etapa, com tracemalloc (mais lento)
+ANALISADOR_METRICAS_SERVER_TIMING = DEBUG  # Envia as etapas no cabeçalho Server-Timing
+
+# Logs do analisador (métricas de cada análise, uma linha JSON por análise)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'analisador': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
 # Configurações para evitar cache no desenvolvimento
 if DEBUG:
     STATICFILES_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'